@@ -0,0 +1,105 @@
+"""
+Analytics Routes for ServeTrack
+Serves historical dispatch counts from pre-aggregated rollup buckets
+"""
+from flask import Blueprint, request, jsonify
+from flask_login import login_required
+from sqlalchemy import func
+from auth import allowed_camera_ids
+from db_models import db, AnalyticsRollup
+from utils.analytics_rollup import GRANULARITIES, GRANULARITY_STEP, bucket_start, pick_granularity
+from datetime import datetime, timedelta
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# Upper bound on buckets per series so a bad request can't build huge responses
+MAX_BUCKETS = 2000
+
+
+def _parse_datetime(value, default):
+    if not value:
+        return default
+    return datetime.fromisoformat(value.replace('Z', ''))
+
+
+@analytics_bp.route('/api/analytics', methods=['GET'])
+@login_required
+def get_analytics():
+    """Get bucketed counts per item for a time range"""
+    try:
+        now = datetime.now()
+        try:
+            end = _parse_datetime(request.args.get('end'), now)
+            start = _parse_datetime(request.args.get('start'), end - timedelta(days=7))
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use ISO 8601'}), 400
+
+        if start >= end:
+            return jsonify({'error': 'start must be before end'}), 400
+
+        granularity = request.args.get('granularity', 'auto')
+        if granularity == 'auto':
+            granularity = pick_granularity(start, end)
+        elif granularity not in GRANULARITIES:
+            return jsonify({'error': f'Invalid granularity. Use auto or one of {list(GRANULARITIES)}'}), 400
+
+        step = GRANULARITY_STEP[granularity]
+        first_bucket = bucket_start(start, granularity)
+        if (end - first_bucket) / step > MAX_BUCKETS:
+            return jsonify({'error': f'Range too large for {granularity} granularity'}), 400
+
+        query = db.session.query(
+            AnalyticsRollup.item_name,
+            AnalyticsRollup.bucket_start,
+            func.sum(AnalyticsRollup.count)
+        ).filter(
+            AnalyticsRollup.granularity == granularity,
+            AnalyticsRollup.bucket_start >= first_bucket,
+            AnalyticsRollup.bucket_start < end
+        )
+
+        camera_id = request.args.get('camera_id', type=int)
+        if camera_id is not None:
+            query = query.filter(AnalyticsRollup.camera_id == camera_id)
+
+        # Clients only see their own cameras (plus the unregistered camera 0)
+        allowed_ids = allowed_camera_ids()
+        if allowed_ids is not None:
+            query = query.filter(AnalyticsRollup.camera_id.in_(allowed_ids))
+
+        item = request.args.get('item')
+        if item:
+            query = query.filter(AnalyticsRollup.item_name == item)
+
+        rows = query.group_by(AnalyticsRollup.item_name, AnalyticsRollup.bucket_start).all()
+
+        # Zero-filled, aligned series per item
+        buckets = []
+        cursor = first_bucket
+        while cursor < end:
+            buckets.append(cursor)
+            cursor += step
+        index = {b: i for i, b in enumerate(buckets)}
+
+        series = {}
+        totals = {}
+        for item_name, bucket, total in rows:
+            values = series.setdefault(item_name, [0] * len(buckets))
+            i = index.get(bucket)
+            if i is not None:
+                values[i] += int(total)
+            totals[item_name] = totals.get(item_name, 0) + int(total)
+
+        return jsonify({
+            'success': True,
+            'granularity': granularity,
+            'start': first_bucket.isoformat(),
+            'end': end.isoformat(),
+            'buckets': [b.isoformat() for b in buckets],
+            'series': series,
+            'totals': totals
+        }), 200
+
+    except Exception as e:
+        print(f"Error getting analytics: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -7,8 +7,7 @@ Everything else identical to test system
 
 import os
 import time
-import json
-import threading
+from itertools import islice
 from collections import defaultdict, deque
 from typing import Dict
 from datetime import datetime
@@ -32,18 +31,44 @@ from torchvision import models, transforms
 from ultralytics import YOLOWorld
 import supervision as sv
 
-from flask import Flask, request, jsonify, Response, send_from_directory
-from flask_socketio import SocketIO
+from flask import Flask, request, jsonify, Response, send_from_directory, has_request_context
+from flask_socketio import SocketIO, join_room, leave_room, emit, rooms
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from flask_login import current_user
 
 # Import database models and authentication
 from db_models import db, User, Camera, MenuItem, DetectionSession, ItemCount, ScheduleSetting
-from auth import auth_bp, init_auth, auth_required
+from auth import auth_bp, init_auth, auth_required, allowed_camera_ids
 from schedule_routes import schedule_bp
 from roi_routes import roi_bp
+from analytics_routes import analytics_bp
+from export_routes import export_bp
+from artifact_routes import artifact_bp
 from config import Config
+from init_db import add_missing_columns
+from utils.state_checkpoint import StateCheckpointer
+from utils.analytics_rollup import RollupAggregator
+from utils.timeseries import LiveSeriesStore
+from utils.event_log import EventLog
+from utils.artifact_store import ArtifactStore
+from utils.artifact_writer import ArtifactWriter
+from utils.clip_recorder import JpegFrameRing, ClipRecorder
+from utils.count_hub import CountHub
+from utils.snapshot import SnapshotCache, composite
+from utils.menu_catalog import MenuCatalog
+from utils.native import start_native_thread, run_blocking
+from utils.stream_hub import StreamHub, FramePusher, FEEDS, parse_renditions, encode_jpeg
+from utils.mosaic import MosaicComposer
+from utils.passthrough import PassthroughStream, ffmpeg_available
+from utils.pyav_capture import PyAVCapture, PYAV_BACKEND
+from utils.mjpeg_source import MjpegHttpSource, MJPEG_BACKEND
+from utils.dual_stream import MainStreamReader
+from utils.camera_supervisor import ReconnectSupervisor
+from utils.camera_probe import probe_camera, url_variants
+from utils.camera_health import CameraHealth
+from utils.crop_quality import BestShots, crop_quality
+from utils.count_emitter import CountsEmitter, ALL_ROOM, camera_room, tenant_room
 
 # ========================= EXACT TEST SYSTEM LOGIC =========================
 # All parameters and logic copied exactly from test_yoloworld_mobilenet_live.py
@@ -120,6 +145,130 @@ MIN_SIM_BY_LABEL = {
 
 DETECTIONS_DIR = 'detections'
 
+# Detection artifacts are written by a background pool with retention limits
+ARTIFACT_WRITER_THREADS = int(os.environ.get('ARTIFACT_WRITER_THREADS', 2))
+ARTIFACT_QUEUE_SIZE = int(os.environ.get('ARTIFACT_QUEUE_SIZE', 64))
+ARTIFACT_JPEG_QUALITY = int(os.environ.get('ARTIFACT_JPEG_QUALITY', 85))
+ARTIFACT_CROP_QUALITY = int(os.environ.get('ARTIFACT_CROP_QUALITY', 92))
+ARTIFACT_FRAME_MAX_WIDTH = int(os.environ.get('ARTIFACT_FRAME_MAX_WIDTH', 1280))
+ARTIFACT_THUMB_WIDTH = int(os.environ.get('ARTIFACT_THUMB_WIDTH', 240))
+ARTIFACT_FRAME_RETENTION_DAYS = float(os.environ.get('ARTIFACT_FRAME_RETENTION_DAYS', 7))
+ARTIFACT_CROP_RETENTION_DAYS = float(os.environ.get('ARTIFACT_CROP_RETENTION_DAYS', 30))
+ARTIFACT_QUOTA_MB = int(os.environ.get('ARTIFACT_QUOTA_MB', 5120))
+
+# Pre/post-event clips built from a bounded in-memory ring of encoded frames
+CLIP_CAPTURE_ENABLED = os.environ.get('CLIP_CAPTURE_ENABLED', '1') == '1'
+CLIP_PRE_SECONDS = float(os.environ.get('CLIP_PRE_SECONDS', 3))
+CLIP_POST_SECONDS = float(os.environ.get('CLIP_POST_SECONDS', 2))
+CLIP_RING_SECONDS = float(os.environ.get('CLIP_RING_SECONDS', 10))
+CLIP_RING_MAX_MB = int(os.environ.get('CLIP_RING_MAX_MB', 64))
+CLIP_JPEG_QUALITY = int(os.environ.get('CLIP_JPEG_QUALITY', 70))
+CLIP_QUOTA_MB = int(os.environ.get('CLIP_QUOTA_MB', 1024))
+CLIPS_DIR = os.path.join(DETECTIONS_DIR, 'clips')
+
+# Crash-safe checkpoint of counts and the live object registry
+CHECKPOINT_DIR = os.path.join('data', 'checkpoint')
+CHECKPOINT_INTERVAL_SEC = float(os.environ.get('CHECKPOINT_INTERVAL_SEC', 30))
+CHECKPOINT_MAX_AGE_SEC = float(os.environ.get('CHECKPOINT_MAX_AGE_SEC', 600))
+
+# Analytics rollups are flushed to MySQL in batches
+ROLLUP_FLUSH_INTERVAL_SEC = float(os.environ.get('ROLLUP_FLUSH_INTERVAL_SEC', 5))
+
+# Live chart ring buffers (per-second and per-minute history kept in memory)
+LIVE_SERIES_SECONDS = int(os.environ.get('LIVE_SERIES_SECONDS', 3 * 3600))
+LIVE_SERIES_MINUTES = int(os.environ.get('LIVE_SERIES_MINUTES', 24 * 60))
+
+# Raw per-count audit events (columnar, one segment per day)
+EVENT_LOG_DIR = os.path.join('data', 'events')
+EVENT_LOG_MAX_ROWS_PER_SEGMENT = int(os.environ.get('EVENT_LOG_MAX_ROWS_PER_SEGMENT', 1_000_000))
+
+# counts_update is sent as coalesced deltas at most this often
+COUNTS_EMIT_MIN_INTERVAL_SEC = float(os.environ.get('COUNTS_EMIT_MIN_INTERVAL_SEC', 0.25))
+
+# SSE / long-poll count streams block on the count hub between updates
+COUNTS_SSE_KEEPALIVE_SEC = float(os.environ.get('COUNTS_SSE_KEEPALIVE_SEC', 15))
+COUNTS_POLL_MAX_TIMEOUT_SEC = float(os.environ.get('COUNTS_POLL_MAX_TIMEOUT_SEC', 30))
+
+# 'threading' for the dev server (python app.py); serve.py runs gevent
+SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+
+# Live video: latest frame per feed, each rendition (width:quality) encoded
+# once per frame and shared by all of its viewers
+STREAM_RENDITIONS = parse_renditions(os.environ.get('STREAM_RENDITIONS', '320:60,640:75,1280:85'))
+STREAM_PUSH_MAX_FPS = float(os.environ.get('STREAM_PUSH_MAX_FPS', 15))
+STREAM_ACK_TIMEOUT_SEC = float(os.environ.get('STREAM_ACK_TIMEOUT_SEC', 2))
+
+# Multi-camera mosaic (composed only while someone is watching)
+MOSAIC_TILE_WIDTH = int(os.environ.get('MOSAIC_TILE_WIDTH', 480))
+MOSAIC_FPS = float(os.environ.get('MOSAIC_FPS', 5))
+MOSAIC_DROP_AFTER_SEC = float(os.environ.get('MOSAIC_DROP_AFTER_SEC', 300))
+
+# Raw-feed passthrough (ffmpeg -c copy to fragmented MP4, no decode)
+PASSTHROUGH_FFMPEG_BIN = os.environ.get('PASSTHROUGH_FFMPEG_BIN', 'ffmpeg')
+PASSTHROUGH_IDLE_TIMEOUT_SEC = float(os.environ.get('PASSTHROUGH_IDLE_TIMEOUT_SEC', 10))
+
+# Capture backend per camera ('opencv', 'pyav' or 'mjpeg'); the default
+# applies to URLs without a Camera row. PyAV decodes with its own threads,
+# downscales straight to numpy and skips non-reference frames when it falls
+# behind. 'mjpeg' reads HTTP MJPEG cameras natively and decodes only the
+# frames the loop consumes (MJPEG_DECODE_SCALE 2/4/8 decodes at 1/N size).
+CAPTURE_BACKENDS = ('opencv', PYAV_BACKEND, MJPEG_BACKEND)
+CAPTURE_BACKEND_DEFAULT = os.environ.get('CAPTURE_BACKEND_DEFAULT', 'opencv')
+PYAV_DECODE_THREADS = int(os.environ.get('PYAV_DECODE_THREADS', 0))  # 0 = auto
+PYAV_THREAD_TYPE = os.environ.get('PYAV_THREAD_TYPE', 'AUTO')
+PYAV_OUTPUT_WIDTH = int(os.environ.get('PYAV_OUTPUT_WIDTH', 1280))  # 0 = native
+PYAV_SKIP_LAG_SEC = float(os.environ.get('PYAV_SKIP_LAG_SEC', 0.5))  # 0 = never skip
+MJPEG_TIMEOUT_SEC = float(os.environ.get('MJPEG_TIMEOUT_SEC', 8))
+MJPEG_DECODE_SCALE = int(os.environ.get('MJPEG_DECODE_SCALE', 1))
+
+# Dual-stream cameras (Camera.substream_url set): detect/track on the
+# low-res substream, embed crops cut from the main stream, which is only
+# converted to BGR when an untracked item needs an embedding
+DUAL_STREAM_ENABLED = os.environ.get('DUAL_STREAM_ENABLED', 'true').lower() == 'true'
+MAIN_STREAM_WAIT_SEC = float(os.environ.get('MAIN_STREAM_WAIT_SEC', 0.2))
+
+# Camera reconnects run on a background supervisor (exponential backoff with
+# jitter); retries use only the last working backend except every Nth attempt
+CAMERA_RECONNECT_BASE_SEC = float(os.environ.get('CAMERA_RECONNECT_BASE_SEC', 0.5))
+CAMERA_RECONNECT_MAX_SEC = float(os.environ.get('CAMERA_RECONNECT_MAX_SEC', 30))
+CAMERA_RECONNECT_FULL_SCAN_EVERY = int(os.environ.get('CAMERA_RECONNECT_FULL_SCAN_EVERY', 3))
+
+# Concurrent probing of URL variants x backends; the winner is cached on the
+# Camera row and opened directly afterwards
+CAMERA_PROBE_WORKERS = int(os.environ.get('CAMERA_PROBE_WORKERS', 8))
+CAMERA_PROBE_TIMEOUT_SEC = float(os.environ.get('CAMERA_PROBE_TIMEOUT_SEC', 6))
+
+# Per-camera stream health (rolling window); the watchdog hot-swaps a camera
+# that delivers no frames for HEALTH_STALL_SEC or repeats the same picture for
+# HEALTH_FROZEN_SEC, before reads start failing
+HEALTH_WINDOW_SEC = float(os.environ.get('HEALTH_WINDOW_SEC', 60))
+HEALTH_STALL_SEC = float(os.environ.get('HEALTH_STALL_SEC', 8))
+HEALTH_FROZEN_SEC = float(os.environ.get('HEALTH_FROZEN_SEC', 10))
+HEALTH_CHECK_INTERVAL_SEC = float(os.environ.get('HEALTH_CHECK_INTERVAL_SEC', 1))
+
+# Per-track embedding cache for tracks that do not lock: once a track has cast
+# LOCK_CONSEC_FRAMES fresh votes without locking (UNKNOWN or flip-flopping
+# labels), its last embedding is reused while the box overlaps the embedded box
+# by EMBED_CACHE_IOU and its area changed by at most EMBED_CACHE_SCALE_TOL, for
+# up to EMBED_CACHE_MAX_AGE frames. A reused embedding updates the shown label
+# but is not a lock vote, so tracks that do lock are never delayed.
+EMBED_CACHE_ENABLED = os.environ.get('EMBED_CACHE_ENABLED', 'true').lower() == 'true'
+EMBED_CACHE_IOU = float(os.environ.get('EMBED_CACHE_IOU', 0.85))
+EMBED_CACHE_SCALE_TOL = float(os.environ.get('EMBED_CACHE_SCALE_TOL', 0.15))
+EMBED_CACHE_MAX_AGE = int(os.environ.get('EMBED_CACHE_MAX_AGE', 4))
+
+# Best-shot embedding: an unlocked track collects its BEST_SHOT_TOP_K best crops
+# (sharpness, size, edge truncation, confidence) for BEST_SHOT_WINDOW_FRAMES
+# processed frames or BEST_SHOT_DEADLINE_SEC, whichever comes first (sooner if
+# they all score BEST_SHOT_GOOD_QUALITY), and embeds only those. Each shot is
+# one lock vote (always freshly embedded), so TOP_K >= LOCK_CONSEC_FRAMES lets
+# a single window lock.
+BEST_SHOT_ENABLED = os.environ.get('BEST_SHOT_ENABLED', 'true').lower() == 'true'
+BEST_SHOT_TOP_K = int(os.environ.get('BEST_SHOT_TOP_K', 2))
+BEST_SHOT_WINDOW_FRAMES = int(os.environ.get('BEST_SHOT_WINDOW_FRAMES', 5))
+BEST_SHOT_DEADLINE_SEC = float(os.environ.get('BEST_SHOT_DEADLINE_SEC', 1.0))
+BEST_SHOT_GOOD_QUALITY = float(os.environ.get('BEST_SHOT_GOOD_QUALITY', 0.6))
+
 # ========================= EXACT UTILITY FUNCTIONS =========================
 def letterbox_resize(image: np.ndarray, target_width: int) -> np.ndarray:
     """EXACT copy from test system"""
@@ -176,6 +325,42 @@ def compute_box_scale(xyxy: np.ndarray, image_shape: tuple) -> float:
     return (w * h) / frame_area
 
 
+def reusable_embedding(state: dict, xyxy: np.ndarray, frame_idx: int):
+    """
+    Embedding cached on a track state if its box is still steady enough, else
+    None. Tracks still within their first LOCK_CONSEC_FRAMES fresh votes always
+    get a fresh embedding, so the cache never holds up a lock.
+    """
+    emb = state.get("emb")
+    if emb is None or not EMBED_CACHE_ENABLED:
+        return None
+    if state.get("fresh_votes", 0) < LOCK_CONSEC_FRAMES:
+        return None
+    if frame_idx - state["emb_frame"] > EMBED_CACHE_MAX_AGE:
+        return None
+    cached_box = state["emb_box"]
+    if bbox_iou(xyxy, cached_box) < EMBED_CACHE_IOU:
+        return None
+    area = max(0.0, float(xyxy[2]) - float(xyxy[0])) * max(0.0, float(xyxy[3]) - float(xyxy[1]))
+    cached_area = max(1e-6, (float(cached_box[2]) - float(cached_box[0])) * (float(cached_box[3]) - float(cached_box[1])))
+    if abs(area / cached_area - 1.0) > EMBED_CACHE_SCALE_TOL:
+        return None
+    return emb
+
+
+def needs_main_crop(state: dict, xyxy: np.ndarray, frame_idx: int) -> bool:
+    """
+    True if an unassociated track will certainly use a main-stream crop this
+    frame: in best-shot mode while its shot buffer still has room (a full
+    buffer depends on the crop's quality), otherwise when it needs a fresh
+    embedding.
+    """
+    if BEST_SHOT_ENABLED:
+        shots = state.get("shots")
+        return shots is None or len(shots.shots) < shots.top_k
+    return reusable_embedding(state, xyxy, frame_idx) is None
+
+
 def scale_similarity_threshold(label: str, base_threshold: float, box_scale: float) -> float:
     """Adjust similarity threshold for small detections."""
     if box_scale is None:
@@ -198,6 +383,7 @@ def scale_similarity_threshold(label: str, base_threshold: float, box_scale: flo
 
 
 def save_detection_artifacts(frame: np.ndarray, label: str, oid: int, bbox: np.ndarray, sim: float):
+    """Queue crop + annotated frame for the background writer (never blocks on disk)."""
     try:
         if frame is None or bbox is None or getattr(bbox, "size", 0) != 4:
             return
@@ -209,15 +395,20 @@ def save_detection_artifacts(frame: np.ndarray, label: str, oid: int, bbox: np.n
         y2 = max(0, min(h, y2))
         if x2 <= x1 or y2 <= y1:
             return
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S_%f")
         safe_label = label.replace(' ', '_') if label else 'unknown'
-        base_name = f"{timestamp}_{safe_label}_id{oid}_sim{sim:.2f}"
-        crop = frame[y1:y2, x1:x2]
-        crop_path = os.path.join(DETECTIONS_DIR, f"{base_name}_crop.jpg")
-        annotated_path = os.path.join(DETECTIONS_DIR, f"{base_name}_annotated.jpg")
-        if crop.size > 0:
-            cv2.imwrite(crop_path, crop)
-        cv2.imwrite(annotated_path, frame)
+        meta = {
+            'ts': now.timestamp(),
+            'camera_id': active_camera_id,
+            'label': label,
+            'oid': oid,
+            'sim': sim,
+            'base_name': f"{timestamp}_{safe_label}_id{oid}_sim{sim:.2f}",
+        }
+        # Copies: the caller keeps drawing on the frame after this returns
+        crop = frame[y1:y2, x1:x2].copy()
+        artifact_writer.submit(meta, crop, frame.copy())
     except Exception as exc:
         print(f"⚠️ Failed to save detection artifacts: {exc}")
 
@@ -314,10 +505,19 @@ app.register_blueprint(schedule_bp)
 # Register ROI blueprint
 app.register_blueprint(roi_bp)
 
+# Register analytics blueprint
+app.register_blueprint(analytics_bp)
+
+# Register export blueprint
+app.register_blueprint(export_bp)
+
+# Register artifact browsing blueprint
+app.register_blueprint(artifact_bp)
+
 # Enable CORS for all routes
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE)
 
 # Create directories
 os.makedirs('static/uploads', exist_ok=True)
@@ -338,6 +538,38 @@ counts = defaultdict(int)
 objects = {}
 tracker_to_object = {}
 next_object_id = 1
+embed_stats = {"computed": 0, "reused": 0}
+checkpointer = StateCheckpointer(CHECKPOINT_DIR, CHECKPOINT_INTERVAL_SEC, CHECKPOINT_MAX_AGE_SEC)
+state_restored = False
+rollups = RollupAggregator(app, ROLLUP_FLUSH_INTERVAL_SEC)
+live_series = LiveSeriesStore(LIVE_SERIES_SECONDS, LIVE_SERIES_MINUTES)
+event_log = EventLog(EVENT_LOG_DIR, EVENT_LOG_MAX_ROWS_PER_SEGMENT)
+artifact_store = ArtifactStore(DETECTIONS_DIR)
+app.extensions['artifact_store'] = artifact_store
+artifact_writer = ArtifactWriter(
+    artifact_store,
+    workers=ARTIFACT_WRITER_THREADS,
+    queue_size=ARTIFACT_QUEUE_SIZE,
+    jpeg_quality=ARTIFACT_JPEG_QUALITY,
+    crop_quality=ARTIFACT_CROP_QUALITY,
+    max_frame_width=ARTIFACT_FRAME_MAX_WIDTH,
+    thumb_width=ARTIFACT_THUMB_WIDTH,
+    frame_retention_days=ARTIFACT_FRAME_RETENTION_DAYS,
+    crop_retention_days=ARTIFACT_CROP_RETENTION_DAYS,
+    quota_bytes=ARTIFACT_QUOTA_MB * 1024 * 1024,
+)
+clip_ring = JpegFrameRing(max(CLIP_RING_SECONDS, CLIP_PRE_SECONDS + CLIP_POST_SECONDS),
+                          CLIP_RING_MAX_MB * 1024 * 1024)
+clip_recorder = ClipRecorder(clip_ring, CLIPS_DIR, CLIP_PRE_SECONDS, CLIP_POST_SECONDS,
+                             quota_bytes=CLIP_QUOTA_MB * 1024 * 1024,
+                             encode=lambda frame: encode_jpeg(frame, None, CLIP_JPEG_QUALITY))
+app.extensions['event_log'] = event_log
+counts_emitter = CountsEmitter(socketio, COUNTS_EMIT_MIN_INTERVAL_SEC)
+stream_hub = StreamHub(STREAM_RENDITIONS)
+frame_pushers = {}  # Socket.IO sid -> FramePusher
+camera_labels = {}  # Camera row id -> display name (mosaic tiles)
+passthrough_streams = {}  # source URL -> PassthroughStream
+count_hub = CountHub()
 
 # Camera and processing
 camera = None
@@ -346,6 +578,14 @@ detection_enabled = False
 annotated_frame = None
 processing_thread = None
 camera_backend = None
+active_capture_backend = CAPTURE_BACKEND_DEFAULT  # configured backend of the active camera
+detection_source_url = None  # URL the detection capture opened (substream / probed variant)
+main_stream = None  # MainStreamReader for the dual-stream main (high-res) stream
+active_camera_id = 0  # Camera row id of camera_url (0 when not registered)
+active_camera_rooms = []  # extra Socket.IO rooms (tenant) for active_camera_id
+camera_health = {}  # Camera row id -> CameraHealth
+retired_captures = []  # hot-swapped captures, released by the detection loop
+tracking_reset_pending = False  # set by a hot swap, applied by the detection loop
 
 BACKENDS_TO_TRY = [
     cv2.CAP_FFMPEG,
@@ -353,49 +593,34 @@ BACKENDS_TO_TRY = [
     cv2.CAP_ANY
 ]
 
+# Stable names for backends stored on Camera rows
+BACKEND_NAMES = {
+    'ffmpeg': cv2.CAP_FFMPEG,
+    'gstreamer': cv2.CAP_GSTREAMER,
+    'any': cv2.CAP_ANY,
+    PYAV_BACKEND: PYAV_BACKEND,
+    MJPEG_BACKEND: MJPEG_BACKEND,
+}
+
 # ========================= MENU MANAGEMENT =========================
+def _menu_user_key():
+    """Menu items are per user; anonymous/background callers get the JSON file view"""
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
 def load_menu_items():
-    """Load menu items from database (with JSON fallback for backward compatibility)"""
+    """Load menu items from the in-memory catalog (DB-backed, JSON fallback)"""
     try:
-        # Try loading from database first
-        if current_user.is_authenticated:
-            with app.app_context():
-                db_items = MenuItem.query.filter_by(user_id=current_user.id).all()
-                items = []
-                for item in db_items:
-                    item_dict = item.to_dict()
-                    # Convert format for backward compatibility
-                    items.append({
-                        'id': item_dict['id'],
-                        'name': item_dict['name'],
-                        'description': '',
-                        'reference_images': [item_dict['image']] if item_dict.get('image') else [],
-                        'created_at': item_dict.get('created_at')
-                    })
-                return items
-        
-        # Fallback to JSON file if not authenticated
-        if os.path.exists(app.config['MENU_DATA_FILE']):
-            with open(app.config['MENU_DATA_FILE'], 'r') as f:
-                menu_data = json.load(f)
-            return menu_data.get('items', [])
-        return []
+        return menu_catalog.items(_menu_user_key())
     except Exception as e:
         print(f"Error loading menu items: {e}")
         return []
 
 
-def save_menu_items(items):
-    """Save menu items to database (with JSON fallback for backward compatibility)"""
-    try:
-        # Also save to JSON for backward compatibility
-        menu_data = {'items': items}
-        with open(app.config['MENU_DATA_FILE'], 'w') as f:
-            json.dump(menu_data, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving menu items: {e}")
-        return False
+menu_catalog = MenuCatalog(app, app.config['MENU_DATA_FILE'])
+menu_snapshots = SnapshotCache(lambda key: {'success': True, 'items': menu_catalog.items(key)})
 
 
 def get_menu_refs():
@@ -430,6 +655,7 @@ def rebuild_prototypes():
     for name in menu_refs.keys():
         counts[name] = 0
     
+    count_hub.publish(counts)
     print(f"🔄 Prototypes rebuilt: {list(prototypes.keys())}")
     return True
 
@@ -448,9 +674,74 @@ def camera_source_from_url(url: str):
     return url
 
 
+def resolve_camera_id(url) -> int:
+    """Look up the Camera row id for a URL (0 when it is not registered)."""
+    try:
+        with app.app_context():
+            cam = Camera.query.filter_by(url=str(url).strip()).first()
+            return cam.id if cam else 0
+    except Exception as e:
+        print(f"Camera lookup error: {e}")
+        return 0
+
+
+def camera_tenant_rooms(camera_id) -> list:
+    """Socket.IO tenant room of a camera's owner (empty when unregistered)."""
+    if not camera_id:
+        return []
+    try:
+        with app.app_context():
+            cam = Camera.query.get(camera_id)
+            return [tenant_room(cam.user_id)] if cam and cam.user_id else []
+    except Exception as e:
+        print(f"Camera owner lookup error: {e}")
+        return []
+
+
+def camera_capture_config(camera_id) -> tuple:
+    """(capture backend, substream URL or None) configured on a Camera row."""
+    if not camera_id:
+        return CAPTURE_BACKEND_DEFAULT, None
+    try:
+        with app.app_context():
+            cam = Camera.query.get(camera_id)
+            if not cam:
+                return CAPTURE_BACKEND_DEFAULT, None
+            substream_url = cam.substream_url.strip() if DUAL_STREAM_ENABLED and cam.substream_url else None
+            return cam.capture_backend or CAPTURE_BACKEND_DEFAULT, substream_url or None
+    except Exception as e:
+        print(f"Camera config lookup error: {e}")
+        return CAPTURE_BACKEND_DEFAULT, None
+
+
+def open_main_stream(source, capture_backend):
+    """Start (or stop, with ``source`` None) the dual-stream main-stream reader."""
+    global main_stream
+    if main_stream is not None:
+        main_stream.stop()
+        main_stream = None
+    if source is None:
+        return
+    backends = capture_backend_order(capture_backend)
+    main_stream = MainStreamReader(
+        lambda: try_open_camera(source, backends=backends, log_attempts=False)[0],
+        name='main').start()
+    print(f"🎥 Main stream reader started for crops: {source}")
+
+
+def capture_backend_order(capture_backend, preferred=None) -> list:
+    """Backends to try: the last working one, the configured native one, then OpenCV's."""
+    order = [preferred] if preferred is not None else []
+    if capture_backend in (PYAV_BACKEND, MJPEG_BACKEND) and capture_backend not in order:
+        order.append(capture_backend)
+    order.extend([b for b in BACKENDS_TO_TRY if b not in order])
+    return order
+
+
 def configure_camera_capture(cap: cv2.VideoCapture):
     """Apply consistent tuning to an opened VideoCapture."""
-    if cap is None:
+    if cap is None or isinstance(cap, (PyAVCapture, MjpegHttpSource)):
+        # Native sources are configured when they are opened
         return
     cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
     cap.set(cv2.CAP_PROP_FPS, 15)
@@ -462,6 +753,31 @@ def configure_camera_capture(cap: cv2.VideoCapture):
         pass
 
 
+def backend_name(backend) -> str:
+    """Stable name of a capture backend ('ffmpeg', 'pyav', ...)."""
+    for name, value in BACKEND_NAMES.items():
+        if value == backend:
+            return name
+    return str(backend)
+
+
+def open_capture(source, backend, timeout_sec=None):
+    """Open ``source`` with one backend (``timeout_sec`` bounds open and reads)."""
+    if backend == PYAV_BACKEND:
+        timeout = timeout_sec or 5.0
+        return PyAVCapture(source, thread_count=PYAV_DECODE_THREADS,
+                           thread_type=PYAV_THREAD_TYPE, output_width=PYAV_OUTPUT_WIDTH,
+                           skip_lag_sec=PYAV_SKIP_LAG_SEC, open_timeout=timeout, read_timeout=timeout)
+    if backend == MJPEG_BACKEND:
+        return MjpegHttpSource(source, timeout=timeout_sec or MJPEG_TIMEOUT_SEC,
+                               decode_scale=MJPEG_DECODE_SCALE)
+    if timeout_sec:
+        timeout_ms = int(timeout_sec * 1000)
+        return cv2.VideoCapture(source, backend, [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                                                  cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
+    return cv2.VideoCapture(source, backend)
+
+
 def try_open_camera(source, backends=None, log_attempts=True):
     """Attempt to open a camera source using a list of backends."""
     backends = backends or BACKENDS_TO_TRY
@@ -470,7 +786,7 @@ def try_open_camera(source, backends=None, log_attempts=True):
         try:
             if log_attempts:
                 print(f"🔄 Trying backend: {backend}")
-            cap = cv2.VideoCapture(source, backend)
+            cap = open_capture(source, backend)
             if cap.isOpened():
                 if log_attempts:
                     print(f"✅ Camera opened successfully with backend: {backend}")
@@ -487,46 +803,135 @@ def try_open_camera(source, backends=None, log_attempts=True):
     return None, None
 
 
-def reset_tracking_state():
-    """Reset in-flight tracking buffers while keeping counts."""
+def probe_camera_row(cam, keep_winner=False) -> dict:
+    """
+    Probe a Camera row's detection URL variants x its backends concurrently
+    and cache the winner on the row (caller commits).
+    """
+    source_url = (cam.substream_url if DUAL_STREAM_ENABLED and cam.substream_url else cam.url).strip()
+    backends = capture_backend_order(cam.capture_backend or CAPTURE_BACKEND_DEFAULT)
+    candidates = [(camera_source_from_url(variant), backend)
+                  for variant in url_variants(source_url) for backend in backends]
+    print(f"🔎 Probing camera {cam.id}: {len(candidates)} URL/backend combinations")
+    result = probe_camera(candidates, open_capture, CAMERA_PROBE_WORKERS,
+                          CAMERA_PROBE_TIMEOUT_SEC, keep_winner=keep_winner)
+    winner = result['winner']
+    if winner:
+        cam.probed_url = str(winner['source'])
+        cam.probed_backend = backend_name(winner['backend'])
+        cam.probed_at = datetime.utcnow()
+        print(f"✅ Probe winner for camera {cam.id}: {cam.probed_url} "
+              f"({cam.probed_backend}, {winner['elapsed_ms']} ms)")
+    else:
+        print(f"❌ Probe found no working source for camera {cam.id}")
+    return result
+
+
+def open_detection_camera(camera_id, source_url, capture_backend):
+    """
+    Open the detection capture: the row's cached probe winner first, then a
+    fresh concurrent probe for registered cameras, else the backend list.
+    Returns (capture, backend, opened_url).
+    """
+    if camera_id:
+        try:
+            with app.app_context():
+                cam = Camera.query.get(camera_id)
+                if cam and cam.probed_url and cam.probed_backend in BACKEND_NAMES:
+                    cap, backend = try_open_camera(camera_source_from_url(cam.probed_url),
+                                                   backends=[BACKEND_NAMES[cam.probed_backend]])
+                    if cap is not None:
+                        return cap, backend, cam.probed_url
+                    print(f"⚠️ Cached source for camera {camera_id} failed, re-probing")
+                if cam:
+                    result = probe_camera_row(cam, keep_winner=True)
+                    db.session.commit()
+                    if result['capture'] is not None:
+                        return result['capture'], result['winner']['backend'], cam.probed_url
+        except Exception as e:
+            print(f"Camera probe error: {e}")
+    cap, backend = try_open_camera(camera_source_from_url(source_url),
+                                   backends=capture_backend_order(capture_backend), log_attempts=True)
+    return cap, backend, source_url
+
+
+def reset_tracking_state(keep_objects=False):
+    """Reset in-flight tracking buffers while keeping counts.
+
+    With ``keep_objects`` the object registry survives so items already
+    counted (e.g. restored from a checkpoint) are re-associated, not recounted.
+    """
     global track_state, objects, tracker_to_object, next_object_id
     track_state.clear()
-    objects.clear()
     tracker_to_object.clear()
-    next_object_id = 1
+    if not keep_objects:
+        objects.clear()
+        next_object_id = 1
     try:
         tracker.reset()
     except AttributeError:
         pass
 
 
-def reconnect_camera(reason: str, *, log_attempts=True) -> bool:
-    """Release and reopen the active camera."""
-    global camera, camera_backend
+def health_for(camera_id):
+    """CameraHealth for a camera row id (created on first use)"""
+    health = camera_health.get(camera_id)
+    if health is None:
+        health = camera_health.setdefault(camera_id, CameraHealth(HEALTH_WINDOW_SEC))
+    return health
+
+
+def open_camera_for_reconnect(attempt: int):
+    """Supervisor opener: last working backend first, the full list every Nth attempt."""
+    source = camera_source_from_url(detection_source_url or camera_url)
+    backends = capture_backend_order(active_capture_backend, camera_backend)
+    if camera_backend is not None and (attempt + 1) % max(1, CAMERA_RECONNECT_FULL_SCAN_EVERY):
+        backends = backends[:1]
+    return try_open_camera(source, backends=backends, log_attempts=False)
+
+
+def swap_in_camera(cap, backend):
+    """Install a reconnected capture, keeping counted objects so they are re-associated.
+
+    The previous capture may still be in use (a health-triggered hot swap), so
+    it is retired and released by the detection loop, which also resets the
+    tracker there.
+    """
+    global camera, camera_backend, tracking_reset_pending
+    configure_camera_capture(cap)
+    old = camera
+    camera_backend = backend
+    camera = cap
+    if old is not None:
+        retired_captures.append(old)
+    tracking_reset_pending = True
+    health_for(active_camera_id).on_reconnect()
+
+
+camera_supervisor = ReconnectSupervisor(open_camera_for_reconnect, swap_in_camera,
+                                        base_delay=CAMERA_RECONNECT_BASE_SEC,
+                                        max_delay=CAMERA_RECONNECT_MAX_SEC)
+
+
+def reconnect_camera(reason: str, failed=None) -> bool:
+    """Drop the active camera and let the supervisor reopen it in the background.
+
+    ``failed`` is the capture that errored; if it has already been swapped
+    out, the replacement is left alone.
+    """
+    global camera
     if not camera_url:
         print(f"❌ Cannot reconnect camera ({reason}) - camera_url empty")
         return False
-    source = camera_source_from_url(camera_url)
-    preferred_backends = []
-    if camera_backend is not None:
-        preferred_backends.append(camera_backend)
-    preferred_backends.extend([b for b in BACKENDS_TO_TRY if b not in preferred_backends])
-    print(f"♻️ Attempting camera reconnect ({reason})")
+    if failed is not None and failed is not camera:
+        return True
     if camera is not None:
         try:
             camera.release()
         except Exception:
             pass
         camera = None
-    cap, backend = try_open_camera(source, backends=preferred_backends, log_attempts=log_attempts)
-    if cap is None:
-        print("🛑 Camera reconnection failed")
-        return False
-    camera = cap
-    camera_backend = backend
-    configure_camera_capture(camera)
-    reset_tracking_state()
-    print(f"✅ Camera reconnected with backend: {backend}")
+    camera_supervisor.request(reason)
     return True
 
 
@@ -540,14 +945,15 @@ def color_for_oid(oid: int) -> tuple:
     )
 
 
-def handle_camera_error(reason: str, error=None):
-    """Log a camera error and trigger recovery."""
+def handle_camera_error(reason: str, error=None, failed=None):
+    """Log a camera error and trigger a background reconnect."""
     global detection_enabled
     if error is not None:
         print(f"❌ Camera error during {reason}: {error}")
     else:
         print(f"❌ Camera error during {reason}")
-    if not reconnect_camera(reason):
+    health_for(active_camera_id).on_error()
+    if not reconnect_camera(reason, failed):
         detection_enabled = False
         print("🛑 Detection stopped - unable to recover camera")
 
@@ -581,9 +987,45 @@ def initialize_detection_system():
     # Build initial prototypes
     rebuild_prototypes()
     
+    # Resume counts and known objects from the last checkpoint
+    restore_checkpoint()
+    
     print("✅ Detection system initialized!")
 
 
+def restore_checkpoint():
+    """Restore counts and the object registry from a fresh checkpoint."""
+    global next_object_id, state_restored
+    
+    started = time.perf_counter()
+    state = checkpointer.load()
+    if state is None:
+        return False
+    
+    for name, value in state['counts'].items():
+        if name in counts:
+            counts[name] = int(value)
+    
+    objects.clear()
+    for oid, obj in state['objects'].items():
+        if obj.get('label') not in counts or obj.get('bbox') is None:
+            continue
+        objects[oid] = {
+            "label": obj['label'],
+            "bbox": np.array(obj['bbox'], dtype=np.float32),
+            "last_seen": 0,
+            "sim": obj.get('sim', 0.0),
+            "box_scale": obj.get('box_scale'),
+        }
+    next_object_id = max(state['next_object_id'], max(objects.keys(), default=0) + 1)
+    state_restored = True
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    print(f"♻️ Restored checkpoint ({state['age']:.0f}s old) in {elapsed_ms:.1f} ms: "
+          f"{dict(counts)}, {len(objects)} live objects")
+    return True
+
+
 def reset_detection_state():
     """Reset all detection state for fresh start (EXACT from test)"""
     global track_state, counts, objects, tracker_to_object, next_object_id
@@ -599,13 +1041,15 @@ def reset_detection_state():
     for name in menu_refs.keys():
         counts[name] = 0
     
+    checkpointer.snapshot(counts, objects, next_object_id)
+    count_hub.publish(counts, force=True)
     print("🔄 Detection state reset")
 
 
 # ========================= MAIN PROCESSING LOOP =========================
 def detection_processing_loop():
     """Optimized detection loop with frame synchronization and schedule checking"""
-    global detection_enabled, camera, annotated_frame, track_state, counts, objects, tracker_to_object, next_object_id
+    global detection_enabled, camera, annotated_frame, track_state, counts, objects, tracker_to_object, next_object_id, tracking_reset_pending
     
     frame_idx = 0
     last_time = time.time()
@@ -630,39 +1074,59 @@ def detection_processing_loop():
                         print("⏰ Within scheduled hours - resuming detection")
                         detection_enabled = True
             
+            # Captures replaced by a hot swap are released here, off the grab path
+            while retired_captures:
+                try:
+                    retired_captures.pop().release()
+                except Exception:
+                    pass
+            if tracking_reset_pending:
+                tracking_reset_pending = False
+                reset_tracking_state(keep_objects=True)
+            
             if not detection_enabled:
                 time.sleep(0.1)
                 continue
             
-            if camera is None or not camera.isOpened():
-                if reconnect_camera("camera unavailable in processing loop", log_attempts=False):
-                    time.sleep(0.05)
-                    continue
-                time.sleep(0.5)
+            cap = camera
+            if cap is None or not cap.isOpened():
+                # Viewers keep the last good frame while the supervisor reconnects
+                if not camera_supervisor.active:
+                    reconnect_camera("camera unavailable in processing loop")
+                time.sleep(0.1)
                 continue
             
+            health = health_for(active_camera_id)
             try:
-                for _ in range(3):  # Clear up to 3 buffered frames
-                    ret = camera.grab()
+                for drained in range(3):  # Clear up to 3 buffered frames
+                    ret = cap.grab()
                     if not ret:
                         break
+                    # Stream timestamp when the backend has one; otherwise only
+                    # the first (blocking) grab is timed, not the buffer drain
+                    pos_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+                    health.on_grab(pos_msec / 1000.0 if pos_msec > 0 else None, drained=drained > 0)
             except cv2.error as e:
-                handle_camera_error("camera.grab()", e)
+                handle_camera_error("camera.grab()", e, cap)
                 time.sleep(0.2)
                 continue
             
             try:
-                ok, frame = camera.retrieve()
+                ok, frame = cap.retrieve()
             except cv2.error as e:
-                handle_camera_error("camera.retrieve()", e)
+                handle_camera_error("camera.retrieve()", e, cap)
                 time.sleep(0.2)
                 continue
             
             if not ok or frame is None:
-                handle_camera_error("camera.retrieve()", "empty frame")
+                handle_camera_error("camera.retrieve()", "empty frame", cap)
                 time.sleep(0.2)
                 continue
             
+            t_captured = time.monotonic()
+            health.on_retrieve(frame)
+            stream_hub.publish('raw', frame)
+            
             # Frame rate control - only process every nth frame
             current_time = time.time()
             if current_time - last_time < frame_interval:
@@ -694,12 +1158,24 @@ def detection_processing_loop():
             
             tracked = tracker.update_with_detections(detections)
             
+            # Dual-stream: fetch a main-stream frame only if some track will surely need a
+            # crop from it; otherwise main_reader.frame() requests one on demand
+            main_reader, main_frame = main_stream, None
+            if main_reader is not None and tracked.tracker_id is not None and any(
+                    tracker_to_object.get(int(tid)) not in objects
+                    and needs_main_crop(track_state.get(int(tid), {}), box, frame_idx)
+                    for tid, box in zip(tracked.tracker_id, tracked.xyxy)):
+                main_reader.request()
+            
             # GC stale objects (EXACT from test)
             stale_oids = [oid for oid, obj in list(objects.items()) if frame_idx - obj.get("last_seen", frame_idx) > OBJECT_TTL_FRAMES]
             for oid in stale_oids:
                 del objects[oid]
                 # remove any tracker mappings to this object
                 tracker_to_object = {tid: o for tid, o in tracker_to_object.items() if o != oid}
+            # Drop state (and cached embeddings) of tracks the tracker has let go
+            for tid in [tid for tid, st in track_state.items() if frame_idx - st.get("last_seen", frame_idx) > OBJECT_TTL_FRAMES]:
+                del track_state[tid]
             
             annotations = []
             pending_saves = []
@@ -720,6 +1196,7 @@ def detection_processing_loop():
                     prompt_name = YOLO_PROMPTS[class_id]
                 
                 state = track_state.get(track_id, {"locked": False, "label": "UNKNOWN", "sim": 0.0})
+                shot_labels = None  # lock votes from this frame (default: [label])
                 
                 # If this tracker is already associated to an object, reuse its label (skip embedding) (EXACT from test)
                 associated_oid = tracker_to_object.get(track_id, None)
@@ -728,15 +1205,61 @@ def detection_processing_loop():
                     sim = state.get("sim", 1.0)
                     margin = 1.0
                     objects[associated_oid]["box_scale"] = box_scale
+                elif BEST_SHOT_ENABLED:
+                    # Collect the track's best crops; embed only those once the window closes
+                    shots = state.get("shots")
+                    if shots is None:
+                        shots = state["shots"] = BestShots(BEST_SHOT_TOP_K)
+                    conf = float(tracked.confidence[i]) if tracked.confidence is not None else None
+                    quality = crop_quality(crop, xyxy_box, frame_disp.shape, conf)
+                    if main_reader is not None and shots.accepts(quality):
+                        if main_frame is None:
+                            main_frame = main_reader.frame(MAIN_STREAM_WAIT_SEC, newer_than=t_captured)
+                        main_crop = main_reader.crop(main_frame, xyxy_box, frame_disp.shape)
+                        if main_crop is not None:
+                            crop = main_crop
+                    shots.offer(quality, crop, xyxy_box, frame_idx)
+                    label, sim, margin = "UNKNOWN", state.get("sim", 0.0), 0.0
+                    shot_labels = []
+                    if shots.ready(BEST_SHOT_WINDOW_FRAMES, BEST_SHOT_DEADLINE_SEC, BEST_SHOT_GOOD_QUALITY):
+                        del state["shots"]
+                        # Every shot is embedded (no cache) so each vote is independent;
+                        # the best shot decides label/sim and is cached afterwards
+                        votes = []
+                        for _, shot_crop, shot_box, _ in shots.shots:
+                            emb = embedder.embed(shot_crop)
+                            embed_stats["computed"] += 1
+                            votes.append((emb, match_to_menu(
+                                emb, prototypes, box_scale=compute_box_scale(shot_box, frame_disp.shape))))
+                        _, _, best_box, best_frame = shots.shots[0]
+                        state["emb"], state["emb_box"], state["emb_frame"] = votes[0][0], best_box, best_frame
+                        label, sim, margin = votes[0][1]
+                        shot_labels = [vote[1][0] for vote in votes]
                 else:
-                    emb = embedder.embed(crop)
+                    emb = reusable_embedding(state, xyxy_box, frame_idx)
+                    if emb is not None:
+                        embed_stats["reused"] += 1
+                        # Refreshes the shown label/sim, but only fresh embeddings vote for a lock
+                        shot_labels = []
+                    else:
+                        if main_reader is not None:
+                            if main_frame is None:
+                                main_frame = main_reader.frame(MAIN_STREAM_WAIT_SEC, newer_than=t_captured)
+                            main_crop = main_reader.crop(main_frame, xyxy_box, frame_disp.shape)
+                            if main_crop is not None:
+                                crop = main_crop
+                        emb = embedder.embed(crop)
+                        embed_stats["computed"] += 1
+                        state["emb"], state["emb_box"], state["emb_frame"] = emb, np.array(xyxy_box), frame_idx
+                        state["fresh_votes"] = state.get("fresh_votes", 0) + 1
                     label, sim, margin = match_to_menu(emb, prototypes, box_scale=box_scale)
                 
                 # Temporal lock (EXACT from test)
-                history = state.get("hist", deque(maxlen=3))
-                history.append(label)
+                history = state.get("hist", deque(maxlen=max(3, BEST_SHOT_TOP_K)))
+                history.extend([label] if shot_labels is None else shot_labels)
                 state["hist"] = history
                 state["box_scale"] = box_scale
+                state["last_seen"] = frame_idx
                 
                 if not state.get("locked", False):
                     if len(history) >= LOCK_CONSEC_FRAMES and all(h == label and label != "UNKNOWN" for h in list(history)[-LOCK_CONSEC_FRAMES:]):
@@ -758,11 +1281,19 @@ def detection_processing_loop():
                             tracker_to_object[track_id] = target_oid
                             if label in counts:
                                 counts[label] += 1
+                                checkpointer.record_count(label, target_oid, xyxy_box, sim, counts[label])
+                                rollups.record(label, active_camera_id)
+                                live_series.record(label)
+                                event_log.append(label, active_camera_id, target_oid, sim, box_scale, xyxy_box)
                                 try:
                                     print(f"✅ Count incremented: {label} -> {counts[label]} (oid {target_oid}, sim {sim:.2f}, scale {box_scale if box_scale else 0:.4f})")
                                 except Exception:
                                     pass
                             pending_saves.append({"label": label, "oid": target_oid, "sim": sim})
+                            if CLIP_CAPTURE_ENABLED:
+                                clip_recorder.trigger(
+                                    f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{label.replace(' ', '_')}_id{target_oid}"
+                                )
 
                         objects[target_oid] = {
                             "label": label,
@@ -775,6 +1306,8 @@ def detection_processing_loop():
                         state["locked"] = True
                         state["label"] = label
                         state["sim"] = sim
+                        state.pop("emb", None)
+                        state.pop("shots", None)
                     else:
                         state["label"] = label
                         state["sim"] = sim
@@ -864,15 +1397,19 @@ def detection_processing_loop():
             
             # Store annotated frame for web streaming
             annotated_frame = frame_disp
+            stream_hub.publish('processed', frame_disp)
+            health.on_processed(t_captured)
+            stream_hub.publish(f"camera:{active_camera_id}", frame_disp)
             
-            # Emit counts to frontend
-            try:
-                socketio.emit('counts_update', {
-                    'counts': dict(counts),
-                    'timestamp': datetime.now().isoformat()
-                }, broadcast=True)
-            except Exception:
-                pass
+            # Keep recent frames for event clips (JPEG-encoded on the clip encoder thread)
+            if CLIP_CAPTURE_ENABLED:
+                clip_recorder.submit(frame_disp)
+            
+            checkpointer.maybe_snapshot(counts, objects, next_object_id)
+            
+            # Queue changed counts for the coalesced emitter (no-op if unchanged)
+            counts_emitter.publish(counts, active_camera_id, active_camera_rooms)
+            count_hub.publish(counts)
             
             frame_idx += 1
             
@@ -933,8 +1470,7 @@ def serve_react(path):
 @app.route('/api/menu_items', methods=['GET'])
 def get_menu_items():
     """Get all menu items"""
-    items = load_menu_items()
-    return jsonify({'success': True, 'items': items})
+    return snapshot_response(menu_snapshots.get(_menu_user_key()))
 
 
 @app.route('/api/cameras', methods=['GET'])
@@ -958,39 +1494,155 @@ def get_cameras():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/cameras/<int:camera_id>', methods=['PATCH'])
+@auth_required
+def update_camera(camera_id):
+    """Update camera capture settings (backend, substream URL); applies on next start"""
+    try:
+        cam = Camera.query.get(camera_id)
+        if not cam or (not current_user.is_admin() and cam.user_id != current_user.id):
+            return jsonify({'error': 'Camera not found'}), 404
+        
+        data = request.get_json() or {}
+        capture_backend = data.get('capture_backend')
+        if capture_backend is not None:
+            if capture_backend not in CAPTURE_BACKENDS:
+                return jsonify({'error': f'Invalid capture_backend. Use one of {list(CAPTURE_BACKENDS)}'}), 400
+            cam.capture_backend = capture_backend
+        if 'substream_url' in data:
+            cam.substream_url = (data.get('substream_url') or '').strip() or None
+        if capture_backend is not None or 'substream_url' in data:
+            # The cached probe result may no longer apply
+            cam.probed_url = cam.probed_backend = cam.probed_at = None
+        db.session.commit()
+        
+        return jsonify({'success': True, 'camera': cam.to_dict()}), 200
+    except Exception as e:
+        print(f"Error updating camera: {e}")
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cameras/<int:camera_id>/health', methods=['GET'])
+@auth_required
+def camera_health_route(camera_id):
+    """Rolling stream health of a camera (FPS, gaps, lag, errors, freezes, reconnects)"""
+    try:
+        cam = Camera.query.get(camera_id)
+        if not cam or (not current_user.is_admin() and cam.user_id != current_user.id):
+            return jsonify({'error': 'Camera not found'}), 404
+        
+        active = camera_id == active_camera_id and camera is not None
+        health = camera_health.get(camera_id)
+        return jsonify({
+            'success': True,
+            'camera_id': camera_id,
+            'active': active,
+            'reconnecting': camera_id == active_camera_id and camera_supervisor.active,
+            'backend': backend_name(camera_backend) if active else None,
+            'health': health.stats() if health else None,
+        }), 200
+    except Exception as e:
+        print(f"Error reading camera health: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/cameras/<int:camera_id>/probe', methods=['POST'])
+@auth_required
+def probe_camera_route(camera_id):
+    """Probe URL variants x backends concurrently and cache the working pair"""
+    try:
+        cam = Camera.query.get(camera_id)
+        if not cam or (not current_user.is_admin() and cam.user_id != current_user.id):
+            return jsonify({'error': 'Camera not found'}), 404
+        
+        result = run_blocking(probe_camera_row, cam)
+        db.session.commit()
+        attempts = [dict(a, backend=backend_name(a['backend']), source=str(a['source']))
+                    for a in result['attempts']]
+        if not result['winner']:
+            return jsonify({'error': 'No working URL/backend combination found',
+                            'attempts': attempts, 'elapsed_ms': result['elapsed_ms']}), 422
+        
+        return jsonify({
+            'success': True,
+            'camera': cam.to_dict(),
+            'winner': dict(result['winner'], backend=cam.probed_backend, source=cam.probed_url),
+            'attempts': attempts,
+            'elapsed_ms': result['elapsed_ms'],
+        }), 200
+    except Exception as e:
+        print(f"Error probing camera: {e}")
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+_placeholder_cache = {}
+
+
+def placeholder_jpeg(text):
+    """Cached JPEG of a black frame with a status message"""
+    if text not in _placeholder_cache:
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        cv2.putText(frame, text, (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        _placeholder_cache[text] = cv2.imencode('.jpg', frame)[1].tobytes()
+    return _placeholder_cache[text]
+
+
+def read_latest_frame(cap):
+    """Drop buffered frames and decode the newest one"""
+    for _ in range(2):
+        if not cap.grab():
+            break
+    return cap.retrieve()
+
+
+def requested_stream_width():
+    """?w=<px>, else the browser's viewport-width client hint, else None (largest)"""
+    width = request.args.get('w', type=int)
+    if width is None:
+        width = request.headers.get('Sec-CH-Viewport-Width', type=int) \
+            or request.headers.get('Viewport-Width', type=int)
+    return width
+
+
 @app.route('/api/video_feed')
 def video_feed():
-    """Stream RAW camera frames without detection overlays"""
+    """Stream RAW camera frames without detection overlays (?w= picks a rendition)"""
+    width = stream_hub.pick_width(requested_stream_width())
+    quality = stream_hub.quality[width]
+    
     def generate_raw_frames():
         raw_camera = None
         last_frame = None
+        last_seq = 0
         
         while True:
             try:
+                # The detection loop is already reading the camera: share its frames
+                if stream_hub.is_fresh('raw'):
+                    if raw_camera:
+                        raw_camera.release()
+                        raw_camera = None
+                    seq, frame_bytes = stream_hub.jpeg('raw', width)
+                    if frame_bytes is not None and seq != last_seq:
+                        yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                        last_seq = seq
+                    time.sleep(0.05)
+                    stream_hub.wait('raw', last_seq, timeout=1.0)
+                    continue
+                
                 # Initialize raw camera if needed
                 if raw_camera is None and camera_url and camera_url != "":
                     try:
                         camera_source = camera_source_from_url(camera_url)
-                        preferred_backends = []
-                        if camera_backend is not None:
-                            preferred_backends.append(camera_backend)
-                        preferred_backends.extend([b for b in BACKENDS_TO_TRY if b not in preferred_backends])
-                        for backend in preferred_backends:
-                            try:
-                                raw_camera = cv2.VideoCapture(camera_source, backend)
-                                if raw_camera.isOpened():
-                                    raw_camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                                    raw_camera.set(cv2.CAP_PROP_FPS, 20)
-                                    print(f"📹 Raw camera stream initialized: {camera_url} (backend: {backend})")
-                                    break
-                                else:
-                                    raw_camera.release()
-                                    raw_camera = None
-                            except Exception as e:
-                                print(f"Raw camera backend {backend} failed: {e}")
-                                if raw_camera:
-                                    raw_camera.release()
-                                    raw_camera = None
+                        preferred_backends = capture_backend_order(active_capture_backend, camera_backend)
+                        raw_camera, backend = try_open_camera(camera_source, backends=preferred_backends,
+                                                              log_attempts=False)
+                        if raw_camera is not None:
+                            raw_camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                            raw_camera.set(cv2.CAP_PROP_FPS, 20)
+                            print(f"📹 Raw camera stream initialized: {camera_url} (backend: {backend})")
                         
                         if raw_camera is None:
                             print(f"❌ Failed to initialize raw camera: {camera_url}")
@@ -1001,13 +1653,7 @@ def video_feed():
                 
                 # Get raw frame
                 if raw_camera and raw_camera.isOpened():
-                    # Clear buffer for latest frame
-                    for _ in range(2):
-                        ret = raw_camera.grab()
-                        if not ret:
-                            break
-                    
-                    ret, frame = raw_camera.retrieve()
+                    ret, frame = run_blocking(read_latest_frame, raw_camera)
                     if ret and frame is not None:
                         last_frame = frame.copy()
                     else:
@@ -1025,11 +1671,9 @@ def video_feed():
                                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
                 
                 # Encode and stream frame
-                encode_params = [cv2.IMWRITE_JPEG_QUALITY, 90]
-                ret, buffer = cv2.imencode('.jpg', last_frame, encode_params)
+                frame_bytes = run_blocking(encode_jpeg, last_frame, width, quality)
                 
-                if ret:
-                    frame_bytes = buffer.tobytes()
+                if frame_bytes:
                     yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
                 
                 # 20 FPS for smooth raw streaming
@@ -1045,32 +1689,121 @@ def video_feed():
     return Response(generate_raw_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
+def camera_label(camera_id):
+    """Cached camera name for overlays"""
+    if camera_id not in camera_labels:
+        name = None
+        if camera_id:
+            try:
+                with app.app_context():
+                    cam = Camera.query.get(camera_id)
+                    name = cam.name if cam else None
+            except Exception as e:
+                print(f"Camera label lookup error: {e}")
+        camera_labels[camera_id] = name or f"Camera {camera_id}"
+    return camera_labels[camera_id]
+
+
+def mosaic_sources():
+    """Every camera feed published recently (each capture loop publishes camera:<id>)"""
+    sources = []
+    for feed in sorted(stream_hub.feed_names('camera:')):
+        if stream_hub.is_fresh(feed, MOSAIC_DROP_AFTER_SEC):
+            sources.append((camera_label(int(feed.split(':', 1)[1])), feed))
+    return sources
+
+
+mosaic = MosaicComposer(stream_hub, mosaic_sources, MOSAIC_TILE_WIDTH, MOSAIC_FPS)
+
+
+@app.route('/api/mosaic_feed')
+def mosaic_feed():
+    """One MJPEG grid of all active cameras, composed and encoded once for all viewers"""
+    width = requested_stream_width()
+    
+    def generate():
+        mosaic.acquire()
+        last_seq = 0
+        try:
+            while True:
+                stream_hub.wait('mosaic', last_seq, timeout=2.0)
+                seq, frame_bytes = stream_hub.jpeg('mosaic', width)
+                if frame_bytes is not None and seq != last_seq:
+                    yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                    last_seq = seq
+        finally:
+            # Runs when the client disconnects and the generator is closed
+            mosaic.release()
+    
+    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+
+@app.route('/api/video_passthrough')
+def video_passthrough():
+    """Raw camera video remuxed to fragmented MP4 (no decode/re-encode); ?camera_id= optional"""
+    if not ffmpeg_available(PASSTHROUGH_FFMPEG_BIN):
+        return jsonify({'error': 'Passthrough requires ffmpeg on the server'}), 501
+    source = camera_url
+    camera_id = request.args.get('camera_id', type=int)
+    if camera_id is not None:
+        # Another registered camera: only its owner (or an admin) may view it
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Authentication required'}), 401
+        cam = Camera.query.get(camera_id)
+        if not cam or (not current_user.is_admin() and cam.user_id != current_user.id):
+            return jsonify({'error': 'Camera not found'}), 404
+        source = cam.url
+    if not source or isinstance(camera_source_from_url(source), int):
+        return jsonify({'error': 'Passthrough needs a network stream or file source'}), 400
+    
+    source = str(source).strip()
+    stream = passthrough_streams.get(source)
+    if stream is None:
+        stream = passthrough_streams.setdefault(
+            source, PassthroughStream(source, PASSTHROUGH_FFMPEG_BIN, PASSTHROUGH_IDLE_TIMEOUT_SEC))
+    
+    init_segment, subscriber = stream.subscribe()
+    if init_segment is None:
+        return jsonify({'error': 'Camera stream did not start'}), 503
+    
+    def generate():
+        try:
+            # Late joiners get the cached init segment, then the next keyframe fragment
+            yield init_segment
+            for fragment in stream.iter_fragments(subscriber):
+                yield fragment
+        finally:
+            stream.unsubscribe(subscriber)
+    
+    response = Response(generate(), mimetype='video/mp4')
+    response.headers['Cache-Control'] = 'no-store'
+    if stream.codecs:
+        # For MediaSource: addSourceBuffer(`video/mp4; codecs="${codecs}"`)
+        response.headers['X-Content-Codecs'] = stream.codecs
+        response.headers['Access-Control-Expose-Headers'] = 'X-Content-Codecs'
+    return response
+
+
 @app.route('/api/video_feed_processed')
 def video_feed_processed():
-    """Stream annotated frames with detection overlays (for debugging)"""
+    """Stream annotated frames with detection overlays (?w= picks a rendition)"""
+    width = requested_stream_width()
+    
     def generate():
-        last_frame = None
+        last_seq = 0
         
         while True:
             try:
-                if annotated_frame is not None:
-                    current_frame = annotated_frame.copy()
-                    if last_frame is None or not np.array_equal(current_frame, last_frame):
-                        last_frame = current_frame
-                else:
-                    if last_frame is None:
-                        last_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-                        cv2.putText(last_frame, 'Processing...', (50, 240), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                
-                encode_params = [cv2.IMWRITE_JPEG_QUALITY, 85]
-                ret, buffer = cv2.imencode('.jpg', last_frame, encode_params)
-                
-                if ret:
-                    frame_bytes = buffer.tobytes()
+                # Shared JPEG of the newest annotated frame (encoded once for all viewers)
+                seq, frame_bytes = stream_hub.jpeg('processed', width)
+                if frame_bytes is None:
+                    frame_bytes = placeholder_jpeg('Processing...')
+                if seq != last_seq or seq == 0:
                     yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                    last_seq = seq
                 
                 time.sleep(0.067)  # ~15 FPS
+                stream_hub.wait('processed', last_seq, timeout=1.0)
                 
             except Exception as e:
                 print(f"Processed video feed error: {e}")
@@ -1079,46 +1812,116 @@ def video_feed_processed():
     return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
+def snapshot_response(snapshot):
+    """Serve a pre-serialized snapshot; 304 when the client already has it"""
+    if request.if_none_match.contains(snapshot.etag):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    # Always revalidate, but let the browser reuse the body on a 304
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 @app.route('/api/counts', methods=['GET'])
 def get_counts():
     """Get current counts"""
+    # No-op unless counts changed outside the detection loop
+    count_hub.publish(counts)
+    return snapshot_response(count_hub.snapshot)
+
+
+@app.route('/api/live_series', methods=['GET'])
+def get_live_series():
+    """Get downsampled per-item count series and rates for live charts"""
+    resolution = request.args.get('resolution', 'second')
+    if resolution not in LiveSeriesStore.RESOLUTIONS:
+        return jsonify({'error': f'Invalid resolution. Use one of {list(LiveSeriesStore.RESOLUTIONS)}'}), 400
+    points = max(3, min(request.args.get('points', 300, type=int), 2000))
+    items = request.args.getlist('item') or None
+    body = live_series.series_json(resolution, points, items)
+    return Response(body, mimetype='application/json')
+
+
+@app.route('/api/events', methods=['GET'])
+@auth_required
+def get_events():
+    """Get raw count events for a time range (audit trail)"""
+    try:
+        end = request.args.get('end')
+        start = request.args.get('start')
+        end_dt = datetime.fromisoformat(end) if end else datetime.now()
+        start_dt = datetime.fromisoformat(start) if start else end_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use ISO 8601'}), 400
+    
+    # Clients only see their own cameras (plus the unregistered camera 0)
+    camera_id = request.args.get('camera_id', type=int)
+    allowed_ids = allowed_camera_ids()
+    if camera_id is not None and allowed_ids is not None and camera_id not in allowed_ids:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    limit = max(1, min(request.args.get('limit', 1000, type=int), 10000))
+    rows = event_log.iter_rows(
+        start_dt.timestamp(),
+        end_dt.timestamp(),
+        camera_id=camera_id,
+        item=request.args.get('item') or None,
+        camera_ids=allowed_ids,
+    )
+    events = list(islice(rows, limit))
     return jsonify({
-        'counts': dict(counts),
-        'timestamp': datetime.now().isoformat()
+        'success': True,
+        'start': start_dt.isoformat(),
+        'end': end_dt.isoformat(),
+        'events': events,
+        'truncated': len(events) == limit
     })
 
 
 @app.route('/api/counts_sse')
 def counts_sse():
     """Server-Sent Events for live count updates"""
+    # Resume from the browser's Last-Event-ID so reconnects don't replay
+    since = request.headers.get('Last-Event-ID', type=int)
+    since = -1 if since is None else since
+    
     def generate():
-        last_counts = {}
+        version = since
         while True:
-            current = dict(counts)
-            if current != last_counts:
-                data = json.dumps({
-                    'counts': current,
-                    'timestamp': datetime.now().isoformat()
-                })
-                yield f"data: {data}\n\n"
-                last_counts = current.copy()
-            time.sleep(0.5)
+            snapshot = count_hub.wait_newer(version, COUNTS_SSE_KEEPALIVE_SEC)
+            if snapshot.version == version:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            version = snapshot.version
+            yield b"id: %d\ndata: " % version + snapshot.body + b"\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/counts_poll', methods=['GET'])
+def counts_poll():
+    """Long-poll: returns as soon as counts are newer than ?since=<version>"""
+    since = request.args.get('since', -1, type=int)
+    timeout = request.args.get('timeout', 25, type=float)
+    timeout = max(0.0, min(timeout, COUNTS_POLL_MAX_TIMEOUT_SEC))
     
-    return Response(generate(), mimetype='text/event-stream')
+    snapshot = count_hub.wait_newer(since, timeout)
+    payload = snapshot.to_dict()
+    payload['changed'] = snapshot.version != since
+    return jsonify(payload)
 
 
 @app.route('/api/reset_counts', methods=['POST'])
 def reset_counts():
     """Reset all counts"""
     reset_detection_state()
-    
-    try:
-        socketio.emit('counts_update', {
-            'counts': dict(counts),
-            'timestamp': datetime.now().isoformat()
-        }, broadcast=True)
-    except Exception:
-        pass
+    counts_emitter.publish(counts, active_camera_id, active_camera_rooms, full=True)
     
     return jsonify({'success': True, 'message': 'Counts reset successfully'})
 
@@ -1126,7 +1929,7 @@ def reset_counts():
 @app.route('/api/start_detection', methods=['POST'])
 def start_detection():
     """Start detection with camera URL"""
-    global detection_enabled, camera, camera_url, processing_thread, camera_backend
+    global detection_enabled, camera, camera_url, processing_thread, camera_backend, active_camera_id, active_camera_rooms, active_capture_backend, detection_source_url
     
     try:
         data = request.get_json()
@@ -1135,7 +1938,8 @@ def start_detection():
         if not camera_url:
             return jsonify({'error': 'Camera URL is required'}), 400
         
-        # Initialize camera
+        # Initialize camera (abandoning any reconnect of the previous one)
+        camera_supervisor.cancel()
         if camera is not None:
             camera.release()
         
@@ -1145,21 +1949,30 @@ def start_detection():
         else:
             print(f"🎥 Using camera URL: {camera_source}")
         
-        cap, backend = try_open_camera(camera_source, log_attempts=True)
+        camera_id = resolve_camera_id(camera_url)
+        capture_backend, substream_url = camera_capture_config(camera_id)
+        if substream_url:
+            print(f"🎥 Dual-stream: detecting on substream {substream_url}")
+        cap, backend, opened_url = open_detection_camera(camera_id, substream_url or camera_url, capture_backend)
         if cap is None:
             return jsonify({'error': f'Failed to open camera: {camera_url}. Please check the URL and ensure the camera is accessible.'}), 500
         
         camera = cap
         camera_backend = backend
+        active_capture_backend = capture_backend
+        detection_source_url = opened_url
+        open_main_stream(camera_source if substream_url else None, capture_backend)
+        active_camera_id = camera_id
+        active_camera_rooms = camera_tenant_rooms(active_camera_id)
         configure_camera_capture(camera)
         reset_tracking_state()
+        health_for(active_camera_id).on_open()
         
         detection_enabled = True
         
         # Start processing thread if not already running
         if processing_thread is None or not processing_thread.is_alive():
-            processing_thread = threading.Thread(target=detection_processing_loop, daemon=True)
-            processing_thread.start()
+            processing_thread = start_native_thread(detection_processing_loop, name='detection')
         
         print(f"🎥 Detection started with camera: {camera_url}")
         return jsonify({'success': True, 'message': f'Detection started with camera: {camera_url}'})
@@ -1176,10 +1989,12 @@ def stop_detection():
     try:
         detection_enabled = False
         
+        camera_supervisor.cancel()
         if camera is not None:
             camera.release()
             camera = None
         camera_backend = None
+        open_main_stream(None, None)
         reset_tracking_state()
         
         print("🛑 Detection stopped")
@@ -1231,17 +2046,15 @@ def add_menu_item():
         db.session.add(menu_item)
         db.session.commit()
         
-        # Also save to JSON for backward compatibility
-        items = load_menu_items()
-        new_item = {
+        # Write through to the catalog (JSON mirror is written in the background)
+        menu_catalog.add(current_user.id, {
             'id': menu_item.id,
             'name': name,
             'description': description,
             'reference_images': [relative_path],
             'created_at': datetime.now().isoformat()
-        }
-        items.append(new_item)
-        save_menu_items(items)
+        })
+        menu_snapshots.invalidate()
         
         # Rebuild prototypes
         rebuild_prototypes()
@@ -1273,16 +2086,9 @@ def delete_menu_item(item_id):
         db.session.delete(menu_item)
         db.session.commit()
         
-        # Also remove from JSON for backward compatibility
-        items = load_menu_items()
-        item_to_delete = None
-        for i, item in enumerate(items):
-            if item.get('id') == item_id:
-                item_to_delete = items.pop(i)
-                break
-        
-        if item_to_delete:
-            save_menu_items(items)
+        # Write through to the catalog (JSON mirror is written in the background)
+        menu_catalog.remove(current_user.id, item_id)
+        menu_snapshots.invalidate()
         
         # Rebuild prototypes
         rebuild_prototypes()
@@ -1297,15 +2103,125 @@ def delete_menu_item(item_id):
         return jsonify({'error': f'Failed to delete menu item: {str(e)}'}), 500
 
 
+def status_payload():
+    return {
+        'success': True,
+        'detection_enabled': detection_enabled,
+        'camera_url': camera_url if camera_url else None,
+        'camera_connected': camera is not None and camera.isOpened() if camera else False,
+        'camera_reconnecting': camera_supervisor.active,
+        'embeddings': dict(embed_stats),
+    }
+
+
 @app.route('/api/status')
 def get_status():
     """Get system status"""
-    return jsonify({
+    return jsonify(status_payload())
+
+
+@app.route('/api/dashboard_snapshot', methods=['GET'])
+def get_dashboard_snapshot():
+    """Status, counts and menu catalog in one conditional round trip"""
+    count_hub.publish(counts)
+    return snapshot_response(composite({
         'success': True,
-        'detection_enabled': detection_enabled,
-        'camera_url': camera_url if camera_url else None,
-        'camera_connected': camera is not None and camera.isOpened() if camera else False
-    })
+        'status': status_payload(),
+        'counts': count_hub.snapshot,
+        'menu': menu_snapshots.get(_menu_user_key()),
+    }))
+
+
+# ========================= SOCKET.IO EVENTS =========================
+@socketio.on('connect')
+def handle_connect():
+    """New clients get the firehose room plus a full snapshot to apply deltas to"""
+    join_room(ALL_ROOM)
+    emit('counts_update', counts_emitter.snapshot(active_camera_id))
+
+
+@socketio.on('subscribe_counts')
+def handle_subscribe_counts(data=None):
+    """
+    Narrow counts_update to one camera ({'camera_id': N}) or to all of the
+    user's cameras ({'tenant': true}); replies with a full snapshot.
+    """
+    data = data or {}
+    if not current_user.is_authenticated:
+        emit('counts_error', {'error': 'Authentication required'})
+        return
+    camera_id = data.get('camera_id')
+    if camera_id is not None:
+        cam = Camera.query.get(int(camera_id))
+        if not cam or (not current_user.is_admin() and cam.user_id != current_user.id):
+            emit('counts_error', {'error': 'Access denied'})
+            return
+        room = camera_room(cam.id)
+        snapshot = counts_emitter.snapshot(cam.id)
+    elif data.get('tenant'):
+        room = tenant_room(current_user.id)
+        own_ids = [c.id for c in Camera.query.filter_by(user_id=current_user.id).all()]
+        if current_user.is_admin() or active_camera_id in own_ids:
+            snapshot = counts_emitter.snapshot(active_camera_id)
+        else:
+            # The active camera belongs to someone else: start from the user's own cameras
+            snapshot = counts_emitter.snapshot(own_ids[0] if own_ids else None)
+    else:
+        emit('counts_error', {'error': 'camera_id or tenant is required'})
+        return
+    leave_room(ALL_ROOM)
+    join_room(room)
+    emit('counts_update', snapshot)
+
+
+@socketio.on('frames_subscribe')
+def handle_frames_subscribe(data=None):
+    """
+    Start pushing binary JPEG frames ({'feed': 'processed'|'raw', 'width':
+    displayed px}) to this client as 'frame' events; the client must ack each
+    one to get the next. The width picks the smallest sufficient rendition.
+    """
+    data = data or {}
+    feed = data.get('feed', 'processed')
+    if feed not in FEEDS:
+        emit('frames_error', {'error': f'Unknown feed. Use one of {list(FEEDS)}'})
+        return
+    sid = request.sid
+    previous = frame_pushers.pop(sid, None)
+    if previous:
+        previous.stop()
+    pusher = FramePusher(stream_hub, socketio, sid, feed, width=int(data.get('width') or 0) or None,
+                         max_fps=STREAM_PUSH_MAX_FPS, ack_timeout=STREAM_ACK_TIMEOUT_SEC)
+    frame_pushers[sid] = pusher
+    pusher.start()
+
+
+@socketio.on('frames_unsubscribe')
+def handle_frames_unsubscribe(data=None):
+    pusher = frame_pushers.pop(request.sid, None)
+    if pusher:
+        pusher.stop()
+
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    pusher = frame_pushers.pop(request.sid, None)
+    if pusher:
+        pusher.stop()
+
+
+@socketio.on('unsubscribe_counts')
+def handle_unsubscribe_counts(data=None):
+    """Leave a camera/tenant room; back to the firehose room once none is left"""
+    data = data or {}
+    if data.get('camera_id') is not None:
+        leave_room(camera_room(data['camera_id']))
+    if data.get('tenant') and current_user.is_authenticated:
+        leave_room(tenant_room(current_user.id))
+    if any(room.startswith(('camera:', 'tenant:')) for room in rooms()):
+        return
+    join_room(ALL_ROOM)
+    emit('counts_update', counts_emitter.snapshot(active_camera_id))
 
 
 def is_detection_allowed(user_id=None):
@@ -1334,7 +2250,7 @@ def is_detection_allowed(user_id=None):
 
 def auto_start_detection():
     """Automatically start detection on server startup"""
-    global detection_enabled, camera, processing_thread, camera_backend
+    global detection_enabled, camera, processing_thread, camera_backend, active_camera_id, active_camera_rooms, active_capture_backend, detection_source_url
     
     print("\n🎥 AUTO-STARTING DETECTION SYSTEM...")
     
@@ -1354,7 +2270,11 @@ def auto_start_detection():
         else:
             print(f"🎥 Using camera URL: {camera_source}")
         
-        cap, backend = try_open_camera(camera_source, log_attempts=True)
+        camera_id = resolve_camera_id(default_url)
+        capture_backend, substream_url = camera_capture_config(camera_id)
+        if substream_url:
+            print(f"🎥 Dual-stream: detecting on substream {substream_url}")
+        cap, backend, opened_url = open_detection_camera(camera_id, substream_url or default_url, capture_backend)
         if cap is None:
             print(f"⚠️  Failed to open camera: {default_url}")
             print("⚠️  Detection will remain disabled until camera is available")
@@ -1362,14 +2282,19 @@ def auto_start_detection():
         
         camera = cap
         camera_backend = backend
+        active_capture_backend = capture_backend
+        detection_source_url = opened_url
+        open_main_stream(camera_source if substream_url else None, capture_backend)
+        active_camera_id = camera_id
+        active_camera_rooms = camera_tenant_rooms(active_camera_id)
         configure_camera_capture(camera)
-        reset_tracking_state()
+        reset_tracking_state(keep_objects=state_restored)
+        health_for(active_camera_id).on_open()
         
         detection_enabled = True
         
-        # Start processing thread
-        processing_thread = threading.Thread(target=detection_processing_loop, daemon=True)
-        processing_thread.start()
+        # Start processing thread (a real OS thread even under gevent)
+        processing_thread = start_native_thread(detection_processing_loop, name='detection')
         
         print(f"✅ Detection auto-started with camera: {default_url}")
         
@@ -1378,17 +2303,70 @@ def auto_start_detection():
         print("⚠️  Detection will remain disabled")
 
 
-if __name__ == '__main__':
+def camera_watchdog():
+    """Hot-swap the active camera when its stream stalls or freezes"""
+    watching = False
+    while True:
+        time.sleep(HEALTH_CHECK_INTERVAL_SEC)
+        try:
+            if not detection_enabled or camera is None or camera_supervisor.active:
+                watching = False
+                continue
+            if not watching:
+                # Paused or reconnecting until now: restart the stall clock
+                watching = True
+                health_for(active_camera_id).on_open()
+                continue
+            problem = health_for(active_camera_id).problem(HEALTH_STALL_SEC, HEALTH_FROZEN_SEC)
+            if problem:
+                # The old capture stays in place until the replacement is open
+                print(f"🩺 Camera {active_camera_id} stream {problem}, reconnecting")
+                camera_supervisor.request(f"health: {problem}")
+        except Exception as e:
+            print(f"⚠️ Camera watchdog error: {e}")
+
+
+def start_background_services():
+    """Load models, start background workers and auto-start detection"""
     print("\n🚀 INITIALIZING SERVE TRACK SYSTEM...")
     print("=" * 60)
     
+    # Add columns introduced since the tables were created
+    try:
+        with app.app_context():
+            for name in add_missing_columns():
+                print(f"🗄️ Added column {name}")
+    except Exception as e:
+        print(f"⚠️ Column migration failed: {e}")
+    
     # Initialize detection system
     initialize_detection_system()
     
+    # Background flush of analytics rollups
+    rollups.start()
+    
+    # Coalesced counts_update emitter
+    counts_emitter.start()
+    
+    # Background artifact writer pool + retention janitor
+    artifact_writer.start()
+    
+    # Background event clip builder
+    if CLIP_CAPTURE_ENABLED:
+        clip_recorder.start()
+    
+    # Stall/freeze watchdog for the active camera
+    start_native_thread(camera_watchdog, name='camera-watchdog')
+    
     # Auto-start detection
     auto_start_detection()
     
     print("=" * 60)
+
+
+if __name__ == '__main__':
+    # Development server; use serve.py in production
+    start_background_services()
     print("🌐 Starting Flask Server...")
     
     # Run with SocketIO
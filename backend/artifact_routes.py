@@ -0,0 +1,103 @@
+"""
+Detection Artifact Routes for ServeTrack
+Paginated browsing of saved crops/frames backed by the artifact index
+"""
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify, send_file, current_app
+from flask_login import login_required
+from auth import allowed_camera_ids
+
+artifact_bp = Blueprint('artifacts', __name__)
+
+MAX_PAGE_SIZE = 200
+
+# Which stored file each variant serves
+VARIANTS = {
+    'thumb': 'thumb_path',
+    'crop': 'crop_path',
+    'frame': 'frame_path',
+}
+
+
+def _artifact_to_dict(row):
+    artifact_id = row['id']
+    return {
+        'id': artifact_id,
+        'timestamp': datetime.fromtimestamp(row['ts']).isoformat(),
+        'camera_id': row['camera_id'],
+        'label': row['label'],
+        'oid': row['oid'],
+        'similarity': round(row['sim'] or 0.0, 4),
+        'thumb_url': f'/api/artifacts/{artifact_id}/thumb' if row['thumb_path'] else None,
+        'crop_url': f'/api/artifacts/{artifact_id}/crop' if row['crop_path'] else None,
+        'frame_url': f'/api/artifacts/{artifact_id}/frame' if row['frame_path'] else None,
+    }
+
+
+@artifact_bp.route('/api/artifacts', methods=['GET'])
+@login_required
+def list_artifacts():
+    """Get a newest-first page of detection artifacts"""
+    try:
+        store = current_app.extensions['artifact_store']
+        limit = max(1, min(request.args.get('limit', 50, type=int), MAX_PAGE_SIZE))
+        try:
+            start = request.args.get('start')
+            end = request.args.get('end')
+            start_ts = datetime.fromisoformat(start).timestamp() if start else None
+            end_ts = datetime.fromisoformat(end).timestamp() if end else None
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use ISO 8601'}), 400
+
+        camera_ids = allowed_camera_ids()
+        camera_id = request.args.get('camera_id', type=int)
+        if camera_id is not None:
+            camera_ids = [camera_id] if camera_ids is None or camera_id in camera_ids else []
+
+        rows = store.page(
+            before_id=request.args.get('before_id', type=int),
+            limit=limit,
+            label=request.args.get('label') or None,
+            camera_ids=camera_ids,
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        return jsonify({
+            'success': True,
+            'artifacts': [_artifact_to_dict(row) for row in rows],
+            # Pass back as before_id to fetch the next (older) page
+            'next_before_id': rows[-1]['id'] if len(rows) == limit else None
+        }), 200
+
+    except Exception as e:
+        print(f"Error listing artifacts: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@artifact_bp.route('/api/artifacts/<int:artifact_id>/<variant>', methods=['GET'])
+@login_required
+def get_artifact_image(artifact_id, variant):
+    """Serve an artifact's thumbnail, crop or full annotated frame"""
+    if variant not in VARIANTS:
+        return jsonify({'error': f'Unknown variant. Use one of {list(VARIANTS)}'}), 404
+
+    store = current_app.extensions['artifact_store']
+    row = store.get(artifact_id)
+    if not row:
+        return jsonify({'error': 'Artifact not found'}), 404
+
+    allowed = allowed_camera_ids()
+    if allowed is not None and row['camera_id'] not in allowed:
+        return jsonify({'error': 'Access denied'}), 403
+
+    path = store.absolute(row[VARIANTS[variant]])
+    if not path:
+        return jsonify({'error': f'{variant} no longer retained'}), 404
+    try:
+        response = send_file(path, mimetype='image/jpeg', conditional=True)
+    except FileNotFoundError:
+        return jsonify({'error': f'{variant} no longer retained'}), 404
+    # Artifacts are immutable once written
+    response.headers['Cache-Control'] = 'private, max-age=86400, immutable'
+    return response
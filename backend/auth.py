@@ -39,6 +39,17 @@ def auth_required(f):
     return decorated_function
 
 
+def allowed_camera_ids():
+    """
+    Camera ids the current user may read data for: None for admins (no
+    restriction), otherwise their own cameras plus 0, the unregistered
+    camera whose live counts /api/counts serves to everyone
+    """
+    if current_user.is_admin():
+        return None
+    return [c.id for c in Camera.query.filter_by(user_id=current_user.id).all()] + [0]
+
+
 @auth_bp.route('/api/auth/login', methods=['POST'])
 def login():
     """Login endpoint"""
@@ -73,3 +73,16 @@ CREATE TABLE IF NOT EXISTS analytics (
     INDEX idx_date (date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+
+-- Table for pre-aggregated analytics rollups (minute / hour / day buckets)
+-- Populated incrementally by the detection engine; replaces scanning raw counts
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    granularity VARCHAR(10) NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    camera_id INT NOT NULL DEFAULT 0,
+    item_name VARCHAR(100) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    UNIQUE KEY uq_rollup_bucket (granularity, camera_id, bucket_start, item_name),
+    INDEX idx_rollup_range (granularity, bucket_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
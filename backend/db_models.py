@@ -60,6 +60,11 @@ class Camera(db.Model):
     url = db.Column(db.String(255), nullable=False)  # Camera URL or index (0 for webcam)
     is_active = db.Column(db.Boolean, default=True)
     roi_coordinates = db.Column(db.Text, nullable=True)  # JSON string of polygon points
+    substream_url = db.Column(db.String(255), nullable=True)  # Low-res stream for detection (dual-stream)
+    capture_backend = db.Column(db.String(20), nullable=False, default='opencv', server_default='opencv')  # 'opencv', 'pyav' or 'mjpeg'
+    probed_url = db.Column(db.String(255), nullable=True)  # Working URL variant found by the last probe
+    probed_backend = db.Column(db.String(20), nullable=True)  # e.g. 'ffmpeg', 'pyav', 'mjpeg'
+    probed_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -75,6 +80,11 @@ class Camera(db.Model):
             'url': self.url,
             'is_active': self.is_active,
             'roi_coordinates': json.loads(self.roi_coordinates) if self.roi_coordinates else None,
+            'capture_backend': self.capture_backend or 'opencv',
+            'substream_url': self.substream_url,
+            'probed_url': self.probed_url,
+            'probed_backend': self.probed_backend,
+            'probed_at': self.probed_at.isoformat() if self.probed_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -196,3 +206,29 @@ class ScheduleSetting(db.Model):
             # Overnight case: 22:00 to 02:00
             return current_time >= self.start_time or current_time <= self.end_time
 
+
+
+class AnalyticsRollup(db.Model):
+    """Pre-aggregated dispatch counts per time bucket, camera and item"""
+    __tablename__ = 'analytics_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'camera_id', 'bucket_start', 'item_name', name='uq_rollup_bucket'),
+        db.Index('idx_rollup_range', 'granularity', 'bucket_start'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # 'minute', 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, nullable=False)  # Local time, truncated to granularity
+    camera_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = camera not registered
+    item_name = db.Column(db.String(100), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        """Convert rollup bucket to dictionary"""
+        return {
+            'granularity': self.granularity,
+            'bucket_start': self.bucket_start.isoformat() if self.bucket_start else None,
+            'camera_id': self.camera_id,
+            'item_name': self.item_name,
+            'count': self.count
+        }
@@ -1,7 +1,7 @@
 module.exports = {
   apps: [{
     name: 'servetrack-backend',
-    script: 'app.py',
+    script: 'serve.py',
     interpreter: '/root/SERVETRACK/backend/venv/bin/python3',
     cwd: '/root/SERVETRACK/backend',
     instances: 1,
@@ -10,7 +10,8 @@ module.exports = {
     max_memory_restart: '2G',
     env: {
       FLASK_ENV: 'production',
-      PYTHONUNBUFFERED: '1'
+      PYTHONUNBUFFERED: '1',
+      SOCKETIO_ASYNC_MODE: 'gevent'
     },
     error_file: './logs/pm2-error.log',
     out_file: './logs/pm2-out.log',
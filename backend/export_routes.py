@@ -0,0 +1,233 @@
+"""
+Export Routes for ServeTrack
+Streams count data as CSV, NDJSON or Parquet over arbitrary date ranges
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from itertools import islice
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from flask_login import login_required
+from auth import allowed_camera_ids
+from db_models import db, MenuItem, DetectionSession, ItemCount, AnalyticsRollup
+
+export_bp = Blueprint('export', __name__)
+
+# Rows per CSV chunk / Parquet row group
+BATCH_SIZE = 1000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Column name -> type ('int', 'float', 'str', 'datetime') per dataset
+DATASET_COLUMNS = {
+    'item_counts': [
+        ('detected_at', 'datetime'), ('session_id', 'int'), ('camera_id', 'int'),
+        ('menu_item_id', 'int'), ('item_name', 'str'), ('count', 'int'),
+    ],
+    'daily': [
+        ('date', 'datetime'), ('camera_id', 'int'), ('item_name', 'str'), ('count', 'int'),
+    ],
+    'events': [
+        ('timestamp', 'datetime'), ('camera_id', 'int'), ('item_name', 'str'), ('oid', 'int'),
+        ('similarity', 'float'), ('box_scale', 'float'),
+        ('x1', 'float'), ('y1', 'float'), ('x2', 'float'), ('y2', 'float'),
+    ],
+}
+
+
+# ========================= ROW SOURCES =========================
+def _item_count_rows(start, end, camera_id, item, allowed_ids):
+    query = db.session.query(
+        ItemCount.detected_at, ItemCount.session_id, DetectionSession.camera_id,
+        ItemCount.menu_item_id, MenuItem.name, ItemCount.count
+    ).join(DetectionSession, ItemCount.session_id == DetectionSession.id
+    ).join(MenuItem, ItemCount.menu_item_id == MenuItem.id
+    ).filter(ItemCount.detected_at >= start, ItemCount.detected_at < end)
+    if camera_id is not None:
+        query = query.filter(DetectionSession.camera_id == camera_id)
+    if allowed_ids is not None:
+        query = query.filter(DetectionSession.camera_id.in_(allowed_ids))
+    if item:
+        query = query.filter(MenuItem.name == item)
+    # Server-side cursor: rows are fetched from MySQL in batches, never all at once
+    query = query.order_by(ItemCount.detected_at).execution_options(stream_results=True)
+    for row in query.yield_per(BATCH_SIZE):
+        yield tuple(row)
+
+
+def _daily_rows(start, end, camera_id, item, allowed_ids):
+    query = db.session.query(
+        AnalyticsRollup.bucket_start, AnalyticsRollup.camera_id,
+        AnalyticsRollup.item_name, AnalyticsRollup.count
+    ).filter(
+        AnalyticsRollup.granularity == 'day',
+        AnalyticsRollup.bucket_start >= start.replace(hour=0, minute=0, second=0, microsecond=0),
+        AnalyticsRollup.bucket_start < end
+    )
+    if camera_id is not None:
+        query = query.filter(AnalyticsRollup.camera_id == camera_id)
+    if allowed_ids is not None:
+        query = query.filter(AnalyticsRollup.camera_id.in_(allowed_ids))
+    if item:
+        query = query.filter(AnalyticsRollup.item_name == item)
+    query = query.order_by(AnalyticsRollup.bucket_start).execution_options(stream_results=True)
+    for row in query.yield_per(BATCH_SIZE):
+        yield tuple(row)
+
+
+def _event_rows(start, end, camera_id, item, allowed_ids):
+    event_log = current_app.extensions.get('event_log')
+    if event_log is None:
+        return
+    names = event_log.item_names()
+    for batch in event_log.scan(start.timestamp(), end.timestamp(), camera_id, item, allowed_ids):
+        for i in range(len(batch['ts'])):
+            cam = int(batch['camera_id'][i])
+            x1, y1, x2, y2 = (float(v) for v in batch['bbox'][i])
+            yield (
+                datetime.fromtimestamp(float(batch['ts'][i])), cam, names[int(batch['item'][i])],
+                int(batch['oid'][i]), float(batch['sim'][i]), float(batch['box_scale'][i]),
+                x1, y1, x2, y2,
+            )
+
+
+DATASET_ROWS = {
+    'item_counts': _item_count_rows,
+    'daily': _daily_rows,
+    'events': _event_rows,
+}
+
+
+# ========================= ENCODERS =========================
+def _batches(rows):
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for batch in _batches(rows):
+        writer.writerows([[_plain(v) for v in row] for row in batch])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode('utf-8')
+
+
+def _encode_ndjson(columns, rows):
+    names = [name for name, _ in columns]
+    for batch in _batches(rows):
+        yield ''.join(
+            json.dumps(dict(zip(names, (_plain(v) for v in row)))) + '\n' for row in batch
+        ).encode('utf-8')
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose written bytes can be drained as chunks"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _encode_parquet(columns, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(), 'datetime': pa.timestamp('us')}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batches(rows):
+            # One row group per batch, flushed to the client immediately
+            arrays = [pa.array([row[i] for row in batch], type=schema.field(i).type)
+                      for i in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+ENCODERS = {
+    'csv': _encode_csv,
+    'ndjson': _encode_ndjson,
+    'parquet': _encode_parquet,
+}
+
+
+# ========================= ROUTES =========================
+@export_bp.route('/api/export/<dataset>', methods=['GET'])
+@login_required
+def export_dataset(dataset):
+    """Stream a dataset export (item_counts, daily or events)"""
+    if dataset not in DATASET_ROWS:
+        return jsonify({'error': f'Unknown dataset. Use one of {list(DATASET_ROWS)}'}), 404
+
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Invalid format. Use one of {list(FORMATS)}'}), 400
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return jsonify({'error': 'Parquet export requires pyarrow to be installed'}), 501
+
+    try:
+        end = request.args.get('end')
+        start = request.args.get('start')
+        end_dt = datetime.fromisoformat(end) if end else datetime.now()
+        start_dt = datetime.fromisoformat(start) if start else end_dt - timedelta(days=30)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use ISO 8601'}), 400
+
+    camera_id = request.args.get('camera_id', type=int)
+    item = request.args.get('item') or None
+    allowed_ids = allowed_camera_ids()
+    columns = DATASET_COLUMNS[dataset]
+    rows = DATASET_ROWS[dataset](start_dt, end_dt, camera_id, item, allowed_ids)
+
+    filename = f"servetrack_{dataset}_{start_dt:%Y%m%d}_{end_dt:%Y%m%d}.{fmt}"
+    return Response(
+        stream_with_context(ENCODERS[fmt](columns, rows)),
+        mimetype=FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -3,10 +3,40 @@ Database Initialization Script for ServeTrack
 Creates all tables and optionally adds a default admin user
 """
 from flask import Flask
-from db_models import db, User, Camera, MenuItem, DetectionSession, ItemCount
+from db_models import db, User, Camera, MenuItem, DetectionSession, ItemCount, AnalyticsRollup
 from config import Config
+from sqlalchemy import inspect, text
 import os
 
+
+def add_missing_columns():
+    """
+    Add model columns that an existing table is missing (create_all never
+    alters tables). Must run inside an app context; returns the added
+    'table.column' names.
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} " \
+                  f"{column.type.compile(dialect=db.engine.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT '{column.server_default.arg}'"
+            if not column.nullable and column.server_default is not None:
+                ddl += " NOT NULL"
+            with db.engine.begin() as conn:
+                conn.execute(text(ddl))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
 def init_database(create_admin=True):
     """Initialize database with tables"""
     app = Flask(__name__)
@@ -20,6 +50,10 @@ def init_database(create_admin=True):
         db.create_all()
         print("✓ Tables created successfully!")
         
+        # Bring tables created by older versions up to date
+        for name in add_missing_columns():
+            print(f"✓ Added column {name}")
+        
         # Create default users if needed
         if create_admin:
             # Create System Admin
@@ -108,6 +142,7 @@ def init_database(create_admin=True):
         print("✓ menu_items - Food items to detect")
         print("✓ detection_sessions - Detection tracking")
         print("✓ item_counts - Detection results")
+        print("✓ analytics_rollups - Bucketed analytics")
         print("="*50)
 
 if __name__ == '__main__':
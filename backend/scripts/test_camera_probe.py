@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Standalone camera probe for HTTP/MJPEG/RTSP streams.
-Tries OpenCV first (with and without FFMPEG), then a raw MJPEG parser.
+Probes URL variants x backends concurrently first, then falls back to OpenCV
+(with and without FFMPEG), the app's MjpegHttpSource
+(capture_backend 'mjpeg') and raw MJPEG parsers.
 Also probes common HTTP endpoint variants and will save a snapshot if successful.
 
 Usage:
@@ -10,6 +12,8 @@ Usage:
 """
 
 import argparse
+import os
+import sys
 import time
 import re
 from urllib.parse import urljoin
@@ -18,6 +22,11 @@ import cv2
 import numpy as np
 import requests
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mjpeg_source import MjpegParser, MjpegHttpSource  # noqa: E402
+from utils.camera_probe import probe_camera, url_variants  # noqa: E402
+
 
 def opencv_read_one(url: str, backend_ffmpeg: bool = False):
     try:
@@ -38,17 +47,15 @@ def mjpeg_read_one(url: str, username: str | None = None, password: str | None =
         headers = {"User-Agent": "Mozilla/5.0"}
         with requests.get(url, stream=True, timeout=timeout, auth=auth, headers=headers) as r:
             r.raise_for_status()
-            data = b""
+            # JPEG marker scan over a reusable buffer (no per-chunk concatenation)
+            parser = MjpegParser()
             t0 = time.time()
             for chunk in r.iter_content(chunk_size=4096):
                 if not chunk:
                     continue
-                data += chunk
-                a = data.find(b"\xff\xd8")
-                b = data.find(b"\xff\xd9")
-                if a != -1 and b != -1 and b > a:
-                    jpg = data[a:b + 2]
-                    data = data[b + 2:]
+                parser.feed(chunk)
+                jpg = parser.latest()
+                if jpg is not None:
                     arr = np.frombuffer(jpg, dtype=np.uint8)
                     frame = cv2.imdecode(arr, cv2.IMREAD_COLOR)
                     if frame is not None:
@@ -60,6 +67,19 @@ def mjpeg_read_one(url: str, username: str | None = None, password: str | None =
     return None
 
 
+def mjpeg_source_read_one(url: str, username: str | None = None, password: str | None = None, timeout: float = 8.0):
+    """Read through the production MjpegHttpSource (capture_backend 'mjpeg')."""
+    try:
+        source = MjpegHttpSource(url, username, password, timeout=timeout)
+    except Exception:
+        return None
+    try:
+        ok, frame = source.read()
+        return frame if ok else None
+    finally:
+        source.release()
+
+
 def mjpeg_read_one_boundary(url: str, username: str | None = None, password: str | None = None, timeout: float = 8.0):
     """Boundary-aware multipart/x-mixed-replace MJPEG reader (parses declared boundary)."""
     try:
@@ -160,6 +180,24 @@ def discover_http_variants(base_url: str, username: str | None, password: str |
     return unique
 
 
+def concurrent_probe(url: str, username: str | None = None, password: str | None = None,
+                     timeout: float = 6.0, workers: int = 8):
+    """All URL variants x backends at once (same service as /api/cameras/<id>/probe)."""
+    def opener(source, backend, attempt_timeout):
+        if backend == 'mjpeg':
+            return MjpegHttpSource(source, username, password, timeout=attempt_timeout)
+        timeout_ms = int(attempt_timeout * 1000)
+        return cv2.VideoCapture(source, backend, [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                                                  cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
+
+    backends = [cv2.CAP_FFMPEG, cv2.CAP_ANY]
+    if url.startswith(('http://', 'https://')):
+        backends.append('mjpeg')
+    candidates = [(v, b) for v in url_variants(url) for b in backends]
+    return probe_camera(candidates, opener, max_workers=workers, attempt_timeout=timeout,
+                        keep_winner=True)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--url', required=True)
@@ -170,6 +208,21 @@ def main():
 
     print(f"\n=== Camera Probe ===\nURL: {args.url}\n")
 
+    # Concurrent probe first; the sequential readers below are the fallback
+    result = concurrent_probe(args.url, args.username, args.password)
+    winner = result['winner']
+    print(f"Concurrent probe: {len(result['attempts'])} attempt(s) in {result['elapsed_ms']} ms")
+    if winner:
+        print(f"SUCCESS. Working pair: {winner['source']} (backend {winner['backend']}, "
+              f"{winner['width']}x{winner['height']}, {winner['elapsed_ms']} ms)")
+        cap = result['capture']
+        ok, frame = cap.read()
+        cap.release()
+        if ok and frame is not None:
+            cv2.imwrite(args.snapshot, frame)
+            print(f"Saved snapshot to: {args.snapshot}")
+        return 0
+
     # Try direct OpenCV
     for flag in [False, True]:
         frame = opencv_read_one(args.url, backend_ffmpeg=flag)
@@ -187,8 +240,10 @@ def main():
             print(f" - {v}")
 
         for v in variants:
-            # Try OpenCV then MJPEG (chunk scan), then boundary-aware multipart
+            # Try OpenCV, the production MJPEG source, MJPEG (chunk scan), then boundary-aware multipart
             frame = opencv_read_one(v)
+            if frame is None:
+                frame = mjpeg_source_read_one(v, args.username, args.password)
             if frame is None:
                 frame = mjpeg_read_one(v, args.username, args.password)
             if frame is None:
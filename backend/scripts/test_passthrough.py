@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Standalone check of the raw-feed passthrough remux (no Flask, no camera needed).
+Runs the same ffmpeg -c copy pipeline as /api/video_passthrough against a local
+file or any RTSP/HTTP source, collects the init segment plus a few fragments
+and writes them to a playable fragmented MP4.
+
+Usage:
+  python scripts/test_passthrough.py --source sample.mp4
+  python scripts/test_passthrough.py --source rtsp://127.0.0.1:8554/test --fragments 10
+  # Stand-in RTSP source (e.g. with mediamtx running):
+  #   ffmpeg -re -stream_loop -1 -i sample.mp4 -c copy -f rtsp rtsp://127.0.0.1:8554/test
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.passthrough import PassthroughStream, ffmpeg_available  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', required=True, help='Local file or rtsp:// / http:// URL')
+    parser.add_argument('--fragments', type=int, default=5)
+    parser.add_argument('--out', default='passthrough_test.mp4')
+    parser.add_argument('--ffmpeg', default='ffmpeg')
+    parser.add_argument('--timeout', type=float, default=15.0)
+    args = parser.parse_args()
+
+    if not ffmpeg_available(args.ffmpeg):
+        print(f"❌ {args.ffmpeg} not found on PATH")
+        return 2
+
+    stream = PassthroughStream(args.source, args.ffmpeg, idle_timeout=0.5,
+                               loop='://' not in args.source)
+    started = time.monotonic()
+    init_segment, sub = stream.subscribe(timeout=args.timeout)
+    if init_segment is None:
+        print("❌ No init segment received (is the source reachable and H.264/H.265?)")
+        return 1
+    print(f"✅ Init segment: {len(init_segment)} bytes after {time.monotonic() - started:.2f}s, "
+          f"codecs={stream.codecs}")
+
+    sizes = []
+    with open(args.out, 'wb') as f:
+        f.write(init_segment)
+        for fragment in stream.iter_fragments(sub, timeout=args.timeout):
+            f.write(fragment)
+            sizes.append(len(fragment))
+            print(f"   fragment {len(sizes)}: {len(fragment)} bytes "
+                  f"(+{time.monotonic() - started:.2f}s)")
+            if len(sizes) >= args.fragments:
+                break
+    stream.unsubscribe(sub)
+
+    if len(sizes) < args.fragments:
+        print(f"❌ Only {len(sizes)} fragment(s) before the source stopped")
+        return 1
+    print(f"✅ Wrote {args.out} ({len(init_segment) + sum(sizes)} bytes, {len(sizes)} fragments)")
+
+    try:
+        probe = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'stream=codec_name,width,height',
+             '-of', 'csv=p=0', args.out],
+            capture_output=True, text=True, timeout=15)
+        print(f"   ffprobe: {probe.stdout.strip() or probe.stderr.strip()}")
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
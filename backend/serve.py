@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Production entry point for ServeTrack
+Runs the app on gevent so every MJPEG/SSE/Socket.IO client costs a greenlet
+instead of an OS thread. Detection and the background workers keep their own
+real OS threads (see utils/native.py), which is also why eventlet is not
+supported.
+
+Usage:
+  python serve.py                               # gevent on 0.0.0.0:8000
+"""
+import os
+
+ASYNC_MODE = os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'gevent')
+
+# Monkey-patching must happen before anything imports socket/threading
+if ASYNC_MODE != 'gevent':
+    raise SystemExit(f"serve.py needs SOCKETIO_ASYNC_MODE=gevent (got {ASYNC_MODE!r})")
+from gevent import monkey  # noqa: E402
+monkey.patch_all()
+
+from app import app, socketio, start_background_services  # noqa: E402
+
+HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+PORT = int(os.environ.get('SERVER_PORT', 8000))
+
+
+if __name__ == '__main__':
+    start_background_services()
+    print(f"🌐 Starting {ASYNC_MODE} server on {HOST}:{PORT}...")
+    socketio.run(app, host=HOST, port=PORT, debug=False, use_reloader=False)
@@ -0,0 +1,173 @@
+"""
+Time-sharded artifact store with a SQLite index.
+
+Artifacts are written into hourly shard directories
+(``YYYY/MM/DD/HH/``) instead of one flat folder, and every saved
+detection gets a row in a small SQLite index holding its time, camera,
+label, oid, similarity, file paths and size. Browsing uses keyset
+pagination on the index (``id < before_id``), so a page costs the same
+no matter how many artifacts exist, and never lists directories.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    camera_id INTEGER NOT NULL DEFAULT 0,
+    label TEXT,
+    oid INTEGER,
+    sim REAL,
+    crop_path TEXT,
+    frame_path TEXT,
+    thumb_path TEXT,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    frame_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_ts ON artifacts (ts);
+CREATE INDEX IF NOT EXISTS idx_artifacts_label ON artifacts (label, id);
+CREATE INDEX IF NOT EXISTS idx_artifacts_camera ON artifacts (camera_id, id);
+"""
+
+ROW_FIELDS = ('id', 'ts', 'camera_id', 'label', 'oid', 'sim',
+              'crop_path', 'frame_path', 'thumb_path', 'bytes', 'frame_bytes')
+
+
+class ArtifactStore:
+    """Hourly-sharded artifact files plus a SQLite metadata index."""
+
+    def __init__(self, directory, index_name='index.sqlite3'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, index_name), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def shard_dir(self, ts):
+        """Absolute shard directory for a timestamp (created on demand)."""
+        shard = datetime.fromtimestamp(ts).strftime('%Y/%m/%d/%H')
+        path = os.path.join(self.directory, shard)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def relative(self, path):
+        return os.path.relpath(path, self.directory) if path else None
+
+    def absolute(self, relative_path):
+        return os.path.abspath(os.path.join(self.directory, relative_path)) if relative_path else None
+
+    # --------------------------------------------------------------- write
+    def add(self, ts, camera_id, label, oid, sim, crop_path, frame_path, thumb_path,
+            size, frame_size=0):
+        with self._lock:
+            cur = self._conn.execute(
+                'INSERT INTO artifacts (ts, camera_id, label, oid, sim, crop_path, frame_path, '
+                'thumb_path, bytes, frame_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (ts, int(camera_id or 0), label, int(oid or 0), float(sim or 0.0),
+                 self.relative(crop_path), self.relative(frame_path), self.relative(thumb_path),
+                 int(size), int(frame_size)),
+            )
+            self._conn.commit()
+            return cur.lastrowid
+
+    # ---------------------------------------------------------------- read
+    def get(self, artifact_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(ROW_FIELDS)} FROM artifacts WHERE id = ?", (artifact_id,)
+            ).fetchone()
+        return dict(zip(ROW_FIELDS, row)) if row else None
+
+    def page(self, before_id=None, limit=50, label=None, camera_ids=None, start_ts=None, end_ts=None):
+        """Newest-first page of artifacts using keyset pagination."""
+        clauses, params = [], []
+        if before_id is not None:
+            clauses.append('id < ?')
+            params.append(int(before_id))
+        if label:
+            clauses.append('label = ?')
+            params.append(label)
+        if camera_ids is not None:
+            if not camera_ids:
+                return []
+            clauses.append(f"camera_id IN ({', '.join('?' * len(camera_ids))})")
+            params.extend(int(c) for c in camera_ids)
+        if start_ts is not None:
+            clauses.append('ts >= ?')
+            params.append(float(start_ts))
+        if end_ts is not None:
+            clauses.append('ts < ?')
+            params.append(float(end_ts))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(ROW_FIELDS)} FROM artifacts {where} ORDER BY id DESC LIMIT ?",
+                params,
+            ).fetchall()
+        return [dict(zip(ROW_FIELDS, row)) for row in rows]
+
+    # ----------------------------------------------------------- retention
+    def _delete_files(self, paths):
+        for rel in paths:
+            if not rel:
+                continue
+            try:
+                os.remove(self.absolute(rel))
+            except OSError:
+                pass
+
+    def expire_frames(self, older_than_ts):
+        """Drop full frames older than the cutoff (crops and thumbs stay)."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, frame_path FROM artifacts WHERE ts < ? AND frame_path IS NOT NULL',
+                (older_than_ts,),
+            ).fetchall()
+            self._conn.executemany(
+                'UPDATE artifacts SET frame_path = NULL, bytes = bytes - frame_bytes, '
+                'frame_bytes = 0 WHERE id = ?',
+                [(r[0],) for r in rows]
+            )
+            self._conn.commit()
+        self._delete_files(r[1] for r in rows)
+        return len(rows)
+
+    def expire_all(self, older_than_ts):
+        """Drop whole artifacts (crop, frame, thumb and index row) before the cutoff."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, crop_path, frame_path, thumb_path FROM artifacts WHERE ts < ?',
+                (older_than_ts,),
+            ).fetchall()
+            self._conn.execute('DELETE FROM artifacts WHERE ts < ?', (older_than_ts,))
+            self._conn.commit()
+        self._delete_files(p for r in rows for p in r[1:])
+        return len(rows)
+
+    def enforce_quota(self, quota_bytes, batch=100):
+        """Delete the oldest artifacts until the indexed total fits the quota."""
+        removed = 0
+        while True:
+            with self._lock:
+                total = self._conn.execute('SELECT COALESCE(SUM(bytes), 0) FROM artifacts').fetchone()[0]
+                if total <= quota_bytes:
+                    break
+                rows = self._conn.execute(
+                    'SELECT id, crop_path, frame_path, thumb_path FROM artifacts ORDER BY id LIMIT ?',
+                    (batch,),
+                ).fetchall()
+                if not rows:
+                    break
+                self._conn.executemany('DELETE FROM artifacts WHERE id = ?', [(r[0],) for r in rows])
+                self._conn.commit()
+            self._delete_files(p for r in rows for p in r[1:])
+            removed += len(rows)
+        return removed
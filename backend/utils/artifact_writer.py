@@ -0,0 +1,168 @@
+"""
+Asynchronous detection artifact writer with retention and a disk quota.
+
+The detection thread hands crops and annotated frames to a bounded queue
+and returns immediately; a small pool of worker threads does the resize,
+JPEG encode, thumbnail generation and write into the sharded
+``ArtifactStore``. If the disk falls behind, new artifacts are dropped
+(and counted) instead of stalling detection. A janitor thread enforces
+per-kind retention (full frames vs crops) and a total byte quota using the
+store's index, plus age-based cleanup of legacy flat files.
+"""
+import os
+import queue
+import time
+
+import cv2
+
+from utils.native import start_native_thread
+
+
+class ArtifactWriter:
+    """Background JPEG writer pool with tiered retention."""
+
+    def __init__(self, store, workers=2, queue_size=64, jpeg_quality=85,
+                 crop_quality=92, max_frame_width=1280, thumb_width=240, frame_retention_days=7,
+                 crop_retention_days=30, quota_bytes=5 * 1024 ** 3, janitor_interval=600):
+        self.store = store
+        self.directory = store.directory
+        self.thumb_width = int(thumb_width)
+        self.jpeg_quality = int(jpeg_quality)
+        self.crop_quality = int(crop_quality)
+        self.max_frame_width = int(max_frame_width)
+        self.frame_retention_sec = float(frame_retention_days) * 86400
+        self.crop_retention_sec = float(crop_retention_days) * 86400
+        self.quota_bytes = int(quota_bytes)
+        self.janitor_interval = float(janitor_interval)
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=int(queue_size))
+        self._workers = int(workers)
+        self._threads = []
+        self._last_drop_log = 0.0
+
+    # ------------------------------------------------------------ producer
+    def submit(self, meta, crop, frame):
+        """
+        Queue a crop and full frame for writing. ``meta`` holds ts,
+        camera_id, label, oid, sim and base_name. Never blocks; returns False
+        when the queue is full and the artifact is dropped. The caller must
+        pass arrays it will not modify afterwards (copies).
+        """
+        try:
+            self._queue.put_nowait((meta, crop, frame))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            now = time.monotonic()
+            if now - self._last_drop_log > 10.0:
+                self._last_drop_log = now
+                print(f"⚠️ Artifact queue full - dropped {self.dropped} artifact(s) so far")
+            return False
+
+    # ------------------------------------------------------------- workers
+    @staticmethod
+    def _resize_to_width(image, width):
+        h, w = image.shape[:2]
+        if not width or w <= width:
+            return image
+        scale = width / float(w)
+        return cv2.resize(image, (width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+    def _write_jpeg(self, path, image, quality):
+        """Encode and atomically write a JPEG; returns bytes written (0 on failure)."""
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            return 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.tobytes())
+        os.replace(tmp_path, path)
+        return len(buffer)
+
+    def _worker(self):
+        while True:
+            meta, crop, frame = self._queue.get()
+            try:
+                shard = self.store.shard_dir(meta['ts'])
+                base = os.path.join(shard, meta['base_name'])
+                crop_path = frame_path = thumb_path = None
+                size = frame_size = 0
+                if crop is not None and crop.size > 0:
+                    crop_path = f"{base}_crop.jpg"
+                    size += self._write_jpeg(crop_path, crop, self.crop_quality)
+                if frame is not None:
+                    frame_path = f"{base}_annotated.jpg"
+                    frame_size = self._write_jpeg(
+                        frame_path, self._resize_to_width(frame, self.max_frame_width), self.jpeg_quality)
+                    thumb_path = f"{base}_thumb.jpg"
+                    size += self._write_jpeg(
+                        thumb_path, self._resize_to_width(frame, self.thumb_width), 80)
+                self.store.add(meta['ts'], meta.get('camera_id', 0), meta.get('label'),
+                               meta.get('oid'), meta.get('sim'), crop_path, frame_path,
+                               thumb_path, size + frame_size, frame_size)
+                self.written += 1
+            except Exception as exc:
+                print(f"⚠️ Failed to save detection artifacts: {exc}")
+            finally:
+                self._queue.task_done()
+
+    # ------------------------------------------------------------- janitor
+    def enforce_retention(self):
+        """Expire full frames, then whole artifacts, then trim to the quota."""
+        now = time.time()
+        removed = 0
+        try:
+            if self.frame_retention_sec > 0:
+                removed += self.store.expire_frames(now - self.frame_retention_sec)
+            if self.crop_retention_sec > 0:
+                removed += self.store.expire_all(now - self.crop_retention_sec)
+            if self.quota_bytes > 0:
+                removed += self.store.enforce_quota(self.quota_bytes)
+        except Exception as exc:
+            print(f"⚠️ Artifact retention failed: {exc}")
+        removed += self._sweep_legacy(now)
+        if removed:
+            print(f"🧹 Artifact retention removed {removed} artifact(s)")
+        return removed
+
+    def _sweep_legacy(self, now):
+        """Age out flat files written before the sharded store existed."""
+        removed = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.is_file() or not entry.name.endswith('.jpg'):
+                        continue
+                    st = entry.stat()
+                    max_age = self.crop_retention_sec if entry.name.endswith('_crop.jpg') \
+                        else self.frame_retention_sec
+                    if max_age > 0 and now - st.st_mtime > max_age:
+                        try:
+                            os.remove(entry.path)
+                            removed += 1
+                        except OSError:
+                            pass
+        except OSError as exc:
+            print(f"⚠️ Legacy artifact sweep failed: {exc}")
+        return removed
+
+    def _janitor(self):
+        while True:
+            self.enforce_retention()
+            time.sleep(self.janitor_interval)
+
+    def start(self):
+        """Start the writer pool and the retention janitor (idempotent)."""
+        if self._threads:
+            return
+        for _ in range(self._workers):
+            self._threads.append(start_native_thread(self._worker, name='artifact-writer'))
+        self._threads.append(start_native_thread(self._janitor, name='artifact-janitor'))
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
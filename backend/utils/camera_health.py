@@ -0,0 +1,177 @@
+"""
+Rolling per-camera stream health.
+
+The detection loop reports every grabbed frame, every retrieved frame, the
+moment it finishes processing a frame, and every decode error. From these
+``CameraHealth`` keeps a sliding window of delivered FPS, inter-frame gaps
+and capture-to-processed lag. It also spots frozen streams: cameras and
+decoders that keep repeating the same picture are caught by hashing a
+sparse pixel sample of each retrieved frame. ``problem()`` tells a
+watchdog when a stream has stalled (no frames) or frozen, so it can
+reconnect before ``retrieve()`` ever fails.
+"""
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+
+def frame_fingerprint(frame, step=16):
+    """Cheap hash of every ``step``-th pixel (identical only for repeated frames)."""
+    return zlib.crc32(np.ascontiguousarray(frame[::step, ::step]).tobytes())
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class CameraHealth:
+    """Sliding-window stream statistics for one camera."""
+
+    def __init__(self, window_sec=60.0):
+        self.window_sec = float(window_sec)
+        self.frames = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.stalls = 0
+        self.frozen_events = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._grabs = deque()   # (monotonic ts, capture pts or None) of each grabbed frame
+        self._gaps = deque()    # (ts, seconds since previous frame)
+        self._lags = deque()    # (ts, capture-to-processed seconds)
+        self._errors = deque()  # ts of each decode/read error
+        self._last_frame = None
+        self._last_timed = None  # wall time of the last grab a gap was measured from
+        self._last_pts = None
+        self._last_hash = None
+        self._frozen_since = None
+        self._stall_reported = 0.0
+
+    def _prune(self, now):
+        cutoff = now - self.window_sec
+        while self._errors and self._errors[0] < cutoff:
+            self._errors.popleft()
+        for series in (self._grabs, self._gaps, self._lags):
+            while series and series[0][0] < cutoff:
+                series.popleft()
+
+    # ------------------------------------------------------------ events
+    def on_open(self):
+        """A capture was (re)opened: restart the stall/frozen clocks."""
+        with self._lock:
+            self._last_frame = time.monotonic()
+            self._last_timed = None
+            self._last_pts = None
+            self._last_hash = None
+            self._frozen_since = None
+
+    def on_reconnect(self):
+        self.reconnects += 1
+        self.on_open()
+
+    def on_grab(self, pts=None, drained=False):
+        """
+        A frame was grabbed. ``pts`` is its capture timestamp in seconds
+        when the source reports one; gaps and FPS then follow the camera's
+        own clock. Without it, only grabs that waited for the camera are
+        timed: ``drained`` grabs pop frames that were already buffered, so
+        their wall-clock gaps measure the loop, not the stream.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if pts is not None:
+                if self._last_pts is not None and 0.0 < pts - self._last_pts < self.window_sec:
+                    self._gaps.append((now, pts - self._last_pts))
+                self._last_pts = pts
+            elif not drained:
+                if self._last_timed is not None:
+                    self._gaps.append((now, now - self._last_timed))
+                self._last_timed = now
+            self._grabs.append((now, pts))
+            self._last_frame = now
+            self.frames += 1
+            self._prune(now)
+
+    def on_retrieve(self, frame):
+        fingerprint = frame_fingerprint(frame)
+        now = time.monotonic()
+        with self._lock:
+            if fingerprint == self._last_hash:
+                if self._frozen_since is None:
+                    self._frozen_since = now
+            else:
+                self._frozen_since = None
+            self._last_hash = fingerprint
+
+    def on_processed(self, captured_at):
+        """``captured_at`` is the monotonic time the frame was retrieved."""
+        now = time.monotonic()
+        with self._lock:
+            self._lags.append((now, now - captured_at))
+
+    def on_error(self):
+        now = time.monotonic()
+        with self._lock:
+            self.errors += 1
+            self._errors.append(now)
+            self._prune(now)
+
+    # ------------------------------------------------------------ queries
+    def problem(self, stall_after, frozen_after):
+        """'stalled', 'frozen' or None; counted once per episode."""
+        now = time.monotonic()
+        with self._lock:
+            quiet_since = max(self._last_frame or 0.0, self._stall_reported)
+            if self._last_frame is not None and now - quiet_since > stall_after:
+                self.stalls += 1
+                self._stall_reported = now  # one report per stall_after
+                return 'stalled'
+            if self._frozen_since is not None and now - self._frozen_since > frozen_after:
+                self.frozen_events += 1
+                self._frozen_since = now
+                return 'frozen'
+        return None
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            first_pts, last_pts = (self._grabs[0][1], self._grabs[-1][1]) if self._grabs else (None, None)
+            if first_pts is not None and last_pts is not None and last_pts > first_pts:
+                span = last_pts - first_pts  # stream time the window's frames cover
+            else:
+                span = (now - self._grabs[0][0]) if len(self._grabs) > 1 else 0.0
+            gaps = [gap for _, gap in self._gaps]
+            lags = [lag for _, lag in self._lags]
+            return {
+                'window_sec': self.window_sec,
+                'fps': round((len(self._grabs) - 1) / span, 2) if span > 0 else 0.0,
+                'gap_ms': {
+                    'p50': _ms(_percentile(gaps, 0.5)),
+                    'p95': _ms(_percentile(gaps, 0.95)),
+                    'max': _ms(max(gaps) if gaps else None),
+                },
+                'lag_ms': {
+                    'p50': _ms(_percentile(lags, 0.5)),
+                    'p95': _ms(_percentile(lags, 0.95)),
+                },
+                'seconds_since_frame': round(now - self._last_frame, 2) if self._last_frame else None,
+                'frozen_for_sec': round(now - self._frozen_since, 2) if self._frozen_since else 0.0,
+                'errors_in_window': len(self._errors),
+                'frames': self.frames,
+                'errors': self.errors,
+                'reconnects': self.reconnects,
+                'stalls': self.stalls,
+                'frozen_events': self.frozen_events,
+                'started_at': self.started_at,
+            }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 1)
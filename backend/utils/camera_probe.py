@@ -0,0 +1,135 @@
+"""
+Concurrent camera probing: find a working (URL variant, backend) pair fast.
+
+Every candidate pair is tried in parallel on a small pool of native
+threads, and the first one that opens *and* delivers a frame wins. Each
+attempt is bounded by ``attempt_timeout``: the opener passes it on as the
+backend's own open/read timeout, and an attempt that still finishes late
+counts as a failure, with its capture released. Once a winner is found,
+pending attempts are skipped. Captures from attempts still in flight are
+released as they finish.
+"""
+import math
+import re
+import threading
+import time
+import urllib.request
+from urllib.parse import urljoin
+
+from utils.native import start_native_thread
+
+
+HTTP_PATH_VARIANTS = ('/stream', '/video', '/mjpeg', '/video.mjpg', '?action=stream',
+                      '?action=stream.mjpeg')
+
+
+def url_variants(url, discover_html=True, timeout=3.0):
+    """The URL itself plus common MJPEG endpoints (and stream links on its HTML page)."""
+    url = str(url).strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        return [url]
+    base = url.rstrip('/')
+    candidates = [url] + [f"{base}{suffix}" for suffix in HTTP_PATH_VARIANTS]
+    if discover_html:
+        try:
+            req = urllib.request.Request(url, headers={'User-Agent': 'ServeTrack'})
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                if 'text/html' in (resp.headers.get('Content-Type') or '').lower():
+                    html = resp.read(256 * 1024).decode('utf-8', 'replace')
+                    for src in re.findall(r'src=["\']([^"\']+)["\']', html, re.IGNORECASE):
+                        if any(tag in src.lower() for tag in ('mjpg', 'mjpeg', 'stream', 'video')):
+                            candidates.insert(1, urljoin(url, src))
+        except Exception:
+            pass
+    seen = set()
+    return [u for u in candidates if not (u in seen or seen.add(u))]
+
+
+class _Probe:
+    def __init__(self, candidates):
+        self.pending = list(candidates)
+        self.cond = threading.Condition()
+        self.attempts = []
+        self.winner = None
+        self.capture = None
+        self.running = 0
+        self.done = False
+
+
+def probe_camera(candidates, opener, max_workers=8, attempt_timeout=6.0, keep_winner=False):
+    """
+    Try ``candidates`` (``[(source, backend), ...]``, most likely first) in
+    parallel. ``opener(source, backend, timeout_sec)`` returns a capture.
+
+    Returns ``{'winner', 'capture', 'attempts', 'elapsed_ms'}``. ``winner`` is
+    ``{'source', 'backend', 'elapsed_ms', 'width', 'height'}`` or None.
+    ``capture`` is the winner's open capture with ``keep_winner``, otherwise
+    it has already been released.
+    """
+    state = _Probe(candidates)
+    started = time.monotonic()
+    workers = max(1, min(int(max_workers), len(state.pending)))
+    # Generous overall cap in case a backend ignores its timeout
+    deadline = started + attempt_timeout * math.ceil(len(state.pending) / float(workers)) + 1.0
+
+    def attempt(source, backend):
+        t0 = time.monotonic()
+        cap, error, shape = None, None, None
+        try:
+            cap = opener(source, backend, attempt_timeout)
+            if cap is None or not cap.isOpened():
+                error = 'not opened'
+            else:
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    error = 'no frame'
+                else:
+                    shape = frame.shape
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+        elapsed = time.monotonic() - t0
+        if error is None and elapsed > attempt_timeout:
+            error = 'timeout'
+        keep = False
+        with state.cond:
+            state.attempts.append({'source': source, 'backend': backend,
+                                   'ok': error is None, 'error': error,
+                                   'elapsed_ms': int(elapsed * 1000)})
+            if error is None and state.winner is None and not state.done:
+                state.winner = {'source': source, 'backend': backend,
+                                'elapsed_ms': int(elapsed * 1000),
+                                'width': int(shape[1]), 'height': int(shape[0])}
+                if keep_winner:
+                    state.capture, keep = cap, True
+            state.cond.notify_all()
+        if cap is not None and not keep:
+            try:
+                cap.release()
+            except Exception:
+                pass
+
+    def worker():
+        while True:
+            with state.cond:
+                if state.done or state.winner is not None or not state.pending:
+                    state.running -= 1
+                    state.cond.notify_all()
+                    return
+                source, backend = state.pending.pop(0)
+            attempt(source, backend)
+
+    state.running = workers
+    for _ in range(workers):
+        start_native_thread(worker, name='camera-probe')
+
+    with state.cond:
+        state.cond.wait_for(
+            lambda: state.winner is not None or state.running == 0 or time.monotonic() > deadline,
+            max(0.0, deadline - time.monotonic()))
+        state.done = True
+        return {
+            'winner': state.winner,
+            'capture': state.capture,
+            'attempts': list(state.attempts),
+            'elapsed_ms': int((time.monotonic() - started) * 1000),
+        }
@@ -0,0 +1,115 @@
+"""
+Background camera reconnects with jittered exponential backoff.
+
+Opening an RTSP source can block for several seconds per backend. The
+detection loop therefore never reopens a camera itself: it drops the
+failed capture and calls ``request()``, then keeps going (the stream hub
+goes on serving the last good frame). A supervisor thread retries the
+``opener`` with exponential backoff and jitter, and hands the first
+working capture to ``on_reconnect``, which swaps it in. ``request()``
+while a retry cycle is running is a no-op, and ``cancel()`` (camera
+stopped or switched) invalidates the cycle so a late success is released
+instead of swapped in.
+"""
+import random
+import threading
+import time
+
+from utils.native import start_native_thread
+
+
+class ReconnectSupervisor:
+    """Reopens one capture in the background until it succeeds or is cancelled."""
+
+    def __init__(self, opener, on_reconnect, name='camera', base_delay=0.5, max_delay=30.0,
+                 jitter=0.5):
+        """
+        ``opener(attempt)`` returns ``(capture, backend)`` or ``(None, None)``;
+        ``on_reconnect(capture, backend)`` installs a successful capture.
+        """
+        self.opener = opener
+        self.on_reconnect = on_reconnect
+        self.name = name
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.jitter = min(1.0, max(0.0, float(jitter)))
+        self.attempts = 0
+        self.reconnects = 0
+        self.last_reason = None
+        self.down_since = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._active = False
+        self._wake = threading.Event()
+
+    @property
+    def active(self):
+        return self._active
+
+    def next_delay(self, attempt):
+        """Backoff before retry ``attempt`` (0-based), randomly shortened by up to ``jitter``."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1.0 - self.jitter * random.random())
+
+    def request(self, reason):
+        """Start a reconnect cycle unless one is already running; True if started."""
+        with self._lock:
+            if self._active:
+                return False
+            self._active = True
+            self._generation += 1
+            generation = self._generation
+            self.last_reason = reason
+            self.down_since = time.time()
+            self._wake.clear()
+        print(f"♻️ {self.name} reconnect scheduled ({reason})")
+        start_native_thread(self._run, generation, name=f'{self.name}-reconnect')
+        return True
+
+    def cancel(self):
+        """Abandon the running cycle (its result, if any, is released)."""
+        with self._lock:
+            self._generation += 1
+            self._active = False
+            self._wake.set()
+
+    def stats(self):
+        return {
+            'reconnecting': self._active,
+            'attempts': self.attempts,
+            'reconnects': self.reconnects,
+            'last_reason': self.last_reason,
+            'down_since': self.down_since if self._active else None,
+        }
+
+    def _current(self, generation):
+        return self._generation == generation
+
+    def _run(self, generation):
+        attempt = 0
+        while self._current(generation):
+            self.attempts += 1
+            try:
+                cap, backend = self.opener(attempt)
+            except Exception as exc:
+                print(f"⚠️ {self.name} reconnect attempt {attempt + 1} failed: {exc}")
+                cap, backend = None, None
+            if cap is not None:
+                # Swap under the lock so a concurrent cancel() cannot be overtaken
+                with self._lock:
+                    current = self._current(generation)
+                    if current:
+                        self.on_reconnect(cap, backend)
+                        self._active = False
+                if not current:
+                    cap.release()
+                    return
+                self.reconnects += 1
+                print(f"✅ {self.name} reconnected after {attempt + 1} attempt(s) "
+                      f"(backend: {backend})")
+                return
+            delay = self.next_delay(attempt)
+            attempt += 1
+            print(f"🛑 {self.name} reconnect attempt {attempt} failed; retrying in {delay:.1f}s")
+            if self._wake.wait(delay):
+                return
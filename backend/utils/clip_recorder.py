@@ -0,0 +1,251 @@
+"""
+Pre-/post-event clip capture from an in-memory ring of encoded frames.
+
+The detection loop hands each processed frame to ``ClipRecorder.submit``,
+which only queues a reference; an encoder thread JPEG-encodes it off the
+detection thread and pushes the bytes into a ring bounded by both duration
+and bytes (if the encoder falls behind, the oldest queued frames are
+dropped rather than stalling the loop). When a count fires, a worker takes
+the frames from before the event, waits for the post-event window to fill
+and muxes everything into an MJPEG AVI. The JPEG bytes are written as-is,
+so building a clip never decodes or re-encodes a frame and never opens an
+extra camera connection.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+from collections import deque
+
+from utils.native import start_native_thread
+
+
+class JpegFrameRing:
+    """Rolling window of (timestamp, jpeg bytes) bounded by seconds and bytes."""
+
+    def __init__(self, seconds=10.0, max_bytes=64 * 1024 * 1024):
+        self.seconds = float(seconds)
+        self.max_bytes = int(max_bytes)
+        self._frames = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+
+    def push(self, jpeg, ts=None):
+        ts = time.time() if ts is None else ts
+        with self._cond:
+            self._frames.append((ts, jpeg))
+            self._bytes += len(jpeg)
+            while self._frames and (
+                ts - self._frames[0][0] > self.seconds or self._bytes > self.max_bytes
+            ):
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+            self._cond.notify_all()
+
+    def between(self, start_ts, end_ts):
+        with self._cond:
+            return [(t, f) for t, f in self._frames if start_ts <= t <= end_ts]
+
+    def wait_until(self, ts, timeout):
+        """Block until a frame at or after ``ts`` exists (or timeout)."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while not self._frames or self._frames[-1][0] < ts:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+def _chunk(fourcc, data):
+    pad = b'\x00' if len(data) % 2 else b''
+    return fourcc + struct.pack('<I', len(data)) + data + pad
+
+
+def _list(list_type, payload):
+    return b'LIST' + struct.pack('<I', len(payload) + 4) + list_type + payload
+
+
+def write_mjpeg_avi(path, frames, fps):
+    """Mux JPEG byte strings into a Motion-JPEG AVI without decoding them."""
+    if not frames:
+        return False
+    width, height = _jpeg_size(frames[0])
+    fps = max(1, int(round(fps)))
+    max_frame = max(len(f) for f in frames)
+
+    avih = struct.pack(
+        '<IIIIIIIIIIIIII',
+        int(1_000_000 / fps),     # microseconds per frame
+        max_frame * fps,          # max bytes per second
+        0, 0x10,                  # padding granularity, flags (AVIF_HASINDEX)
+        len(frames), 0, 1,        # total frames, initial frames, streams
+        max_frame, width, height,
+        0, 0, 0, 0,
+    )
+    strh = struct.pack(
+        '<4s4sIHHIIIIIIIIhhhh',
+        b'vids', b'MJPG', 0, 0, 0, 0,
+        1, fps, 0, len(frames),   # scale, rate, start, length
+        max_frame, 0xFFFFFFFF, 0,
+        0, 0, width, height,
+    )
+    strf = struct.pack(
+        '<IiiHH4sIiiII',
+        40, width, height, 1, 24, b'MJPG', width * height * 3, 0, 0, 0, 0,
+    )
+    hdrl = _list(b'hdrl', _chunk(b'avih', avih)
+                 + _list(b'strl', _chunk(b'strh', strh) + _chunk(b'strf', strf)))
+
+    movi_chunks = []
+    index = []
+    offset = 4  # relative to the 'movi' fourcc
+    for jpeg in frames:
+        chunk = _chunk(b'00dc', jpeg)
+        index.append(struct.pack('<4sIII', b'00dc', 0x10, offset, len(jpeg)))
+        movi_chunks.append(chunk)
+        offset += len(chunk)
+    movi = _list(b'movi', b''.join(movi_chunks))
+    idx1 = _chunk(b'idx1', b''.join(index))
+
+    body = b'AVI ' + hdrl + movi + idx1
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', len(body)) + body)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _jpeg_size(jpeg):
+    """Read (width, height) from a JPEG's SOF marker."""
+    i = 2
+    n = len(jpeg)
+    while i + 9 < n:
+        if jpeg[i] != 0xFF:
+            i += 1
+            continue
+        marker = jpeg[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xC0, 0xC1, 0xC2):
+            height, width = struct.unpack('>HH', jpeg[i + 5:i + 9])
+            return width, height
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        (length,) = struct.unpack('>H', jpeg[i + 2:i + 4])
+        i += 2 + length
+    return 0, 0
+
+
+class ClipRecorder:
+    """Background worker that turns count events into short MJPEG clips."""
+
+    def __init__(self, ring, directory, pre_seconds=3.0, post_seconds=2.0, max_pending=8,
+                 quota_bytes=1024 ** 3, encode=None, max_raw=4):
+        """
+        ``encode(frame)`` returns JPEG bytes (or None); it runs on the
+        encoder thread for frames handed to ``submit``.
+        """
+        self.ring = ring
+        self.directory = directory
+        self.pre_seconds = float(pre_seconds)
+        self.post_seconds = float(post_seconds)
+        self.quota_bytes = int(quota_bytes)
+        self.encode = encode
+        self.raw_dropped = 0
+        self._queue = queue.Queue(maxsize=int(max_pending))
+        self._raw = deque(maxlen=max(1, int(max_raw)))
+        self._raw_cond = threading.Condition()
+        self._thread = None
+        self._encoder = None
+        os.makedirs(directory, exist_ok=True)
+
+    def submit(self, frame, ts=None):
+        """Queue a (read-only) frame for the ring; never encodes on the caller's thread."""
+        ts = time.time() if ts is None else ts
+        with self._raw_cond:
+            if len(self._raw) == self._raw.maxlen:
+                self.raw_dropped += 1
+            self._raw.append((ts, frame))
+            self._raw_cond.notify()
+
+    def trigger(self, name, ts=None):
+        """Request a clip around ``ts``; never blocks the caller."""
+        ts = time.time() if ts is None else ts
+        try:
+            self._queue.put_nowait((name, ts))
+            return True
+        except queue.Full:
+            print(f"⚠️ Clip queue full - skipping clip {name}")
+            return False
+
+    def _build(self, name, ts):
+        self.ring.wait_until(ts + self.post_seconds, timeout=self.post_seconds + 2.0)
+        frames = self.ring.between(ts - self.pre_seconds, ts + self.post_seconds)
+        if len(frames) < 2:
+            return None
+        duration = max(frames[-1][0] - frames[0][0], 1e-3)
+        fps = (len(frames) - 1) / duration
+        path = os.path.join(self.directory, f"{name}.avi")
+        if write_mjpeg_avi(path, [jpeg for _, jpeg in frames], fps):
+            self._enforce_quota()
+            return path
+        return None
+
+    def _enforce_quota(self):
+        """Delete the oldest clips once the directory exceeds its quota."""
+        if self.quota_bytes <= 0:
+            return
+        clips = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.avi'):
+                    st = entry.stat()
+                    clips.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in clips)
+        for _, size, path in sorted(clips):
+            if total <= self.quota_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def _encode_loop(self):
+        while True:
+            with self._raw_cond:
+                while not self._raw:
+                    self._raw_cond.wait()
+                ts, frame = self._raw.popleft()
+            try:
+                jpeg = self.encode(frame)
+            except Exception as exc:
+                print(f"⚠️ Clip frame encode failed: {exc}")
+                continue
+            if jpeg:
+                self.ring.push(jpeg, ts)
+
+    def _run(self):
+        while True:
+            name, ts = self._queue.get()
+            try:
+                path = self._build(name, ts)
+                if path:
+                    print(f"🎞️ Clip saved: {path}")
+            except Exception as exc:
+                print(f"⚠️ Failed to build clip {name}: {exc}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = start_native_thread(self._run, name='clip-recorder')
+        if self.encode is not None and (self._encoder is None or not self._encoder.is_alive()):
+            self._encoder = start_native_thread(self._encode_loop, name='clip-encoder')
@@ -0,0 +1,116 @@
+"""
+Coalesced, delta-only ``counts_update`` emitter.
+
+The detection loop hands the current counts to ``publish`` every frame;
+that is a cheap dict comparison and nothing is sent unless a value
+changed. Changes are accumulated and flushed by a background task at
+most once per ``min_interval`` as a versioned delta (changed items only)
+to per-camera and per-tenant Socket.IO rooms, so fan-out cost follows real
+count changes instead of the frame rate.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+ALL_ROOM = 'counts:all'
+
+
+def camera_room(camera_id):
+    return f'camera:{int(camera_id or 0)}'
+
+
+def tenant_room(user_id):
+    return f'tenant:{int(user_id)}'
+
+
+class CountsEmitter:
+    """Tracks per-camera count state and emits coalesced deltas."""
+
+    def __init__(self, socketio, min_interval=0.25, event='counts_update'):
+        self.socketio = socketio
+        self.min_interval = float(min_interval)
+        self.event = event
+        self._cond = threading.Condition()
+        self._state = {}      # camera_id -> last published counts
+        self._version = {}    # camera_id -> version
+        self._pending = {}    # camera_id -> {'deltas': {}, 'full': bool, 'rooms': [...]}
+        self._last_emit = 0.0
+        self._thread = None
+
+    def publish(self, counts, camera_id=0, rooms=(), full=False):
+        """Record the latest counts; schedules an emit only if something changed."""
+        current = {name: int(value) for name, value in counts.items()}
+        with self._cond:
+            previous = self._state.get(camera_id, {})
+            if current == previous and not full:
+                return False
+            pending = self._pending.setdefault(camera_id, {'deltas': {}, 'full': False, 'rooms': []})
+            for name, value in current.items():
+                delta = value - previous.get(name, 0)
+                if delta:
+                    pending['deltas'][name] = pending['deltas'].get(name, 0) + delta
+            # Removed items or an explicit reset can't be expressed as deltas
+            if full or any(name not in current for name in previous):
+                pending['full'] = True
+            pending['rooms'] = list(rooms)
+            self._state[camera_id] = current
+            self._version[camera_id] = self._version.get(camera_id, 0) + 1
+            self._cond.notify()
+            return True
+
+    def snapshot(self, camera_id=0):
+        """Full payload for a (re)subscribing client."""
+        with self._cond:
+            return {
+                'camera_id': camera_id,
+                'version': self._version.get(camera_id, 0),
+                'counts': dict(self._state.get(camera_id, {})),
+                'deltas': {},
+                'full': True,
+                'timestamp': datetime.now().isoformat(),
+            }
+
+    def _flush(self):
+        with self._cond:
+            pending, self._pending = self._pending, {}
+            payloads = []
+            for camera_id, entry in pending.items():
+                state = self._state.get(camera_id, {})
+                if entry['full']:
+                    changed = dict(state)
+                else:
+                    changed = {name: state.get(name, 0) for name in entry['deltas']}
+                payloads.append((entry['rooms'], {
+                    'camera_id': camera_id,
+                    'version': self._version.get(camera_id, 0),
+                    'counts': changed,
+                    'deltas': entry['deltas'],
+                    'full': entry['full'],
+                    'timestamp': datetime.now().isoformat(),
+                }))
+        for rooms, payload in payloads:
+            # One emit to all rooms: a client in several of them gets it once
+            try:
+                self.socketio.emit(self.event, payload,
+                                   to=list({ALL_ROOM, camera_room(payload['camera_id']), *rooms}))
+            except Exception as exc:
+                print(f"⚠️ counts_update emit failed: {exc}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                wait = self.min_interval - (time.monotonic() - self._last_emit)
+            if wait > 0:
+                # Coalesce: anything published meanwhile rides along in this emit
+                time.sleep(wait)
+            self._flush()
+            self._last_emit = time.monotonic()
+
+    def start(self):
+        # Emits must run on the server's event loop; only publish() is called
+        # from the (native) detection thread
+        if self._thread is None:
+            self._thread = self.socketio.start_background_task(self._run)
@@ -0,0 +1,61 @@
+"""
+Publish/subscribe hub for live count snapshots.
+
+The detection loop publishes the current counts; a new versioned snapshot
+(serialized once, see ``utils.snapshot``) is only created when something
+changed. SSE and long-poll handlers block on the hub's condition until a
+version newer than the one they already have exists, so updates go out as
+soon as they are published and idle subscribers do no work at all.
+"""
+import threading
+from datetime import datetime
+
+from utils.snapshot import Snapshot
+
+
+class CountSnapshot(Snapshot):
+    """Immutable, pre-serialized view of the counts at one version."""
+
+    __slots__ = ('counts',)
+
+    def __init__(self, version, counts):
+        self.counts = counts
+        super().__init__(version, {
+            'version': version,
+            'counts': counts,
+            'timestamp': datetime.now().isoformat(),
+        })
+
+
+class CountHub:
+    """Versioned counts with blocking waits for newer versions."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._snapshot = CountSnapshot(0, {})
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def publish(self, counts, force=False):
+        """Publish counts; returns the new snapshot, or None if unchanged."""
+        current = {name: int(value) for name, value in counts.items()}
+        with self._cond:
+            if current == self._snapshot.counts and not force:
+                return None
+            self._snapshot = CountSnapshot(self._snapshot.version + 1, current)
+            self._cond.notify_all()
+            return self._snapshot
+
+    def wait_newer(self, since, timeout):
+        """
+        Block until a snapshot newer than ``since`` exists or ``timeout``
+        elapses; returns the latest snapshot either way. A ``since`` ahead
+        of the hub (e.g. from before a restart) is treated as stale.
+        """
+        with self._cond:
+            if since > self._snapshot.version:
+                return self._snapshot
+            self._cond.wait_for(lambda: self._snapshot.version > since, timeout)
+            return self._snapshot
@@ -0,0 +1,81 @@
+"""
+Crop quality scoring for best-shot embedding.
+
+A track's first crops are often the worst ones: the item is entering the
+frame (cut off at the border), still small, motion-blurred, or detected
+with low confidence. ``crop_quality`` scores a crop in [0, 1] from
+sharpness (variance of the Laplacian), size, edge truncation and detection
+confidence. ``BestShots`` keeps a track's top-K crops over a short window,
+so only those crops are embedded.
+"""
+import time
+
+import cv2
+import numpy as np
+
+
+SHARPNESS_SIDE = 128  # Laplacian variance is measured at this size so scores compare across box sizes
+
+
+def sharpness(crop, ref=100.0):
+    """Laplacian variance of the crop mapped to [0, 1) (``ref`` scores 0.5)."""
+    h, w = crop.shape[:2]
+    scale = SHARPNESS_SIDE / float(max(h, w))
+    if scale < 1.0:
+        crop = cv2.resize(crop, (max(1, int(w * scale)), max(1, int(h * scale))),
+                          interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    var = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    return var / (var + ref)
+
+
+def crop_quality(crop, xyxy, frame_shape, confidence=None, sharp_ref=100.0, size_ref=96.0,
+                 edge_margin=4):
+    """
+    Quality of ``crop`` (cut from box ``xyxy`` of a frame of ``frame_shape``)
+    in [0, 1]: the product of sharpness, size (box side relative to
+    ``size_ref`` pixels), a penalty for each box edge within ``edge_margin``
+    of the frame border, and the detection ``confidence``.
+    """
+    if crop is None or crop.size == 0:
+        return 0.0
+    x1, y1, x2, y2 = [float(v) for v in xyxy]
+    frame_h, frame_w = frame_shape[:2]
+    size = min(1.0, np.sqrt(max(0.0, x2 - x1) * max(0.0, y2 - y1)) / size_ref)
+    touching = sum((x1 <= edge_margin, y1 <= edge_margin,
+                    x2 >= frame_w - 1 - edge_margin, y2 >= frame_h - 1 - edge_margin))
+    truncation = 0.6 ** touching
+    conf = 1.0 if confidence is None else min(1.0, max(0.0, float(confidence)))
+    return sharpness(crop, sharp_ref) * size * truncation * conf
+
+
+class BestShots:
+    """Top-K crops of one track over a gathering window."""
+
+    def __init__(self, top_k=1):
+        self.top_k = max(1, int(top_k))
+        self.shots = []  # [(score, crop, xyxy, frame_idx)], best first
+        self.frames = 0
+        self.started = time.monotonic()
+
+    def accepts(self, score):
+        """True if a crop of ``score`` would make the top K."""
+        return len(self.shots) < self.top_k or score > self.shots[-1][0]
+
+    def offer(self, score, crop, xyxy, frame_idx):
+        """Count a frame of the window and keep ``crop`` if it makes the top K."""
+        self.frames += 1
+        if crop is None or not self.accepts(score):
+            return False
+        self.shots.append((score, crop, np.array(xyxy), frame_idx))
+        self.shots.sort(key=lambda shot: shot[0], reverse=True)
+        del self.shots[self.top_k:]
+        return True
+
+    def ready(self, window_frames, deadline_sec, good_quality):
+        """Embed now: the window is full, the deadline passed, or the top K are already good."""
+        if not self.shots:
+            return False
+        if self.frames >= window_frames or time.monotonic() - self.started >= deadline_sec:
+            return True
+        return len(self.shots) >= self.top_k and self.shots[-1][0] >= good_quality
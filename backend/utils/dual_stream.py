@@ -0,0 +1,152 @@
+"""
+High-resolution main stream kept next to a low-resolution detection substream.
+
+Detection and tracking run on the camera's substream. The main stream is
+only needed for sharp crops of items that still have to be embedded, so
+its reader thread just keeps the capture drained with ``grab()`` (the
+decoder has to see every frame anyway). The expensive ``retrieve()``
+(colour conversion and a full-resolution copy) happens only after the
+detection loop asks for a frame with ``request()``, and then only once for
+that request. ``crop()`` maps a box from detection-frame coordinates to
+the main frame.
+
+The two streams are not frame-locked. The main frame is the first one
+grabbed after the request (and, given ``newer_than``, after the
+detection frame), so a fast-moving item can be a few pixels off; callers
+can pad the crop or fall back to the substream crop.
+"""
+import threading
+import time
+
+from utils.native import start_native_thread
+
+
+class MainStreamReader:
+    """Drains a main-stream capture and retrieves frames only on request."""
+
+    def __init__(self, opener, name='main', stale_after=2.0, max_retry_delay=30.0):
+        """
+        ``opener`` returns an opened capture (cv2.VideoCapture-like) or None;
+        it is called again with backoff whenever the stream fails.
+        """
+        self.opener = opener
+        self.name = name
+        self.stale_after = float(stale_after)
+        self.max_retry_delay = float(max_retry_delay)
+        self.retrieved = 0
+        self.reconnects = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._want = False
+        self._requested_at = 0.0
+        self._frame = None
+        self._frame_ts = 0.0
+        self._grab_ts = 0.0
+
+    def start(self):
+        self._running = True
+        start_native_thread(self._run, name=f'{self.name}-stream')
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    @property
+    def alive(self):
+        """True while the main stream is delivering frames."""
+        return time.monotonic() - self._grab_ts < self.stale_after
+
+    # ------------------------------------------------------------ consumer
+    def request(self):
+        """Ask for the next main-stream frame (no-op while one is pending)."""
+        with self._cond:
+            if not self._want:
+                self._want = True
+                self._requested_at = time.monotonic()
+
+    def frame(self, timeout=0.2, newer_than=None):
+        """
+        Main-stream frame for the latest request (requesting one if needed),
+        or None if it did not arrive within ``timeout``. With ``newer_than``
+        (a monotonic time, e.g. when the detection frame was captured) only
+        a frame retrieved after that time is returned; an older one triggers
+        a new request instead of being handed out stale.
+        """
+        if not self.alive:
+            return None
+        with self._cond:
+            if newer_than is None:
+                if self._requested_at == 0.0:
+                    self._want, self._requested_at = True, time.monotonic()
+                target = self._requested_at
+            else:
+                if self._frame_ts < newer_than and not self._want:
+                    self._want, self._requested_at = True, time.monotonic()
+                target = newer_than
+            self._cond.wait_for(lambda: self._frame_ts >= target or not self._running, timeout)
+            return self._frame if self._frame_ts >= target else None
+
+    def crop(self, frame, xyxy, ref_shape, pad=0.0):
+        """
+        Crop of ``frame`` (main stream) for box ``xyxy`` given in a frame of
+        ``ref_shape``; ``pad`` widens the box by that fraction per side.
+        """
+        if frame is None:
+            return None
+        ref_h, ref_w = ref_shape[:2]
+        h, w = frame.shape[:2]
+        sx, sy = w / float(ref_w), h / float(ref_h)
+        x1, y1, x2, y2 = [float(v) for v in xyxy]
+        px, py = (x2 - x1) * pad, (y2 - y1) * pad
+        x1 = max(0, int((x1 - px) * sx))
+        y1 = max(0, int((y1 - py) * sy))
+        x2 = min(w - 1, int((x2 + px) * sx))
+        y2 = min(h - 1, int((y2 + py) * sy))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return frame[y1:y2, x1:x2].copy()
+
+    # ------------------------------------------------------------ reader
+    def _run(self):
+        cap = None
+        delay = 1.0
+        while self._running:
+            if cap is None:
+                try:
+                    cap = self.opener()
+                except Exception as exc:
+                    print(f"⚠️ {self.name} stream open failed: {exc}")
+                    cap = None
+                if cap is None:
+                    time.sleep(delay)
+                    delay = min(self.max_retry_delay, delay * 2)
+                    continue
+                print(f"✅ {self.name} stream opened")
+                delay = 1.0
+            try:
+                ok = cap.grab()
+                if ok:
+                    self._grab_ts = time.monotonic()
+                    if self._want:
+                        ok, frame = cap.retrieve()
+                        if ok and frame is not None:
+                            with self._cond:
+                                self._frame, self._frame_ts = frame, time.monotonic()
+                                self._want = False
+                                self.retrieved += 1
+                                self._cond.notify_all()
+            except Exception as exc:
+                print(f"⚠️ {self.name} stream read error: {exc}")
+                ok = False
+            if not ok:
+                print(f"♻️ {self.name} stream lost, reopening")
+                try:
+                    cap.release()
+                except Exception:
+                    pass
+                cap = None
+                self.reconnects += 1
+        if cap is not None:
+            cap.release()
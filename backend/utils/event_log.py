@@ -0,0 +1,239 @@
+"""
+Append-only columnar log of individual count events.
+
+Events are stored in segments (one directory per day, rotated early when a
+segment gets large). Each column lives in its own flat binary file, so an
+append is a few fixed-size writes and a range scan memory-maps only the
+columns of the segments whose time range overlaps the query. Timestamps
+are monotonic within a segment, so the row range is found with a binary
+search instead of a scan.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+COLUMNS = {
+    'ts': np.dtype('<f8'),        # unix seconds
+    'camera_id': np.dtype('<i4'),
+    'item': np.dtype('<i2'),      # code into the item dictionary
+    'oid': np.dtype('<i4'),
+    'sim': np.dtype('<f4'),
+    'box_scale': np.dtype('<f4'),
+    'bbox': np.dtype(('<f4', (4,))),
+}
+
+INDEX_FILE = 'index.json'
+ITEMS_FILE = 'items.json'
+
+
+def _atomic_write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class EventLog:
+    """Segment-rotated columnar event log with a per-segment time index."""
+
+    def __init__(self, directory, max_rows_per_segment=1_000_000):
+        self.directory = directory
+        self.max_rows = int(max_rows_per_segment)
+        self._lock = threading.Lock()
+        self._files = {}
+        self._active = None  # segment name
+        self._active_day = None
+        self._last_ts = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._items = self._load_items()
+        self._index = self._load_index()
+
+    # ------------------------------------------------------------- metadata
+    def _load_items(self):
+        try:
+            with open(os.path.join(self.directory, ITEMS_FILE), 'r') as f:
+                return json.load(f).get('names', [])
+        except (OSError, ValueError):
+            return []
+
+    def _item_code(self, name):
+        try:
+            return self._items.index(name)
+        except ValueError:
+            self._items.append(name)
+            _atomic_write_json(os.path.join(self.directory, ITEMS_FILE), {'names': self._items})
+            return len(self._items) - 1
+
+    def item_names(self):
+        return list(self._items)
+
+    def _segment_rows(self, name):
+        """Committed row count = shortest column (guards against torn writes)."""
+        rows = None
+        for column, dtype in COLUMNS.items():
+            path = os.path.join(self.directory, name, f"{column}.bin")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            n = size // dtype.itemsize
+            rows = n if rows is None else min(rows, n)
+        return rows or 0
+
+    def _segment_time_range(self, name, rows):
+        ts = np.memmap(os.path.join(self.directory, name, 'ts.bin'), dtype=COLUMNS['ts'],
+                       mode='r', shape=(rows,))
+        return float(ts[0]), float(ts[rows - 1])
+
+    def _load_index(self):
+        """Load the segment index, re-deriving entries for unindexed segments."""
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), 'r') as f:
+                index = {seg['name']: seg for seg in json.load(f).get('segments', [])}
+        except (OSError, ValueError):
+            index = {}
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if not name.startswith('seg_') or not os.path.isdir(path):
+                continue
+            rows = self._segment_rows(name)
+            if rows == 0:
+                index.pop(name, None)
+                continue
+            if name not in index or index[name].get('rows') != rows:
+                t_min, t_max = self._segment_time_range(name, rows)
+                index[name] = {'name': name, 't_min': t_min, 't_max': t_max, 'rows': rows}
+        return index
+
+    def _save_index(self):
+        segments = sorted(self._index.values(), key=lambda seg: seg['t_min'])
+        _atomic_write_json(os.path.join(self.directory, INDEX_FILE), {'segments': segments})
+
+    # --------------------------------------------------------------- append
+    def _close_active(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        self._active = None
+
+    def _open_segment(self, ts):
+        self._close_active()
+        name = f"seg_{datetime.fromtimestamp(ts).strftime('%Y%m%d_%H%M%S')}_{int(ts * 1000) % 1000:03d}"
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        self._files = {
+            column: open(os.path.join(self.directory, name, f"{column}.bin"), 'ab')
+            for column in COLUMNS
+        }
+        self._active = name
+        self._active_day = datetime.fromtimestamp(ts).date()
+        self._index[name] = {'name': name, 't_min': ts, 't_max': ts, 'rows': 0}
+        self._save_index()
+
+    def append(self, item, camera_id=0, oid=0, sim=0.0, box_scale=0.0, bbox=None, ts=None):
+        """Append a single count event."""
+        ts = time.time() if ts is None else float(ts)
+        with self._lock:
+            # Keep timestamps monotonic within a segment for binary search
+            ts = max(ts, self._last_ts)
+            self._last_ts = ts
+            seg = self._index.get(self._active) if self._active else None
+            if (seg is None or seg['rows'] >= self.max_rows
+                    or datetime.fromtimestamp(ts).date() != self._active_day):
+                self._open_segment(ts)
+                seg = self._index[self._active]
+            values = {
+                'ts': ts,
+                'camera_id': int(camera_id or 0),
+                'item': self._item_code(item),
+                'oid': int(oid or 0),
+                'sim': float(sim or 0.0),
+                'box_scale': float(box_scale or 0.0),
+                'bbox': [float(v) for v in bbox] if bbox is not None else [0.0] * 4,
+            }
+            try:
+                for column, dtype in COLUMNS.items():
+                    f = self._files[column]
+                    f.write(np.asarray(values[column], dtype=dtype.base).tobytes())
+                    f.flush()
+            except OSError as exc:
+                print(f"⚠️ Event log write failed: {exc}")
+                return
+            seg['rows'] += 1
+            seg['t_max'] = ts
+
+    # ----------------------------------------------------------------- read
+    def segments_for_range(self, start_ts, end_ts):
+        """Indexed segments overlapping [start_ts, end_ts), oldest first."""
+        with self._lock:
+            segments = [dict(seg) for seg in self._index.values() if seg['rows'] > 0]
+        return sorted(
+            (seg for seg in segments if seg['t_max'] >= start_ts and seg['t_min'] < end_ts),
+            key=lambda seg: seg['t_min'],
+        )
+
+    def scan(self, start_ts, end_ts, camera_id=None, item=None, camera_ids=None):
+        """
+        Yield column batches (dict of numpy arrays) for events in
+        [start_ts, end_ts). Only overlapping segments are touched and only
+        the matching row slice of each column is read. ``camera_ids``
+        restricts events to those cameras (None: all).
+        """
+        item_code = None
+        if item is not None:
+            if item not in self._items:
+                return
+            item_code = self._items.index(item)
+
+        for seg in self.segments_for_range(start_ts, end_ts):
+            rows = seg['rows']
+            base = os.path.join(self.directory, seg['name'])
+            ts = np.memmap(os.path.join(base, 'ts.bin'), dtype=COLUMNS['ts'], mode='r', shape=(rows,))
+            lo = int(np.searchsorted(ts, start_ts, side='left'))
+            hi = int(np.searchsorted(ts, end_ts, side='left'))
+            if hi <= lo:
+                continue
+            batch = {'ts': np.array(ts[lo:hi])}
+            for column, dtype in COLUMNS.items():
+                if column == 'ts':
+                    continue
+                shape = (rows,) + dtype.shape
+                mm = np.memmap(os.path.join(base, f"{column}.bin"), dtype=dtype.base, mode='r', shape=shape)
+                batch[column] = np.array(mm[lo:hi])
+            mask = None
+            if camera_id is not None:
+                mask = batch['camera_id'] == int(camera_id)
+            if camera_ids is not None:
+                allowed_mask = np.isin(batch['camera_id'], list(camera_ids))
+                mask = allowed_mask if mask is None else (mask & allowed_mask)
+            if item_code is not None:
+                item_mask = batch['item'] == item_code
+                mask = item_mask if mask is None else (mask & item_mask)
+            if mask is not None:
+                if not mask.any():
+                    continue
+                batch = {column: values[mask] for column, values in batch.items()}
+            yield batch
+
+    def iter_rows(self, start_ts, end_ts, camera_id=None, item=None, camera_ids=None):
+        """Yield events as plain dicts (item codes decoded)."""
+        names = self._items
+        for batch in self.scan(start_ts, end_ts, camera_id, item, camera_ids):
+            for i in range(len(batch['ts'])):
+                yield {
+                    'timestamp': datetime.fromtimestamp(float(batch['ts'][i])).isoformat(),
+                    'camera_id': int(batch['camera_id'][i]),
+                    'item': names[int(batch['item'][i])],
+                    'oid': int(batch['oid'][i]),
+                    'similarity': round(float(batch['sim'][i]), 4),
+                    'box_scale': round(float(batch['box_scale'][i]), 6),
+                    'bbox': [round(float(v), 1) for v in batch['bbox'][i]],
+                }
+
+    def close(self):
+        with self._lock:
+            self._close_active()
+            self._save_index()
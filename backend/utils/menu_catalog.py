@@ -0,0 +1,116 @@
+"""
+In-memory menu catalog with write-through updates.
+
+Each user's menu items are loaded from MySQL once and then served from a
+dict; the add/delete handlers update the cached list in place instead of
+forcing a reload. The legacy ``menu_items.json`` mirror is rewritten by a
+background thread (atomically, coalescing bursts of edits), so request
+handlers never wait on the file write.
+"""
+import json
+import os
+import threading
+
+from db_models import MenuItem
+from utils.native import start_native_thread
+
+
+def legacy_item(menu_item, description=''):
+    """MenuItem row -> the dict shape used by the legacy JSON file."""
+    item_dict = menu_item.to_dict()
+    return {
+        'id': item_dict['id'],
+        'name': item_dict['name'],
+        'description': description,
+        'reference_images': [item_dict['image']] if item_dict.get('image') else [],
+        'created_at': item_dict.get('created_at')
+    }
+
+
+class MenuCatalog:
+    """Per-user menu items cached in memory; ``None`` is the JSON-file view."""
+
+    def __init__(self, app, json_path):
+        self.app = app
+        self.json_path = json_path
+        self._lock = threading.Lock()
+        self._items = {}
+        self._mirror_pending = None
+        self._mirror_event = threading.Event()
+        self._thread = None
+
+    # ----------------------------------------------------------------- reads
+    def _load(self, user_id):
+        if user_id is None:
+            if not os.path.exists(self.json_path):
+                return []
+            with open(self.json_path, 'r') as f:
+                return json.load(f).get('items', [])
+        with self.app.app_context():
+            return [legacy_item(item) for item in MenuItem.query.filter_by(user_id=user_id).all()]
+
+    def items(self, user_id=None):
+        """Menu items for a user (loaded on first use, then from memory)."""
+        items = self._items.get(user_id)
+        if items is None:
+            loaded = self._load(user_id)
+            with self._lock:
+                items = self._items.setdefault(user_id, loaded)
+        return list(items)
+
+    # ---------------------------------------------------------- write-through
+    def add(self, user_id, item):
+        self.items(user_id)
+        with self._lock:
+            self._items[user_id] = self._items[user_id] + [item]
+            mirrored = self._items[user_id]
+            # Anonymous callers see whatever the mirror file holds
+            self._items[None] = mirrored
+        self._schedule_mirror(mirrored)
+
+    def remove(self, user_id, item_id):
+        """Drop an item; returns the removed dict (None if it wasn't cached)."""
+        items = self.items(user_id)
+        removed = next((item for item in items if item.get('id') == item_id), None)
+        with self._lock:
+            self._items[user_id] = [item for item in items if item.get('id') != item_id]
+            mirrored = self._items[user_id]
+            self._items[None] = mirrored
+        self._schedule_mirror(mirrored)
+        return removed
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(user_id, None)
+
+    # ------------------------------------------------------------ JSON mirror
+    def _schedule_mirror(self, items):
+        with self._lock:
+            self._mirror_pending = list(items)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = start_native_thread(self._mirror_loop, name='menu-mirror')
+        self._mirror_event.set()
+
+    def write_mirror(self, items):
+        tmp_path = f"{self.json_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'items': items}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.json_path)
+
+    def _mirror_loop(self):
+        while True:
+            self._mirror_event.wait()
+            self._mirror_event.clear()
+            with self._lock:
+                items, self._mirror_pending = self._mirror_pending, None
+            if items is None:
+                continue
+            try:
+                self.write_mirror(items)
+            except Exception as exc:
+                print(f"Error saving menu items: {exc}")
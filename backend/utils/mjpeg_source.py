@@ -0,0 +1,350 @@
+"""
+HTTP MJPEG (multipart/x-mixed-replace) capture source.
+
+A reader thread streams the response into one reusable ``bytearray`` and
+splits parts in place, using ``find()`` with offsets, ``Content-Length``
+when the camera sends it, and the declared boundary otherwise (plain
+SOI/EOI scanning for cameras that send bare concatenated JPEGs). Only
+the newest complete JPEG of each read is copied out. Frames that are
+superseded before anyone asks for them are never decoded. The consumer
+decodes the latest JPEG once, on ``retrieve()``, optionally at 1/2, 1/4
+or 1/8 scale straight from the DCT.
+
+The connection is kept alive and re-established with backoff if the
+camera drops it. The class offers the subset of ``cv2.VideoCapture``
+used by the detection loop.
+"""
+import base64
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit, unquote
+
+import cv2
+import numpy as np
+
+from utils.native import start_native_thread
+
+
+MJPEG_BACKEND = 'mjpeg'
+
+_REDUCED_DECODE = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class MjpegParser:
+    """Incremental multipart/JPEG splitter over a reusable buffer."""
+
+    def __init__(self, boundary=None, initial_size=256 * 1024, max_frame_bytes=8 * 1024 * 1024):
+        # Cameras disagree on whether the declared boundary includes the
+        # leading '--', so match on the bare token
+        token = (boundary or '').strip().strip('"').lstrip('-')
+        self.boundary = token.encode('latin-1') if token else None
+        self.max_frame_bytes = int(max_frame_bytes)
+        self.frames = 0
+        self.dropped_bytes = 0
+        self._buf = bytearray(initial_size)
+        self._start = 0
+        self._end = 0
+
+    def writable(self, min_free=64 * 1024):
+        """Free tail of the buffer to read into (compacting or growing first)."""
+        if self._start:
+            pending = self._end - self._start
+            if pending:
+                # Same-length slice assignment: an in-place memmove, never a resize
+                self._buf[:pending] = self._buf[self._start:self._end]
+            self._start, self._end = 0, pending
+        if len(self._buf) - self._end < min_free:
+            if self._end >= self.max_frame_bytes:
+                # A part that never terminates: drop it and resynchronise
+                self.dropped_bytes += self._end
+                self._end = 0
+                if self.boundary is not None:
+                    print("⚠️ MJPEG boundary not found, falling back to JPEG marker scan")
+                    self.boundary = None
+            else:
+                # A new object so views handed out earlier stay valid
+                grown = bytearray(max(len(self._buf) * 2, self._end + min_free))
+                grown[:self._end] = self._buf[:self._end]
+                self._buf = grown
+        return memoryview(self._buf)[self._end:]
+
+    def commit(self, n):
+        self._end += n
+
+    def feed(self, data):
+        """Copy ``data`` in (for callers that already hold the bytes)."""
+        view = self.writable(len(data))
+        view[:len(data)] = data
+        self.commit(len(data))
+
+    def latest(self):
+        """Newest complete JPEG buffered so far (older complete ones are skipped), or None."""
+        last = None
+        while True:
+            span = self._next_part() if self.boundary is not None else self._next_jpeg()
+            if span is None:
+                break
+            last = span
+        if last is None:
+            return None
+        self.frames += 1
+        return bytes(memoryview(self._buf)[last[0]:last[1]])
+
+    def _next_part(self):
+        buf, start, end = self._buf, self._start, self._end
+        b = buf.find(self.boundary, start, end)
+        if b < 0:
+            # Keep a tail in case the boundary straddles two reads
+            self._start = max(start, end - len(self.boundary))
+            return None
+        header_end = buf.find(b'\r\n\r\n', b, end)
+        if header_end < 0:
+            self._start = b
+            return None
+        body = header_end + 4
+        length = _content_length(buf, b, header_end)
+        if length is not None:
+            if body + length > end:
+                self._start = b
+                return None
+            self._start = body + length
+            return body, body + length
+        nxt = buf.find(self.boundary, body, end)
+        if nxt < 0:
+            # No Content-Length: a body that already ends in EOI is complete,
+            # so don't hold it back until the next boundary arrives
+            stop = end
+            while stop > body and buf[stop - 1] in (0x0d, 0x0a):
+                stop -= 1
+            if stop - body > 4 and buf[stop - 2:stop] == b'\xff\xd9' and _scan_started(buf, body, stop):
+                self._start = stop
+                return body, stop
+            self._start = b
+            return None
+        self._start = nxt
+        stop = nxt
+        # Drop the CRLF and the '--' that precede the next boundary
+        while stop > body and buf[stop - 1] in (0x0d, 0x0a, 0x2d):
+            stop -= 1
+        return body, stop
+
+    def _next_jpeg(self):
+        buf, start, end = self._buf, self._start, self._end
+        a = buf.find(b'\xff\xd8', start, end)
+        if a < 0:
+            self._start = max(start, end - 1)
+            return None
+        z = buf.find(b'\xff\xd9', a + 2, end)
+        if z < 0:
+            self._start = a
+            return None
+        self._start = z + 2
+        return a, z + 2
+
+
+def _scan_started(buf, start, stop):
+    """
+    True if the JPEG at ``buf[start:stop]`` reaches its first top-level SOS
+    before ``stop``. Walking the marker segments by length skips EXIF
+    thumbnails, whose own EOI must not end the frame early.
+    """
+    if buf[start:start + 2] != b'\xff\xd8':
+        return False
+    i = start + 2
+    while i + 4 <= stop:
+        if buf[i] != 0xFF:
+            return False
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0xDA:
+            return True
+        i += 2 + ((buf[i + 2] << 8) | buf[i + 3])
+    return False
+
+
+def _content_length(buf, start, stop):
+    """Content-Length of the part headers in ``buf[start:stop]`` (a few bytes), or None."""
+    for line in bytes(buf[start:stop]).split(b'\r\n'):
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def boundary_from_content_type(content_type):
+    for part in (content_type or '').split(';'):
+        part = part.strip()
+        if part.lower().startswith('boundary='):
+            return part.split('=', 1)[1]
+    return None
+
+
+class MjpegHttpSource:
+    """Latest-frame MJPEG-over-HTTP capture with keep-alive and reconnect."""
+
+    def __init__(self, url, username=None, password=None, timeout=8.0, decode_scale=1,
+                 chunk_size=64 * 1024, max_reconnect_delay=10.0):
+        if not isinstance(url, str) or not url.lower().startswith(('http://', 'https://')):
+            raise ValueError(f'MJPEG source needs an http(s) URL, got {url!r}')
+        parts = urlsplit(url)
+        self.url = url
+        self.timeout = float(timeout)
+        self.chunk_size = int(chunk_size)
+        self.max_reconnect_delay = float(max_reconnect_delay)
+        self._decode_flag = _REDUCED_DECODE.get(int(decode_scale), cv2.IMREAD_COLOR)
+        self._https = parts.scheme.lower() == 'https'
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path or '/'
+        if parts.query:
+            self._path += '?' + parts.query
+        self._headers = {'User-Agent': 'ServeTrack', 'Connection': 'keep-alive', 'Accept': '*/*'}
+        username = username or (unquote(parts.username) if parts.username else None)
+        password = password or (unquote(parts.password) if parts.password else '')
+        if username:
+            token = base64.b64encode(f'{username}:{password}'.encode()).decode('ascii')
+            self._headers['Authorization'] = f'Basic {token}'
+
+        self.reconnects = 0
+        self.fps = 0.0
+        self._cond = threading.Condition()
+        self._conn = None
+        self._closed = False
+        self._jpeg = None
+        self._seq = 0
+        self._arrived = 0.0
+        self._retrieved_seq = 0
+        self._decoded = None  # (seq, frame)
+
+        # Connect up front so a bad URL fails while the caller is still choosing a backend
+        response = self._connect()
+        self._thread = start_native_thread(self._run, response, name='mjpeg')
+
+    # ------------------------------------------------------------ cv2 API
+    def isOpened(self):
+        return not self._closed
+
+    def grab(self):
+        """Wait for a frame newer than the last retrieved one; True if there is one."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._retrieved_seq or self._closed,
+                                self.timeout)
+            return not self._closed and self._seq > self._retrieved_seq
+
+    def retrieve(self):
+        """Decode the newest JPEG (once per frame, however often it is retrieved)."""
+        with self._cond:
+            seq, jpeg = self._seq, self._jpeg
+            self._retrieved_seq = seq
+        if jpeg is None:
+            return False, None
+        if self._decoded is not None and self._decoded[0] == seq:
+            return True, self._decoded[1]
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), self._decode_flag)
+        if frame is None:
+            return False, None
+        self._decoded = (seq, frame)
+        return True, frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self._arrived * 1000.0
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT) and self._decoded:
+            h, w = self._decoded[1].shape[:2]
+            return float(w if prop == cv2.CAP_PROP_FRAME_WIDTH else h)
+        return 0.0
+
+    def getBackendName(self):
+        return 'MJPEG'
+
+    # ------------------------------------------------------------ reading
+    def _connect(self):
+        if self._conn is None:
+            conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            self._conn = conn_cls(self._host, self._port, timeout=self.timeout)
+        try:
+            self._conn.request('GET', self._path, headers=self._headers)
+            response = self._conn.getresponse()
+        except Exception:
+            # Drop the socket; the next attempt opens a fresh one
+            self._conn.close()
+            raise
+        if response.status != 200:
+            response.close()
+            raise ConnectionError(f'MJPEG {self.url} returned HTTP {response.status}')
+        return response
+
+    def _publish(self, jpeg):
+        now = time.time()
+        with self._cond:
+            if self._arrived:
+                interval = now - self._arrived
+                if interval > 0:
+                    self.fps = 0.9 * self.fps + 0.1 * (1.0 / interval) if self.fps else 1.0 / interval
+            self._jpeg = jpeg
+            self._arrived = now
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _stream(self, response):
+        parser = MjpegParser(boundary_from_content_type(response.getheader('Content-Type')))
+        while not self._closed:
+            data = response.read1(self.chunk_size)
+            if not data:
+                raise ConnectionError('stream ended')
+            parser.feed(data)
+            jpeg = parser.latest()
+            if jpeg is not None:
+                self._publish(jpeg)
+
+    def _run(self, response):
+        delay = 0.5
+        while not self._closed:
+            try:
+                if response is None:
+                    response = self._connect()
+                    print(f"✅ MJPEG reconnected: {self.url}")
+                delay = 0.5
+                self._stream(response)
+            except Exception as exc:
+                if self._closed:
+                    break
+                print(f"⚠️ MJPEG stream error on {self.url}: {exc}; retrying in {delay:.1f}s")
+                if self._conn is not None:
+                    self._conn.close()
+                response = None
+                self.reconnects += 1
+                time.sleep(delay)
+                delay = min(self.max_reconnect_delay, delay * 2)
@@ -0,0 +1,124 @@
+"""
+Server-side multi-camera mosaic, composed once per tick for all viewers.
+
+While at least one viewer is connected, a background thread takes the
+newest frame of every camera feed in the ``StreamHub``, letterboxes each
+into a reduced-resolution tile (re-using the tile when the camera has not
+produced a new frame), draws the camera label, and publishes the grid back
+into the hub as its own feed. Viewers then stream that feed like any other,
+so the grid is composed once and each rendition is encoded once, no matter
+how many supervisors are watching.
+"""
+import math
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils.native import start_native_thread
+
+
+class MosaicComposer:
+    """Composes hub feeds into one grid feed while it has viewers."""
+
+    def __init__(self, hub, sources, tile_width=480, fps=5.0, output_feed='mosaic',
+                 stale_after=3.0):
+        """
+        ``sources`` is a callable returning ``[(label, feed_name), ...]`` for
+        the cameras to show; it is re-evaluated every tick.
+        """
+        self.hub = hub
+        self.sources = sources
+        self.tile_width = int(tile_width)
+        self.tile_height = int(round(self.tile_width * 9 / 16))
+        self.interval = 1.0 / max(0.1, float(fps))
+        self.output_feed = output_feed
+        self.stale_after = float(stale_after)
+        self._lock = threading.Lock()
+        self._viewers = 0
+        self._thread = None
+        self._tiles = {}  # feed -> (seq, letterboxed tile)
+
+    # -------------------------------------------------------------- viewers
+    def acquire(self):
+        """Register a viewer; starts composing if it is the first one."""
+        with self._lock:
+            self._viewers += 1
+            if self._thread is None:
+                self._thread = start_native_thread(self._run, name='mosaic')
+
+    def release(self):
+        with self._lock:
+            self._viewers = max(0, self._viewers - 1)
+
+    @property
+    def viewers(self):
+        return self._viewers
+
+    # ------------------------------------------------------------ composing
+    def _tile(self, feed):
+        seq, frame, ts = self.hub.latest(feed)
+        cached = self._tiles.get(feed)
+        if cached is not None and cached[0] == seq:
+            return cached[1], ts
+        tile = np.zeros((self.tile_height, self.tile_width, 3), dtype=np.uint8)
+        if frame is not None:
+            h, w = frame.shape[:2]
+            scale = min(self.tile_width / float(w), self.tile_height / float(h))
+            nw, nh = max(1, int(w * scale)), max(1, int(h * scale))
+            resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_AREA)
+            y0 = (self.tile_height - nh) // 2
+            x0 = (self.tile_width - nw) // 2
+            tile[y0:y0 + nh, x0:x0 + nw] = resized
+        self._tiles[feed] = (seq, tile)
+        return tile, ts
+
+    def _label(self, canvas, x, y, text, stale):
+        color = (0, 0, 255) if stale else (255, 255, 255)
+        cv2.rectangle(canvas, (x, y), (x + self.tile_width, y + 26), (0, 0, 0), -1)
+        cv2.putText(canvas, text, (x + 8, y + 19), cv2.FONT_HERSHEY_SIMPLEX, 0.55, color, 1,
+                    cv2.LINE_AA)
+
+    def compose(self):
+        """Build one grid frame from the current sources."""
+        sources = list(self.sources())
+        if not sources:
+            canvas = np.zeros((self.tile_height, self.tile_width, 3), dtype=np.uint8)
+            cv2.putText(canvas, 'No active cameras', (20, self.tile_height // 2),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            return canvas
+
+        cols = int(math.ceil(math.sqrt(len(sources))))
+        rows = int(math.ceil(len(sources) / float(cols)))
+        canvas = np.zeros((rows * self.tile_height, cols * self.tile_width, 3), dtype=np.uint8)
+        now = time.time()
+        for i, (label, feed) in enumerate(sources):
+            x = (i % cols) * self.tile_width
+            y = (i // cols) * self.tile_height
+            tile, ts = self._tile(feed)
+            canvas[y:y + self.tile_height, x:x + self.tile_width] = tile
+            stale = now - ts > self.stale_after
+            self._label(canvas, x, y, f"{label} - OFFLINE" if stale else label, stale)
+
+        # Forget tiles of cameras that went away
+        live = {feed for _, feed in sources}
+        for feed in list(self._tiles):
+            if feed not in live:
+                self._tiles.pop(feed, None)
+        return canvas
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._viewers <= 0:
+                    # Cleared under the lock so the next acquire() restarts us
+                    self._thread = None
+                    self._tiles.clear()
+                    return
+            started = time.monotonic()
+            try:
+                self.hub.publish(self.output_feed, self.compose())
+            except Exception as exc:
+                print(f"⚠️ Mosaic compose failed: {exc}")
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
@@ -0,0 +1,85 @@
+"""
+Real OS threads and blocking calls under the evented (gevent) server.
+
+When ``serve.py`` monkey-patches the standard library, ``threading.Thread``
+becomes a greenlet. That is what we want for long-lived HTTP/Socket.IO
+streams, but CPU-bound or disk-bound work (YOLO, embeddings, frame
+decode/encode, clip and artifact writes, DB flushes) would then block the
+whole event loop. These helpers start genuine OS threads for that work and
+push one-off blocking calls to the hub's native thread pool. Without
+monkey-patching they fall back to plain ``threading``.
+
+Native threads and greenlets share the (patched) ``threading`` locks,
+conditions, events and ``queue.Queue``. Since gevent 20.12 these are safe
+across native threads: a notify from a native thread wakes greenlets
+through the hub's thread-safe callback queue. That is why requirements.txt
+pins gevent>=21.12 and why eventlet, whose primitives are not thread-safe
+this way, is not supported. Socket.IO emits are not thread-safe and stay
+on the hub (``socketio.start_background_task``).
+"""
+import functools
+import threading
+
+
+@functools.lru_cache(maxsize=None)
+def _evented_library():
+    """'gevent' or None depending on what patched threading (checked once)."""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            return 'gevent'
+    except ImportError:
+        pass
+    return None
+
+
+def _original_start_new_thread():
+    if _evented_library() == 'gevent':
+        from gevent import monkey
+        return monkey.get_original('_thread', 'start_new_thread')
+    return None
+
+
+class NativeThread:
+    """Handle for a thread started with ``start_native_thread``."""
+
+    def __init__(self, name):
+        self.name = name
+        self._alive = True
+
+    def is_alive(self):
+        return self._alive
+
+
+def start_native_thread(target, *args, name=None):
+    """
+    Run ``target(*args)`` on a real OS thread (daemon). Returns an object
+    with ``is_alive()`` like ``threading.Thread``.
+    """
+    start_new_thread = _original_start_new_thread()
+    if start_new_thread is None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        return thread
+
+    handle = NativeThread(name or getattr(target, '__name__', 'native'))
+
+    def run():
+        try:
+            target(*args)
+        finally:
+            handle._alive = False
+
+    start_new_thread(run, ())
+    return handle
+
+
+def run_blocking(fn, *args, **kwargs):
+    """
+    Call a blocking/CPU-bound function without stalling the event loop
+    (runs it in the native thread pool when the server is evented).
+    """
+    if _evented_library() == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+    return fn(*args, **kwargs)
@@ -0,0 +1,227 @@
+"""
+Raw-feed passthrough: remux the camera's compressed stream to fragmented MP4.
+
+One ``ffmpeg -c copy`` process per source repackages the camera's H.264/H.265
+into fragmented MP4 without decoding a single pixel. The output is split
+into top-level MP4 boxes: ``ftyp`` + ``moov`` form the init segment (cached
+for late joiners), and each ``moof`` + ``mdat`` pair is one fragment starting
+on a keyframe. Fragments are fanned out to every viewer through a small
+per-viewer queue. A viewer that falls behind skips ahead to the next
+fragment instead of stalling the others. The process starts with the first
+viewer and stops shortly after the last one leaves.
+"""
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+
+from utils.native import start_native_thread
+
+
+def ffmpeg_available(ffmpeg_bin='ffmpeg'):
+    return shutil.which(ffmpeg_bin) is not None
+
+
+def build_ffmpeg_command(url, ffmpeg_bin='ffmpeg', realtime=None, loop=False):
+    """ffmpeg argv that remuxes ``url`` to fragmented MP4 on stdout."""
+    cmd = [ffmpeg_bin, '-hide_banner', '-loglevel', 'error', '-nostdin']
+    is_network = '://' in url
+    if url.startswith('rtsp://'):
+        cmd += ['-rtsp_transport', 'tcp']
+    # Local files are read at their native rate so they behave like a camera
+    if realtime if realtime is not None else not is_network:
+        cmd += ['-re']
+    if loop and not is_network:
+        cmd += ['-stream_loop', '-1']
+    cmd += [
+        '-fflags', 'nobuffer', '-i', url,
+        '-map', '0:v:0', '-an', '-c', 'copy',
+        '-f', 'mp4', '-movflags', 'frag_keyframe+empty_moov+default_base_moof',
+        'pipe:1',
+    ]
+    return cmd
+
+
+def read_box(stream):
+    """Read one top-level MP4 box; returns (type, bytes) or None at EOF."""
+    header = _read_exact(stream, 8)
+    if header is None:
+        return None
+    size, box_type = struct.unpack('>I4s', header)
+    if size == 1:
+        large = _read_exact(stream, 8)
+        if large is None:
+            return None
+        header += large
+        size = struct.unpack('>Q', large)[0]
+    elif size == 0:
+        # Box runs to end of stream; not produced by fragmented output
+        rest = stream.read()
+        return box_type.decode('latin-1'), header + rest
+    body = _read_exact(stream, size - len(header))
+    if body is None:
+        return None
+    return box_type.decode('latin-1'), header + body
+
+
+def _read_exact(stream, n):
+    chunks = []
+    while n > 0:
+        chunk = stream.read(n)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b''.join(chunks)
+
+
+def codec_string(init_segment):
+    """RFC 6381 codec string (e.g. avc1.64001f) from the init segment, for MSE."""
+    i = init_segment.find(b'avcC')
+    if i >= 0 and i + 8 <= len(init_segment):
+        profile, compat, level = init_segment[i + 5:i + 8]
+        return f"avc1.{profile:02x}{compat:02x}{level:02x}"
+    if init_segment.find(b'hvcC') >= 0:
+        return 'hvc1'
+    return None
+
+
+class _Subscriber:
+    __slots__ = ('queue', 'skipping')
+
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.skipping = False
+
+
+class PassthroughStream:
+    """Shared ffmpeg remux of one source with init-segment caching and fan-out."""
+
+    def __init__(self, url, ffmpeg_bin='ffmpeg', idle_timeout=10.0, max_queue=8,
+                 realtime=None, loop=False):
+        self.url = url
+        self.ffmpeg_bin = ffmpeg_bin
+        self.idle_timeout = float(idle_timeout)
+        self.max_queue = int(max_queue)
+        self.realtime = realtime
+        self.loop = loop
+        self.init_segment = None
+        self.fragments = 0
+        self._lock = threading.Lock()
+        self._init_ready = threading.Event()
+        self._subscribers = set()
+        self._proc = None
+        self._thread = None
+        self._idle_since = None
+
+    @property
+    def codecs(self):
+        return codec_string(self.init_segment) if self.init_segment else None
+
+    # ---------------------------------------------------------- subscribers
+    def subscribe(self, timeout=10.0):
+        """
+        Join the stream; returns (init_segment, subscriber) or (None, None)
+        if no init segment arrived within ``timeout``.
+        """
+        sub = _Subscriber(self.max_queue)
+        with self._lock:
+            self._subscribers.add(sub)
+            self._idle_since = None
+            if self._thread is None:
+                self._init_ready.clear()
+                self._thread = start_native_thread(self._run, name='passthrough')
+        init_segment = self.init_segment if self._init_ready.wait(timeout) else None
+        if init_segment is None:
+            self.unsubscribe(sub)
+            return None, None
+        return init_segment, sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+            if not self._subscribers:
+                self._idle_since = time.monotonic()
+
+    def iter_fragments(self, sub, timeout=10.0):
+        """Yield fragments for one subscriber until the stream ends."""
+        while True:
+            try:
+                fragment = sub.queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if fragment is None:
+                return
+            yield fragment
+
+    def _broadcast(self, fragment):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(fragment)
+                sub.skipping = False
+            except queue.Full:
+                # Slow viewer: drop its backlog and resume at the next keyframe fragment
+                if not sub.skipping:
+                    sub.skipping = True
+                    while True:
+                        try:
+                            sub.queue.get_nowait()
+                        except queue.Empty:
+                            break
+
+    # --------------------------------------------------------------- ffmpeg
+    def _spawn(self):
+        cmd = build_ffmpeg_command(self.url, self.ffmpeg_bin, self.realtime, self.loop)
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                bufsize=0)
+
+    def _idle_expired(self):
+        with self._lock:
+            return (not self._subscribers and self._idle_since is not None
+                    and time.monotonic() - self._idle_since > self.idle_timeout)
+
+    def _run(self):
+        try:
+            self._proc = self._spawn()
+            print(f"📼 Passthrough remux started: {self.url}")
+            init_parts = []
+            fragment = []
+            while not self._idle_expired():
+                box = read_box(self._proc.stdout)
+                if box is None:
+                    break
+                box_type, data = box
+                if self.init_segment is None:
+                    init_parts.append(data)
+                    if box_type == 'moov':
+                        self.init_segment = b''.join(init_parts)
+                        self._init_ready.set()
+                    continue
+                fragment.append(data)
+                if box_type == 'mdat':
+                    self.fragments += 1
+                    self._broadcast(b''.join(fragment))
+                    fragment = []
+        except Exception as exc:
+            print(f"⚠️ Passthrough remux failed for {self.url}: {exc}")
+        finally:
+            if self._proc is not None:
+                self._proc.kill()
+                self._proc.wait()
+                self._proc = None
+            with self._lock:
+                for sub in self._subscribers:
+                    try:
+                        sub.queue.put_nowait(None)
+                    except queue.Full:
+                        pass
+                self._subscribers.clear()
+                self._thread = None
+                self.init_segment = None
+                # Wake anyone still waiting for an init segment that never came
+                self._init_ready.set()
+            print(f"📼 Passthrough remux stopped: {self.url}")
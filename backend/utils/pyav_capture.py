@@ -0,0 +1,184 @@
+"""
+PyAV capture source with the subset of the ``cv2.VideoCapture`` API the
+detection loop uses (``isOpened``/``grab``/``retrieve``/``read``/``get``/
+``release``).
+
+Compared to OpenCV's FFmpeg backend it exposes the decoder knobs that matter
+for a many-camera box:
+
+* decoder threads (``thread_count``/``thread_type``) per camera;
+* the real presentation timestamp of every frame (``pts_sec``, and
+  ``get(cv2.CAP_PROP_POS_MSEC)``);
+* an overload mode: when decoding falls behind the stream's own clock the
+  decoder first drops non-reference frames, then everything but keyframes,
+  and returns to full decode once it has caught up;
+* conversion straight to a BGR numpy array at a reduced output width, so
+  full-resolution frames are never materialised in Python.
+
+``av`` is optional; without it opening a ``PyAVCapture`` raises and callers
+fall back to the OpenCV backends.
+"""
+import time
+
+import cv2
+
+try:
+    import av
+except ImportError:  # pragma: no cover - optional dependency
+    av = None
+
+
+PYAV_BACKEND = 'pyav'
+
+
+def pyav_available():
+    return av is not None
+
+
+class PyAVCapture:
+    """Decode one camera/file with PyAV; cv2.VideoCapture-compatible where used."""
+
+    def __init__(self, source, thread_count=0, thread_type='AUTO', output_width=1280,
+                 skip_lag_sec=0.5, open_timeout=5.0, read_timeout=5.0):
+        """
+        ``output_width`` of 0 keeps the native size (never upscales).
+        ``skip_lag_sec`` is how far decoding may fall behind the stream clock
+        before non-reference frames are skipped (0 disables skipping).
+        """
+        if av is None:
+            raise RuntimeError('PyAV is not installed (pip install av)')
+        self.source = source
+        self.output_width = int(output_width or 0)
+        self.skip_lag_sec = float(skip_lag_sec or 0)
+        self.skip_mode = 'DEFAULT'
+        self.pts_sec = None
+        self.frames_decoded = 0
+        self._frame = None
+        self._size = None
+        self._clock = None  # (wall, pts) of the first frame
+        self._container = self._open(source, open_timeout, read_timeout)
+        try:
+            self._stream = self._container.streams.video[0]
+        except IndexError:
+            self._container.close()
+            raise RuntimeError(f'No video stream in {source}')
+        self._stream.thread_type = thread_type
+        self._stream.codec_context.thread_count = int(thread_count or 0)
+        self._frames = self._container.decode(self._stream)
+
+    @staticmethod
+    def _open(source, open_timeout, read_timeout):
+        if isinstance(source, int):
+            return av.open(f'/dev/video{source}', format='v4l2',
+                           timeout=(open_timeout, read_timeout))
+        options = {'fflags': 'nobuffer', 'flags': 'low_delay'}
+        if str(source).startswith('rtsp://'):
+            options['rtsp_transport'] = 'tcp'
+        return av.open(str(source), options=options, timeout=(open_timeout, read_timeout))
+
+    # ------------------------------------------------------------ cv2 API
+    def isOpened(self):
+        return self._container is not None
+
+    def grab(self):
+        """Decode the next frame (kept as an AVFrame until ``retrieve``)."""
+        if self._container is None:
+            return False
+        try:
+            frame = next(self._frames)
+        except StopIteration:
+            return False
+        except Exception as exc:
+            print(f"⚠️ PyAV decode error on {self.source}: {exc}")
+            return False
+        self._frame = frame
+        self.frames_decoded += 1
+        if frame.pts is not None and frame.time_base is not None:
+            self.pts_sec = float(frame.pts * frame.time_base)
+            self._update_skip_mode()
+        return True
+
+    def retrieve(self):
+        """BGR ndarray of the last grabbed frame at the output size."""
+        frame = self._frame
+        if frame is None:
+            return False, None
+        width, height = self._output_size(frame)
+        try:
+            return True, frame.to_ndarray(width=width, height=height, format='bgr24')
+        except Exception as exc:
+            print(f"⚠️ PyAV convert error on {self.source}: {exc}")
+            return False, None
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        container, self._container = self._container, None
+        self._frame = None
+        if container is not None:
+            try:
+                container.close()
+            except Exception:
+                pass
+
+    def set(self, prop, value):
+        # Size/FPS/buffering are fixed at open time for this backend
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return (self.pts_sec or 0.0) * 1000.0
+        if prop == cv2.CAP_PROP_FPS:
+            rate = self._stream.average_rate if self._container is not None else None
+            return float(rate) if rate else 0.0
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            if self._size is None:
+                return 0.0
+            return float(self._size[0] if prop == cv2.CAP_PROP_FRAME_WIDTH else self._size[1])
+        return 0.0
+
+    def getBackendName(self):
+        return 'PYAV'
+
+    # ------------------------------------------------------------ internals
+    def _output_size(self, frame):
+        if self._size is None:
+            w, h = frame.width, frame.height
+            if self.output_width and w > self.output_width:
+                # Even dimensions keep swscale on its fast path
+                h = max(2, int(round(h * self.output_width / float(w) / 2)) * 2)
+                w = self.output_width
+            self._size = (w, h)
+        return self._size
+
+    def _update_skip_mode(self):
+        """Escalate frame skipping while decode lags the stream clock."""
+        if not self.skip_lag_sec:
+            return
+        now = time.monotonic()
+        if self._clock is None:
+            self._clock = (now, self.pts_sec)
+            return
+        lag = (now - self._clock[0]) - (self.pts_sec - self._clock[1])
+        if lag > 2 * self.skip_lag_sec:
+            mode = 'NONKEY'
+        elif lag > self.skip_lag_sec:
+            mode = 'NONREF' if self.skip_mode == 'DEFAULT' else self.skip_mode
+        elif lag < self.skip_lag_sec / 2:
+            mode = 'DEFAULT'
+        else:
+            mode = self.skip_mode
+        if lag < 0:
+            # Ahead of the stream clock (file source, or the camera stalled): re-anchor
+            self._clock = (now, self.pts_sec)
+        if mode != self.skip_mode:
+            try:
+                self._stream.codec_context.skip_frame = mode
+                print(f"🎞️ PyAV skip_frame {self.skip_mode} -> {mode} on {self.source} "
+                      f"(lag {lag:.2f}s)")
+                self.skip_mode = mode
+            except Exception:
+                pass
@@ -0,0 +1,80 @@
+"""
+Immutable, pre-serialized JSON snapshots for conditional GETs.
+
+A snapshot is serialized exactly once when it is published. Every request
+for the same version reuses the same bytes and the same strong ETag, so
+polling clients that already have the current version get a 304 without
+anything being rebuilt or re-encoded.
+"""
+import hashlib
+import json
+import threading
+
+
+def _encode(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _etag_for(body):
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class Snapshot:
+    """Versioned payload with its JSON body and content-derived ETag."""
+
+    __slots__ = ('version', 'payload', 'body', 'etag')
+
+    def __init__(self, version, payload, body=None):
+        self.version = version
+        self.payload = payload
+        self.body = _encode(payload) if body is None else body
+        self.etag = _etag_for(self.body)
+
+    def to_dict(self):
+        return dict(self.payload)
+
+
+def composite(parts, version=0):
+    """
+    Build a snapshot whose body embeds already-serialized snapshots
+    verbatim under the given keys; only small dict parts are encoded.
+    """
+    pieces = []
+    for key, part in parts.items():
+        body = part.body if isinstance(part, Snapshot) else _encode(part)
+        pieces.append(_encode(key) + b':' + body)
+    return Snapshot(version, None, b'{' + b','.join(pieces) + b'}')
+
+
+class SnapshotCache:
+    """Per-key snapshots rebuilt lazily after ``invalidate``."""
+
+    def __init__(self, builder):
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._versions = {}
+        self._generation = 0
+
+    def get(self, key):
+        snap = self._snapshots.get(key)
+        if snap is not None:
+            return snap
+        generation = self._generation
+        payload = self._builder(key)
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            snap = Snapshot(version, payload)
+            # Don't cache a payload built from data invalidated meanwhile
+            if generation == self._generation:
+                self._snapshots[key] = snap
+        return snap
+
+    def invalidate(self, key=None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(key, None)
@@ -0,0 +1,169 @@
+"""
+Crash-safe checkpointing of the in-memory counting state.
+
+A checkpoint is a compact JSON snapshot of the counts and the live object
+registry (label, bbox, similarity) written atomically via rename. Between
+snapshots every count event is appended to a small journal so a crash
+loses nothing that was already counted. On boot the snapshot is loaded
+and the journal replayed on top of it, which takes milliseconds.
+"""
+import json
+import os
+import threading
+import time
+
+
+SNAPSHOT_FILE = 'snapshot.json'
+JOURNAL_FILE = 'journal.jsonl'
+
+
+def _atomic_write_json(path, payload):
+    """Write JSON to a temp file, fsync it and rename it over ``path``."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _bbox_to_list(bbox):
+    if bbox is None:
+        return None
+    try:
+        return [round(float(v), 2) for v in bbox]
+    except (TypeError, ValueError):
+        return None
+
+
+class StateCheckpointer:
+    """Periodic snapshot + append-only journal of counts and objects."""
+
+    def __init__(self, directory, interval_sec=30.0, max_age_sec=600.0):
+        self.directory = directory
+        self.interval_sec = float(interval_sec)
+        self.max_age_sec = float(max_age_sec)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self._lock = threading.Lock()
+        self._journal = None
+        self._seq = 0
+        self._last_snapshot = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    # ------------------------------------------------------------------ write
+    def _open_journal(self):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', buffering=1)
+        return self._journal
+
+    def record_count(self, label, oid, bbox, sim, count):
+        """Append a single count event to the journal."""
+        entry = {
+            'seq': self._seq + 1,
+            't': round(time.time(), 3),
+            'label': label,
+            'oid': int(oid),
+            'bbox': _bbox_to_list(bbox),
+            'sim': round(float(sim or 0.0), 4),
+            'count': int(count),
+        }
+        with self._lock:
+            self._seq += 1
+            try:
+                self._open_journal().write(json.dumps(entry, separators=(',', ':')) + '\n')
+            except OSError as exc:
+                print(f"⚠️ Checkpoint journal write failed: {exc}")
+
+    def snapshot(self, counts, objects, next_object_id):
+        """Write a full snapshot and truncate the journal."""
+        payload = {
+            'version': 1,
+            'seq': self._seq,
+            'saved_at': time.time(),
+            'counts': {name: int(value) for name, value in counts.items()},
+            'next_object_id': int(next_object_id),
+            'objects': {
+                str(oid): {
+                    'label': obj.get('label'),
+                    'bbox': _bbox_to_list(obj.get('bbox')),
+                    'sim': round(float(obj.get('sim') or 0.0), 4),
+                    'box_scale': (
+                        float(obj['box_scale']) if obj.get('box_scale') is not None else None
+                    ),
+                }
+                for oid, obj in list(objects.items())
+            },
+        }
+        with self._lock:
+            try:
+                _atomic_write_json(self.snapshot_path, payload)
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                # Everything in the journal is now covered by the snapshot
+                open(self.journal_path, 'w').close()
+                self._last_snapshot = time.monotonic()
+            except OSError as exc:
+                print(f"⚠️ Checkpoint snapshot failed: {exc}")
+
+    def maybe_snapshot(self, counts, objects, next_object_id):
+        """Snapshot if the configured interval has elapsed."""
+        if time.monotonic() - self._last_snapshot >= self.interval_sec:
+            self.snapshot(counts, objects, next_object_id)
+
+    # ---------------------------------------------------------------- restore
+    def load(self):
+        """
+        Return the restored state dict, or None when there is no fresh
+        snapshot. The journal is replayed on top of the snapshot.
+        """
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        age = time.time() - float(state.get('saved_at', 0.0))
+        if age > self.max_age_sec:
+            print(f"⏳ Checkpoint is stale ({age:.0f}s old) - starting fresh")
+            return None
+
+        counts = state.get('counts', {})
+        objects = state.get('objects', {})
+        next_object_id = int(state.get('next_object_id', 1))
+        seq = int(state.get('seq', 0))
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # torn tail write from a crash
+                    if entry.get('seq', 0) <= seq:
+                        continue
+                    seq = entry['seq']
+                    counts[entry['label']] = entry.get('count', counts.get(entry['label'], 0) + 1)
+                    objects[str(entry['oid'])] = {
+                        'label': entry['label'],
+                        'bbox': entry.get('bbox'),
+                        'sim': entry.get('sim', 0.0),
+                        'box_scale': None,
+                    }
+                    next_object_id = max(next_object_id, int(entry['oid']) + 1)
+        except OSError:
+            pass
+
+        self._seq = seq
+        return {
+            'counts': counts,
+            'objects': {int(oid): obj for oid, obj in objects.items()},
+            'next_object_id': next_object_id,
+            'age': age,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
@@ -0,0 +1,229 @@
+"""
+Latest-frame hub for live video, plus ack-paced binary Socket.IO push.
+
+The detection loop publishes each new frame per feed ('raw' and
+'processed'). Only the newest frame is kept. Viewers ask for a rendition
+from a small width/quality ladder (e.g. 320/640/1280 px); each rendition
+is resized and JPEG-encoded at most once per sequence number, however many
+viewers share it, and only when someone actually requests it, so a
+rendition nobody watches costs nothing.
+
+``FramePusher`` serves one Socket.IO client. It behaves like a one-slot
+mailbox: while a frame is in flight, newer frames simply replace the
+pending one, so a slow client never builds up a backlog of stale frames.
+The next frame is sent only after the client acknowledges the previous one
+(or the ack times out), and the send interval follows the measured ack
+round-trip, so each client gets the latest frame at the rate its link
+sustains.
+"""
+import threading
+import time
+
+import cv2
+
+from utils.native import run_blocking
+
+
+FEEDS = ('raw', 'processed')
+
+DEFAULT_RENDITIONS = ((320, 60), (640, 75), (1280, 85))
+
+
+def parse_renditions(spec):
+    """'320:60,640:75,1280:85' -> ((320, 60), (640, 75), (1280, 85))"""
+    ladder = []
+    for part in (spec or '').split(','):
+        if ':' not in part:
+            continue
+        width, quality = part.split(':', 1)
+        ladder.append((int(width), int(quality)))
+    return tuple(sorted(ladder)) or DEFAULT_RENDITIONS
+
+
+def encode_jpeg(frame, width, quality):
+    """Downscale (never upscale) to ``width`` and JPEG-encode."""
+    h, w = frame.shape[:2]
+    if width and w > width:
+        frame = cv2.resize(frame, (width, max(1, int(h * width / float(w)))),
+                           interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ok else None
+
+
+class _Rendition:
+    __slots__ = ('seq', 'jpeg', 'lock')
+
+    def __init__(self):
+        self.seq = -1
+        self.jpeg = None
+        self.lock = threading.Lock()
+
+
+class _Feed:
+    __slots__ = ('seq', 'frame', 'ts', 'renditions')
+
+    def __init__(self, ladder):
+        self.seq = 0
+        self.frame = None
+        self.ts = 0.0
+        self.renditions = {width: _Rendition() for width, _ in ladder}
+
+
+class StreamHub:
+    """Keeps the latest frame per feed and lazily encoded renditions of it."""
+
+    def __init__(self, renditions=DEFAULT_RENDITIONS):
+        self.ladder = tuple(sorted(renditions))
+        self.quality = dict(self.ladder)
+        self._cond = threading.Condition()
+        self._feeds = {name: _Feed(self.ladder) for name in FEEDS}
+
+    def _feed(self, name):
+        """Feed state, created on first use (e.g. per-camera or composed feeds)."""
+        state = self._feeds.get(name)
+        if state is None:
+            with self._cond:
+                state = self._feeds.setdefault(name, _Feed(self.ladder))
+        return state
+
+    def feed_names(self, prefix=''):
+        return [name for name in list(self._feeds) if name.startswith(prefix)]
+
+    def pick_width(self, requested=None):
+        """Smallest rendition at least ``requested`` px wide (largest if none/too big)."""
+        if requested:
+            for width, _ in self.ladder:
+                if width >= requested:
+                    return width
+        return self.ladder[-1][0]
+
+    def publish(self, feed, frame):
+        """Replace the latest frame of ``feed``; the array must not be modified afterwards."""
+        state = self._feed(feed)
+        with self._cond:
+            state.seq += 1
+            state.frame = frame
+            state.ts = time.time()
+            self._cond.notify_all()
+
+    def seq(self, feed):
+        return self._feed(feed).seq
+
+    def latest(self, feed):
+        """(seq, frame, ts) of the newest raw frame (frame is shared, read-only)."""
+        state = self._feed(feed)
+        with self._cond:
+            return state.seq, state.frame, state.ts
+
+    def is_fresh(self, feed, max_age=2.0):
+        """True while something is actively publishing to ``feed``."""
+        return time.time() - self._feed(feed).ts < max_age
+
+    def wait(self, feed, after_seq, timeout):
+        """Block until ``feed`` has a frame newer than ``after_seq``; returns the latest seq."""
+        state = self._feed(feed)
+        with self._cond:
+            self._cond.wait_for(lambda: state.seq > after_seq, timeout)
+            return state.seq
+
+    def jpeg(self, feed, width=None):
+        """
+        (seq, jpeg bytes) of the latest frame at the rendition for ``width``;
+        each rendition is encoded once per sequence and shared.
+        """
+        state = self._feed(feed)
+        width = self.pick_width(width)
+        rendition = state.renditions[width]
+        with rendition.lock:
+            seq, frame = state.seq, state.frame
+            if frame is None:
+                return 0, None
+            if rendition.seq != seq:
+                jpeg = run_blocking(encode_jpeg, frame, width, self.quality[width])
+                if jpeg is None:
+                    return rendition.seq, rendition.jpeg
+                rendition.jpeg, rendition.seq = jpeg, seq
+            return rendition.seq, rendition.jpeg
+
+
+class FramePusher:
+    """One client's ack-paced binary frame stream (one frame in flight)."""
+
+    def __init__(self, hub, socketio, sid, feed, width=None, max_fps=15.0, ack_timeout=2.0,
+                 event='frame'):
+        self.hub = hub
+        self.socketio = socketio
+        self.sid = sid
+        self.feed = feed
+        self.width = hub.pick_width(width)
+        self.event = event
+        self.min_interval = 1.0 / max(0.1, float(max_fps))
+        self.max_interval = 2.0
+        self.ack_timeout = float(ack_timeout)
+        self.interval = self.min_interval
+        self.sent = 0
+        self.timeouts = 0
+        self._acked = threading.Event()
+        self._running = False
+
+    def _on_ack(self, *args):
+        self._acked.set()
+
+    def _adapt(self, acked, rtt):
+        if acked:
+            # Smooth toward the link's round trip, never faster than max_fps
+            self.interval = max(self.min_interval, 0.7 * self.interval + 0.3 * rtt)
+        else:
+            self.timeouts += 1
+            self.interval = min(self.max_interval, self.interval * 2)
+
+    def _run(self):
+        last_seq = 0
+        last_sent = 0.0
+        while self._running:
+            if self.hub.wait(self.feed, last_seq, timeout=1.0) <= last_seq:
+                continue
+            delay = self.interval - (time.monotonic() - last_sent)
+            if delay > 0:
+                self.socketio.sleep(delay)
+            if not self._running:
+                break
+            # Take whatever is newest *now*; anything published meanwhile was dropped
+            seq, jpeg = self.hub.jpeg(self.feed, self.width)
+            if jpeg is None:
+                continue
+            self._acked.clear()
+            last_sent = time.monotonic()
+            try:
+                self.socketio.emit(self.event, {
+                    'feed': self.feed,
+                    'seq': seq,
+                    'width': self.width,
+                    'interval': round(self.interval, 3),
+                    'jpeg': jpeg,
+                }, to=self.sid, callback=self._on_ack)
+            except Exception as exc:
+                print(f"⚠️ Frame push to {self.sid} failed: {exc}")
+                break
+            acked = self._acked.wait(self.ack_timeout)
+            self._adapt(acked, time.monotonic() - last_sent)
+            self.sent += 1
+            last_seq = seq
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self.socketio.start_background_task(self._run)
+
+    def stop(self):
+        self._running = False
+        self._acked.set()
+
+    def stats(self):
+        return {
+            'feed': self.feed,
+            'width': self.width,
+            'sent': self.sent,
+            'timeouts': self.timeouts,
+            'interval': round(self.interval, 3),
+        }
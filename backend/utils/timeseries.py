@@ -0,0 +1,182 @@
+"""
+In-memory per-item time series for live dashboard charts.
+
+Each item keeps two fixed-size numpy ring buffers (per-second and
+per-minute counts) plus running window sums, so recording a count and
+reading the current rate are O(1). Series are downsampled with LTTB
+(Largest-Triangle-Three-Buckets) and cached per head bucket and write
+version, so repeated requests from many open tabs are served from the cache.
+"""
+import json
+import threading
+import time
+
+import numpy as np
+
+
+class RingSeries:
+    """Fixed-size ring of counts per time bucket with an O(1) window sum."""
+
+    def __init__(self, step: float, capacity: int, window: int):
+        self.step = float(step)
+        self.capacity = int(capacity)
+        self.window = min(int(window), self.capacity)
+        self.values = np.zeros(self.capacity, dtype=np.int32)
+        self.head = None  # absolute index of the newest bucket
+        self.window_sum = 0
+
+    def _advance(self, bucket: int):
+        if self.head is None:
+            self.head = bucket
+            return
+        gap = bucket - self.head
+        if gap <= 0:
+            return
+        if gap >= self.window:
+            self.window_sum = 0
+        else:
+            # Buckets sliding out of the window, subtracted before being cleared
+            for b in range(self.head + 1, bucket + 1):
+                self.window_sum -= int(self.values[(b - self.window) % self.capacity])
+        if gap >= self.capacity:
+            self.values[:] = 0
+        else:
+            self.values[np.arange(self.head + 1, bucket + 1) % self.capacity] = 0
+        self.head = bucket
+
+    def add(self, t: float, n: int = 1):
+        bucket = int(t // self.step)
+        self._advance(bucket)
+        if bucket <= self.head - self.capacity:
+            return  # older than the ring holds
+        self.values[bucket % self.capacity] += n
+        if bucket > self.head - self.window:
+            self.window_sum += n
+
+    def rate(self, now: float) -> int:
+        """Sum of the last ``window`` buckets ending at ``now``."""
+        self._advance(int(now // self.step))
+        return self.window_sum
+
+    def ordered(self, now: float):
+        """Return (bucket start timestamps, counts) oldest first."""
+        self._advance(int(now // self.step))
+        if self.head is None:
+            return np.empty(0), np.empty(0, dtype=np.int32)
+        start = (self.head + 1) % self.capacity
+        values = np.concatenate((self.values[start:], self.values[:start]))
+        first_bucket = self.head - self.capacity + 1
+        times = (np.arange(self.capacity) + first_bucket) * self.step
+        return times, values
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int):
+    """Largest-Triangle-Three-Buckets downsampling to ``threshold`` points."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    y = y.astype(np.float64)
+    out_idx = np.empty(threshold, dtype=np.int64)
+    out_idx[0] = 0
+    out_idx[-1] = n - 1
+    bucket_size = (n - 2) / float(threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_start = end
+        next_end = min(max(int((i + 2) * bucket_size) + 1, next_start + 1), n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        out_idx[i + 1] = a
+    return x[out_idx], y[out_idx]
+
+
+class LiveSeriesStore:
+    """Per-item per-second/per-minute ring buffers with cached responses."""
+
+    RESOLUTIONS = ('second', 'minute')
+
+    def __init__(self, seconds_capacity=3 * 3600, minutes_capacity=24 * 60):
+        self.seconds_capacity = int(seconds_capacity)
+        self.minutes_capacity = int(minutes_capacity)
+        self._series = {}
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._version = 0  # bumped by every record(); part of the cache check
+
+    def _item(self, name):
+        series = self._series.get(name)
+        if series is None:
+            series = {
+                'second': RingSeries(1, self.seconds_capacity, window=60),
+                'minute': RingSeries(60, self.minutes_capacity, window=15),
+            }
+            self._series[name] = series
+        return series
+
+    def record(self, name, n=1, t=None):
+        """Record ``n`` counts for an item at time ``t``."""
+        t = time.time() if t is None else t
+        with self._lock:
+            for ring in self._item(name).values():
+                ring.add(t, n)
+            self._version += 1
+
+    def rates(self, now=None):
+        """Items per minute over the last minute and the last 15 minutes."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                name: {
+                    'per_min_1m': series['second'].rate(now),
+                    'per_min_15m': round(series['minute'].rate(now) / 15.0, 2),
+                }
+                for name, series in self._series.items()
+            }
+
+    def series_json(self, resolution='second', points=300, items=None) -> bytes:
+        """
+        Downsampled series as JSON bytes, cached until the head bucket moves
+        or a count is recorded, so concurrent viewers share a single
+        computation.
+        """
+        now = time.time()
+        step = 1 if resolution == 'second' else 60
+        stamp = (int(now // step), self._version)
+        key = (resolution, int(points), tuple(items) if items else None)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        payload = {'resolution': resolution, 'generated_at': now, 'items': {}}
+        with self._lock:
+            names = items if items else list(self._series.keys())
+            for name in names:
+                series = self._series.get(name)
+                if series is None:
+                    continue
+                times, values = series[resolution].ordered(now)
+                nonzero = np.flatnonzero(values)
+                if nonzero.size:
+                    # Trim the empty prefix before the first recorded count
+                    times, values = times[nonzero[0]:], values[nonzero[0]:]
+                else:
+                    times, values = times[-1:], values[-1:]
+                ds_t, ds_v = lttb(times, values, int(points))
+                payload['items'][name] = {
+                    't': ds_t.astype(np.int64).tolist(),
+                    'v': ds_v.astype(np.int64).tolist(),
+                }
+        payload['rates'] = self.rates(now)
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self._cache[key] = (stamp, body)
+        if len(self._cache) > 64:
+            self._cache.clear()
+            self._cache[key] = (stamp, body)
+        return body
@@ -0,0 +1,59 @@
+import { useEffect, useRef } from 'react';
+import { io } from 'socket.io-client';
+import { SOCKET_URL } from '../config/api';
+
+// Live video over Socket.IO: the server pushes one binary JPEG at a time and
+// waits for our ack before sending the next, so a slow link always shows the
+// newest frame instead of a growing backlog.
+export default function LiveFrameView({ feed = 'processed', alt = 'Live Camera', style, onLoad, onError }) {
+  const imgRef = useRef(null);
+
+  useEffect(() => {
+    const socket = io(SOCKET_URL);
+    let objectUrl = null;
+    let loaded = false;
+
+    // Ask for the smallest rendition that covers what this screen displays
+    const displayWidth = () => {
+      const cssWidth = imgRef.current?.parentElement?.clientWidth || window.innerWidth;
+      return Math.round(cssWidth * (window.devicePixelRatio || 1));
+    };
+    socket.on('connect', () => socket.emit('frames_subscribe', { feed, width: displayWidth() }));
+
+    socket.on('frame', (data, ack) => {
+      const blob = new Blob([data.jpeg], { type: 'image/jpeg' });
+      const nextUrl = URL.createObjectURL(blob);
+      const img = imgRef.current;
+      if (img) {
+        img.onload = () => {
+          if (objectUrl) URL.revokeObjectURL(objectUrl);
+          objectUrl = nextUrl;
+          if (!loaded) {
+            loaded = true;
+            onLoad && onLoad();
+          }
+          // Ack once the frame is on screen so pacing follows real display rate
+          if (ack) ack();
+        };
+        img.onerror = () => {
+          URL.revokeObjectURL(nextUrl);
+          if (ack) ack();
+        };
+        img.src = nextUrl;
+      } else if (ack) {
+        ack();
+      }
+    });
+
+    socket.on('frames_error', () => onError && onError());
+    socket.on('connect_error', () => onError && onError());
+
+    return () => {
+      socket.emit('frames_unsubscribe');
+      socket.disconnect();
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [feed]);
+
+  return <img ref={imgRef} alt={alt} style={style} />;
+}
@@ -18,6 +18,7 @@ export const API_ENDPOINTS = {
   
   // System
   status: `${API_BASE_URL}/api/status`,
+  dashboardSnapshot: `${API_BASE_URL}/api/dashboard_snapshot`,
   
   // Menu Items
   menuItems: `${API_BASE_URL}/api/menu_items`,
@@ -36,9 +37,16 @@ export const API_ENDPOINTS = {
   counts: `${API_BASE_URL}/api/counts`,
   countsSSE: `${API_BASE_URL}/api/counts_sse`,
   
+  // Analytics
+  analytics: `${API_BASE_URL}/api/analytics`,
+  liveSeries: `${API_BASE_URL}/api/live_series`,
+  export: (dataset, format = 'csv') => `${API_BASE_URL}/api/export/${dataset}?format=${format}`,
+  
   // Video Feed
   videoFeed: `${API_BASE_URL}/api/video_feed`,
   videoFeedProcessed: `${API_BASE_URL}/api/video_feed_processed`,
+  mosaicFeed: `${API_BASE_URL}/api/mosaic_feed`,
+  videoPassthrough: `${API_BASE_URL}/api/video_passthrough`,
   
   // Static files
   uploads: (path) => `${API_BASE_URL}/static/uploads/${path}`,
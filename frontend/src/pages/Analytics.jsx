@@ -35,16 +35,46 @@ export default function Analytics() {
   const [menuItems, setMenuItems] = useState([]);
   const [loading, setLoading] = useState(true);
   
-  // Generate dummy historical data (7 days)
-  const [historicalData] = useState(() => generateDummyHistoricalData());
-  const [historicalTotals] = useState(() => calculateTotalCounts(historicalData));
+  // 7-day history from the analytics rollups (dummy data until it loads)
+  const [historicalData, setHistoricalData] = useState(() => generateDummyHistoricalData());
+  const [historicalTotals, setHistoricalTotals] = useState(() => calculateTotalCounts(historicalData));
 
   useEffect(() => {
     fetchData();
+    fetchHistory();
     const interval = setInterval(fetchData, 5000);
     return () => clearInterval(interval);
   }, []);
 
+  const fetchHistory = async () => {
+    try {
+      const start = new Date();
+      start.setHours(0, 0, 0, 0);
+      start.setDate(start.getDate() - 6);
+      // Buckets are in the server's local time, so send a local timestamp
+      const pad = (n) => String(n).padStart(2, '0');
+      const startParam = `${start.getFullYear()}-${pad(start.getMonth() + 1)}-${pad(start.getDate())}T00:00:00`;
+      const response = await axios.get(API_ENDPOINTS.analytics, {
+        params: { granularity: 'day', start: startParam }
+      });
+      const { buckets = [], series = {}, totals = {} } = response.data;
+      if (Object.keys(series).length === 0) return;
+
+      const history = {};
+      Object.entries(series).forEach(([itemName, values]) => {
+        history[itemName] = buckets.map((bucket, i) => ({
+          date: new Date(bucket).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
+          fullDate: bucket.slice(0, 10),
+          count: values[i]
+        }));
+      });
+      setHistoricalData(history);
+      setHistoricalTotals(totals);
+    } catch (error) {
+      console.error('Error fetching analytics history:', error);
+    }
+  };
+
   const fetchData = async () => {
     try {
       const [countsRes, menuRes] = await Promise.all([
@@ -4,6 +4,7 @@ import { io } from 'socket.io-client';
 import { Camera as CameraIcon, Video, AlertCircle, CheckCircle, Maximize, Eye, BarChart2, Clock, VideoOff, Loader } from 'lucide-react';
 import { API_ENDPOINTS, SOCKET_URL } from '../config/api';
 import { loadHistoricalData, getTodayCounts } from '../utils/dummyData';
+import LiveFrameView from '../components/LiveFrameView';
 
 export default function Camera() {
   const [cameraUrl, setCameraUrl] = useState('rtsp://100.106.21.91:8554/Dispatch');
@@ -37,9 +38,10 @@ export default function Camera() {
     const socket = io(SOCKET_URL);
 
     socket.on('counts_update', (data) => {
-      setCounts(data.counts || {});
-      // Add to activity log
-      if (data.counts && Object.keys(data.counts).length > 0) {
+      // Full snapshot on connect, then only changed items
+      setCounts(prev => (data.full ? (data.counts || {}) : { ...prev, ...(data.counts || {}) }));
+      // Add changed items to activity log
+      if (!data.full && data.counts && Object.keys(data.counts).length > 0) {
         const newActivity = {
           time: new Date().toLocaleTimeString(),
           items: Object.entries(data.counts).map(([name, count]) => `${name} (${count})`).join(', ')
@@ -236,9 +238,9 @@ export default function Camera() {
             ) : (
               // Camera Active State
               <>
-                <img
+                <LiveFrameView
                   key={streamKey}
-                  src={`${API_ENDPOINTS.videoFeedProcessed}?t=${streamKey}`}
+                  feed="processed"
                   alt="Live Camera"
                   style={{ width: '100%', maxHeight: '600px', objectFit: 'contain', display: 'block' }}
                   onLoad={() => {
@@ -18,22 +18,27 @@ export default function Dashboard() {
   const [todayCounts] = useState(() => getTodayCounts(historicalData));
 
   useEffect(() => {
-    fetchStatus();
-    fetchCounts();
-    fetchMenuItems();
+    fetchSnapshot();
 
     const socket = io(SOCKET_URL);
+    // Full snapshot on connect, then only changed items
     socket.on('counts_update', (data) => {
-      setCounts(data.counts || {});
+      setCounts(prev => (data.full ? (data.counts || {}) : { ...prev, ...(data.counts || {}) }));
     });
 
     return () => socket.disconnect();
   }, []);
 
-  const fetchStatus = async () => {
+  // Status, counts and menu in one round trip (ETag-revalidated by the browser)
+  const fetchSnapshot = async () => {
     try {
-      const response = await axios.get(API_ENDPOINTS.status);
-      setStatus(response.data);
+      const response = await axios.get(API_ENDPOINTS.dashboardSnapshot);
+      const { status: statusData, counts: countsData, menu } = response.data;
+      setStatus(statusData || {});
+      setCounts(countsData?.counts || {});
+      const items = menu?.items || [];
+      setMenuCount(items.length);
+      console.log('Menu items count:', items.length);
     } catch (error) {
       console.error('Error:', error);
     } finally {
@@ -41,26 +46,6 @@ export default function Dashboard() {
     }
   };
 
-  const fetchCounts = async () => {
-    try {
-      const response = await axios.get(API_ENDPOINTS.counts);
-      setCounts(response.data.counts || {});
-    } catch (error) {
-      console.error('Error:', error);
-    }
-  };
-
-  const fetchMenuItems = async () => {
-    try {
-      const response = await axios.get(API_ENDPOINTS.menuItems);
-      const items = response.data.items || response.data.menu_items || [];
-      setMenuCount(items.length);
-      console.log('Menu items count:', items.length);
-    } catch (error) {
-      console.error('Error fetching menu items:', error);
-    }
-  };
-
   // Use historical totals for the display
   const totalCount = Object.values(historicalTotals).reduce((sum, count) => sum + count, 0);
 